@@ -0,0 +1,292 @@
+# src/bbg_dlws_workbench/api.py
+import logging
+import queue
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Union
+
+from .catalog import FieldCatalog
+from .config import AppConfig, load_config, validate_config
+from .identifiers.chunker import balanced_chunks, chunk
+from .identifiers.fields_loader import load_fields
+from .identifiers.inline import iter_inline_identifiers
+from .soap.ratelimit import RateLimiter
+from .stats import CostModel, RunHistory
+from .transform.decode import load_datatypes_from_csv
+from .validation import IdentifierValidator, check_history_params, enforce
+
+if TYPE_CHECKING:
+    from .pipeline import RowBatch
+
+logger = logging.getLogger("bbg-dlws-workbench.api")
+
+_END = object()
+_OUTPUTS = ("arrow", "pandas", "batches")
+
+
+def _require(module: str, extra: str, what: str):
+    try:
+        return __import__(module)
+    except ImportError as e:
+        raise ImportError(
+            f"{what} needs {module}; install it with `pip install 'bbg-dlws-workbench[{extra}]'`"
+        ) from e
+
+
+def _as_identifier(x: Union[str, Mapping[str, Any]]) -> Dict[str, Any]:
+    if isinstance(x, str):
+        return {"id": x, "yellow_key": "", "type": "", "extras": {}}
+    return {"id": x["id"], "yellow_key": x.get("yellow_key", ""), "type": x.get("type", ""),
+            "extras": x.get("extras", {})}
+
+
+class _BatchQueueStore:
+    """
+    Store handed to the Pipeline by Workbench: the rows of each response go
+    to a bounded queue as a RowBatch instead of a file. Blocks the pipeline's
+    writer while the consumer is behind; fails the write once the consumer
+    has gone away, which stops the pipeline.
+    """
+
+    accepts_row_batches = True  # Pipeline passes worker RowBatches through as-is
+
+    def __init__(self, maxsize: int):
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize)
+        self.closed = threading.Event()
+
+    def write_rows_to_csv(self, uri: str, rows: Iterable[Mapping], append: bool) -> None:
+        from .pipeline import RowBatch
+
+        batch = rows if isinstance(rows, RowBatch) else RowBatch.from_rows(rows)
+        if not len(batch):
+            return
+        while True:
+            if self.closed.is_set():
+                raise RuntimeError("Result consumer closed; stopping")
+            try:
+                self.queue.put(batch, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def write_text(self, uri: str, text: str) -> None:
+        pass  # raw archive and reports stay on the Workbench object
+
+    def put_file(self, uri: str, local_path: str) -> None:
+        pass
+
+
+class Workbench:
+    """
+    In-process API: the same build → submit → poll → normalize pipeline as
+    `bbg-dlws run`, with results returned in memory instead of written to
+    output.uri.
+
+        with Workbench("config.yaml") as wb:
+            table = wb.fetch("data", ["IBM US Equity", "MSFT US Equity"], ["PX_LAST"])
+
+    `cfg` is an AppConfig, a dict of the same shape, or a YAML path; its
+    request section supplies the defaults for fetch() arguments and the
+    connection, polling, pipeline, failure and rate-limit sections apply as
+    in the CLI. The zeep client is created on first use and reused.
+
+    Results come in one RowBatch per retrieved response, in completion order,
+    as soon as each response is normalized: consumers can start while later
+    chunks are still in flight. pyarrow and pandas are optional and only
+    imported by the outputs that need them.
+    """
+
+    def __init__(self, cfg: Union[AppConfig, Mapping[str, Any], str], client=None):
+        if isinstance(cfg, str):
+            cfg = load_config(cfg)
+        self.cfg = cfg if isinstance(cfg, AppConfig) else validate_config(cfg)
+        self._client = client
+        self._lock = threading.Lock()
+        self.limiter = RateLimiter.from_config(self.cfg.rate_limit)
+        self.history = RunHistory(self.cfg.run_history.path) if self.cfg.run_history.enabled else None
+        self.report = None      # FailureReport of the last fetch
+        self.rejects: List[Dict] = []  # identifiers quarantined by the last fetch
+
+    def close(self) -> None:
+        if self.limiter is not None:
+            self.limiter.close()
+        if self.history is not None:
+            self.history.close()
+
+    def __enter__(self) -> "Workbench":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                from .soap.client import create_client
+
+                c = self.cfg.connection
+                self._client = create_client(
+                    wsdl_url=str(c.wsdl_url),
+                    p12_path=str(c.cert.p12_path),
+                    p12_password=c.cert.p12_password,
+                    max_sessions=c.max_sessions or self.cfg.pipeline.fetch_workers,
+                )
+            return self._client
+
+    # ---------------- results ----------------
+
+    def iter_batches(
+            self,
+            kind: Optional[str] = None,
+            identifiers: Optional[Iterable[Union[str, Mapping[str, Any]]]] = None,
+            fields: Optional[List[str]] = None,
+            params: Optional[Dict] = None,
+            overrides: Optional[List[Mapping[str, str]]] = None,
+    ) -> Iterator["RowBatch"]:
+        """
+        RowBatches (columnar rows of one response each) as they are ready.
+        Arguments default to the config's request section; identifiers are
+        strings (used as the id) or dicts with id / yellow_key / type.
+        Closing the iterator early stops the run.
+        """
+        from .pipeline import ChunkExecutor, FailurePolicy, FailureReport, NormalizeSpec, Pipeline
+        from .soap.latency import RetrieveLatency
+        from .soap.poller import Poller
+
+        cfg = self.cfg
+        kind = kind or cfg.request.kind
+        params = self._params(kind) if params is None else params
+        fields = load_fields(cfg.request.fields, kind=kind) if fields is None else list(fields)
+        overrides = [o.model_dump() for o in cfg.request.overrides] if overrides is None else list(overrides)
+        datatypes = self._datatypes(fields)
+        batches = self._batches(kind, identifiers, fields, params)
+
+        client = self.client
+        poller = Poller(
+            attempts=cfg.polling.attempts,
+            interval_s=cfg.polling.interval_seconds,
+            per_attempt_timeout_s=cfg.polling.per_attempt_timeout_seconds,
+        )
+        raw = cfg.pipeline.normalize_workers > 0 or cfg.pipeline.spool_dir is not None
+        latency = RetrieveLatency.from_config(cfg.polling)
+
+        def make_executor() -> ChunkExecutor:
+            return ChunkExecutor(
+                client, kind=kind, fields=fields, overrides=overrides, params=params, poller=poller,
+                timeout=cfg.polling.per_attempt_timeout_seconds, prerender=cfg.submit.prerender, raw=raw,
+                spool_dir=cfg.pipeline.spool_dir, limiter=self.limiter, history=self.history, latency=latency,
+            )
+
+        max_pending = cfg.pipeline.max_pending or max(2 * cfg.pipeline.normalize_workers, 2)
+        store = _BatchQueueStore(max_pending)
+        self.report = report = FailureReport()
+        pipeline = Pipeline(
+            make_executor, FailurePolicy.from_config(cfg.failures), report,
+            NormalizeSpec(kind, fields, typed=cfg.output.typed, datatypes=datatypes, compact=cfg.pipeline.compact_rows),
+            store, "<memory>",
+            fetch_workers=cfg.pipeline.fetch_workers, normalize_workers=cfg.pipeline.normalize_workers,
+            max_pending=max_pending,
+        )
+        errors: List[BaseException] = []
+
+        def run() -> None:
+            try:
+                pipeline.run(batches)
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                store.queue.put(_END)
+
+        worker = threading.Thread(target=run, name="bbg-workbench", daemon=True)
+        worker.start()
+        try:
+            while True:
+                item = store.queue.get()
+                if item is _END:
+                    break
+                yield item
+        finally:
+            store.closed.set()
+            while worker.is_alive():  # unblock a writer waiting on a full queue
+                try:
+                    store.queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            worker.join()
+        if errors:
+            raise errors[0]
+        if report:
+            logger.warning(f"{len(report.failures)} batch(es) failed; see Workbench.report")
+
+    def record_batches(self, *args, **kwargs) -> Iterator[Any]:
+        """
+        iter_batches() as pyarrow RecordBatches (needs pyarrow).
+        """
+        pa = _require("pyarrow", "arrow", "Workbench.record_batches")
+        for batch in self.iter_batches(*args, **kwargs):
+            yield pa.RecordBatch.from_pydict(batch.columns)
+
+    def fetch(self, *args, output: str = "arrow", **kwargs) -> Any:
+        """
+        Run a request and return its rows as a pyarrow Table (output="arrow"),
+        a pandas DataFrame ("pandas") or an iterator of RecordBatches
+        ("batches"). Arguments are those of iter_batches().
+        """
+        if output not in _OUTPUTS:
+            raise ValueError(f"output must be one of {', '.join(_OUTPUTS)}, not {output!r}")
+        if output == "pandas":
+            pd = _require("pandas", "pandas", "Workbench.fetch(output='pandas')")
+            frames = [pd.DataFrame(b.columns) for b in self.iter_batches(*args, **kwargs)]
+            return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        pa = _require("pyarrow", "arrow", f"Workbench.fetch(output={output!r})")
+        if output == "batches":
+            return self.record_batches(*args, **kwargs)
+        tables = [pa.Table.from_batches([b]) for b in self.record_batches(*args, **kwargs)]
+        # responses may differ in columns (fields missing from some replies): union the schemas
+        return pa.concat_tables(tables, promote_options="default") if tables else pa.table({})
+
+    # ---------------- helpers ----------------
+
+    def _params(self, kind: str) -> Dict:
+        r = self.cfg.request
+        params = r.history_params if kind == "history" else r.data_params if kind == "data" else r.fundamentals_params
+        if self.cfg.validation.enabled and kind == "history":
+            enforce(check_history_params(params), "history_params", self.cfg.validation.mode)
+        return params
+
+    def _datatypes(self, fields: List[str]) -> Dict[str, str]:
+        out = self.cfg.output
+        if not out.typed:
+            return {}
+        if out.datatypes_file:
+            return load_datatypes_from_csv(str(out.datatypes_file))
+        with FieldCatalog(self.cfg.catalog.path) as catalog:
+            return catalog.datatypes(fields)
+
+    def _batches(self, kind: str, identifiers, fields: List[str], params: Dict) -> Iterator[List[Dict]]:
+        if kind == "fundamentals_headers":
+            return iter([[{}]])
+        if identifiers is None:
+            r = self.cfg.request.identifiers
+            if r.source != "inline":
+                from .identifiers.csv_loader import load_identifiers_from_csv
+                it = load_identifiers_from_csv(
+                    path=str(r.csv.path), id_col=r.csv.id_column, yk_col=r.csv.yellow_key_column,
+                    type_col=r.csv.type_column, extra_cols=r.csv.extra_columns,
+                )
+            else:
+                it = iter_inline_identifiers(r.inline)
+        else:
+            it = map(_as_identifier, identifiers)
+        self.rejects = []
+        if self.cfg.validation.enabled:
+            validator = IdentifierValidator(self.cfg.validation.mode)
+            self.rejects = validator.rejects
+            it = validator.filter(it)
+        chunking = self.cfg.chunking
+        if not chunking.enabled:
+            return iter([list(it)])
+        if chunking.order == "cost":
+            cost = CostModel.from_history(self.history, kind, len(fields), params)
+            return iter(balanced_chunks(it, chunking.max_identifiers_per_request, cost.identifier_cost))
+        return chunk(it, chunking.max_identifiers_per_request)
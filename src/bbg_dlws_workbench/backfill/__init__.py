@@ -0,0 +1,4 @@
+
+from .planner import BackfillPlan, Tile, estimate_observations, history_period, partition_output_uri, periodicity, with_period
+from .checkpoint import TileCheckpoint
+from .runner import Backfill, staging_uri
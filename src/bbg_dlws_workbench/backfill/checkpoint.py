@@ -0,0 +1,79 @@
+# src/bbg_dlws_workbench/backfill/checkpoint.py
+import os
+import sqlite3
+import threading
+import time
+from typing import Set
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tiles (
+    plan_id    TEXT NOT NULL,
+    idx        INTEGER NOT NULL,
+    partition  TEXT NOT NULL,
+    start      TEXT NOT NULL,
+    "end"      TEXT NOT NULL,
+    done_at    REAL NOT NULL,
+    PRIMARY KEY (plan_id, idx)
+);
+CREATE TABLE IF NOT EXISTS partitions (
+    plan_id    TEXT NOT NULL,
+    partition  TEXT NOT NULL,
+    merged_at  REAL NOT NULL,
+    PRIMARY KEY (plan_id, partition)
+);
+"""
+
+
+class TileCheckpoint:
+    """
+    Completed backfill tiles, per plan, in a local SQLite file. A tile is
+    recorded only once all of its rows are written to its staging file; a
+    partition once its tiles are merged into the output.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # marked from the pipeline's writer thread
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "TileCheckpoint":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def done(self, plan_id: str) -> Set[int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT idx FROM tiles WHERE plan_id = ?", (plan_id,)).fetchall()
+        return {r[0] for r in rows}
+
+    def mark_done(self, plan_id: str, tile) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO tiles (plan_id, idx, partition, start, "end", done_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (plan_id, tile.idx, tile.partition, tile.start.isoformat(), tile.end.isoformat(), time.time()),
+            )
+
+    def merged(self, plan_id: str) -> Set[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT partition FROM partitions WHERE plan_id = ?", (plan_id,)).fetchall()
+        return {r[0] for r in rows}
+
+    def mark_merged(self, plan_id: str, partition: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO partitions (plan_id, partition, merged_at) VALUES (?, ?, ?)",
+                (plan_id, partition, time.time()),
+            )
+
+    def reset(self, plan_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM tiles WHERE plan_id = ?", (plan_id,))
+            self._conn.execute("DELETE FROM partitions WHERE plan_id = ?", (plan_id,))
@@ -0,0 +1,234 @@
+# src/bbg_dlws_workbench/backfill/planner.py
+import copy
+import hashlib
+import json
+import math
+import os
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Observations per calendar day by history periodicity (daily ≈ weekdays only)
+OBS_PER_DAY = {
+    "daily": 5 / 7,
+    "weekly": 1 / 7,
+    "monthly": 1 / 30.44,
+    "quarterly": 1 / 91.31,
+    "semi_annually": 1 / 182.62,
+    "yearly": 1 / 365.25,
+}
+
+
+def _find_key(d: Dict, name: str) -> Optional[str]:
+    for k in d:
+        if k.lower() == name:
+            return k
+    return None
+
+
+def history_period(params: Dict) -> Tuple[date, date]:
+    """
+    (start, end) of history_params.daterange.period. Backfills need explicit
+    bounds; a relative duration is rejected.
+    """
+    dr_key = _find_key(params or {}, "daterange")
+    dr = params.get(dr_key) if dr_key else None
+    period_key = _find_key(dr, "period") if isinstance(dr, dict) else None
+    if not period_key or not isinstance(dr[period_key], dict):
+        raise ValueError("Backfill needs history_params.daterange.period with start and end dates")
+    period = dr[period_key]
+    bounds = []
+    for b in ("start", "end"):
+        k = _find_key(period, b)
+        if k is None:
+            raise ValueError(f"history_params.daterange.period: missing {b}")
+        v = period[k]
+        bounds.append(v if isinstance(v, date) else date.fromisoformat(str(v)))
+    if bounds[0] > bounds[1]:
+        raise ValueError(f"history_params.daterange.period: start {bounds[0]} is after end {bounds[1]}")
+    return bounds[0], bounds[1]
+
+
+def with_period(params: Dict, start: date, end: date) -> Dict:
+    """
+    Copy of history params whose daterange is exactly [start, end].
+    """
+    out = copy.deepcopy(params or {})
+    dr_key = _find_key(out, "daterange") or "daterange"
+    out[dr_key] = {"period": {"start": start.isoformat(), "end": end.isoformat()}}
+    return out
+
+
+def periodicity(params: Dict) -> str:
+    k = _find_key(params or {}, "periodicity")
+    value = str(params[k]).lower() if k else "daily"
+    if value not in OBS_PER_DAY:
+        raise ValueError(f"Unsupported periodicity for backfill estimates: {params[k]!r}")
+    return value
+
+
+def estimate_observations(start: date, end: date, freq: str = "daily") -> int:
+    """
+    Expected data points per instrument and field in [start, end].
+    """
+    days = (end - start).days + 1
+    if freq == "daily":
+        full_weeks, rest = divmod(days, 7)
+        weekdays = full_weeks * 5 + sum(1 for i in range(rest) if (start.weekday() + i) % 7 < 5)
+        return max(1, weekdays)
+    return max(1, math.ceil(days * OBS_PER_DAY[freq]))
+
+
+def max_observations(days: int, freq: str = "daily") -> int:
+    """
+    Upper bound of estimate_observations() over any window of `days` calendar days.
+    """
+    if freq == "daily":
+        return max(1, 5 * (days // 7) + min(days % 7, 5))
+    return max(1, math.ceil(days * OBS_PER_DAY[freq]))
+
+
+def partition_key(d: date, partition_by: str) -> str:
+    return f"{d.year:04d}" if partition_by == "year" else f"{d.year:04d}-{d.month:02d}"
+
+
+def partition_output_uri(uri: str, key: str) -> str:
+    """
+    <root>.<key><ext>, e.g. history.2019.csv or history.2019-03.csv.
+    """
+    root, ext = os.path.splitext(uri)
+    return f"{root}.{key}{ext}"
+
+
+def split_by_partition(start: date, end: date, partition_by: str) -> Iterator[Tuple[date, date]]:
+    """
+    [start, end] cut at year (or month) boundaries.
+    """
+    cur = start
+    while cur <= end:
+        if partition_by == "year":
+            nxt = date(cur.year + 1, 1, 1)
+        else:
+            nxt = date(cur.year + (cur.month == 12), cur.month % 12 + 1, 1)
+        seg_end = min(end, nxt - timedelta(days=1))
+        yield cur, seg_end
+        cur = seg_end + timedelta(days=1)
+
+
+class Tile:
+    """
+    One backfill job: a group of identifiers over one date window.
+    """
+
+    __slots__ = ("idx", "start", "end", "identifiers", "cells", "partition")
+
+    def __init__(self, idx: int, start: date, end: date, identifiers: List[Dict], cells: int, partition: str):
+        self.idx = idx
+        self.start = start
+        self.end = end
+        self.identifiers = identifiers
+        self.cells = cells
+        self.partition = partition
+
+    def __repr__(self) -> str:
+        return (f"Tile({self.idx}, {self.start}..{self.end}, ids={len(self.identifiers)}, "
+                f"cells={self.cells}, partition={self.partition!r})")
+
+
+class BackfillPlan:
+    """
+    (universe × date range) cut into tiles of at most `max_cells` estimated
+    cells (identifiers × fields × observations) and at most `max_ids`
+    identifiers. Windows never straddle an output partition, so every tile
+    belongs to exactly one partition.
+    """
+
+    def __init__(
+            self,
+            identifiers: Sequence[Dict],
+            fields: Sequence[str],
+            start: date,
+            end: date,
+            max_cells: int,
+            max_ids: int,
+            freq: str = "daily",
+            partition_by: str = "year",
+    ):
+        if not identifiers:
+            raise ValueError("Backfill needs at least one identifier")
+        self.fields = list(fields)
+        self.start = start
+        self.end = end
+        self.max_cells = max_cells
+        self.freq = freq
+        self.partition_by = partition_by
+
+        n_fields = max(1, len(self.fields))
+        ids_per_tile = min(max_ids, len(identifiers))
+        # widest window that still fits a full identifier group...
+        days = max(1, int(max_cells / (ids_per_tile * n_fields * OBS_PER_DAY[freq])))
+        while days > 1 and ids_per_tile * n_fields * max_observations(days, freq) > max_cells:
+            days -= 1
+        if ids_per_tile * n_fields * max_observations(days, freq) > max_cells:
+            # ...or a single day with fewer identifiers
+            ids_per_tile = max(1, max_cells // (n_fields * max_observations(1, freq)))
+        self.days_per_window = days
+        self.ids_per_tile = ids_per_tile
+
+        self.windows: List[Tuple[date, date]] = []
+        for seg_start, seg_end in split_by_partition(start, end, partition_by):
+            cur = seg_start
+            while cur <= seg_end:
+                w_end = min(seg_end, cur + timedelta(days=days - 1))
+                self.windows.append((cur, w_end))
+                cur = w_end + timedelta(days=1)
+
+        self.tiles: List[Tile] = []
+        groups = [list(identifiers[i:i + ids_per_tile]) for i in range(0, len(identifiers), ids_per_tile)]
+        for w_start, w_end in self.windows:
+            obs = estimate_observations(w_start, w_end, freq)
+            for group in groups:
+                self.tiles.append(
+                    Tile(len(self.tiles) + 1, w_start, w_end, group, len(group) * n_fields * obs,
+                         partition_key(w_start, partition_by))
+                )
+
+        self.plan_id = hashlib.sha1(
+            json.dumps(
+                {
+                    "ids": [(x.get("id", ""), x.get("yellow_key", ""), x.get("type", "")) for x in identifiers],
+                    "fields": self.fields,
+                    "start": start.isoformat(),
+                    "end": end.isoformat(),
+                    "max_cells": max_cells,
+                    "max_ids": max_ids,
+                    "freq": freq,
+                    "partition_by": partition_by,
+                },
+                sort_keys=True,
+            ).encode("utf-8")
+        ).hexdigest()[:16]
+
+    def __len__(self) -> int:
+        return len(self.tiles)
+
+    @property
+    def total_cells(self) -> int:
+        return sum(t.cells for t in self.tiles)
+
+    def partitions(self) -> Dict[str, List[Tile]]:
+        out: Dict[str, List[Tile]] = {}
+        for t in self.tiles:
+            out.setdefault(t.partition, []).append(t)
+        return out
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "plan_id": self.plan_id,
+            "tiles": len(self.tiles),
+            "windows": len(self.windows),
+            "days_per_window": self.days_per_window,
+            "ids_per_tile": self.ids_per_tile,
+            "estimated_cells": self.total_cells,
+            "max_tile_cells": max((t.cells for t in self.tiles), default=0),
+            "partitions": len(self.partitions()),
+        }
@@ -0,0 +1,116 @@
+# src/bbg_dlws_workbench/backfill/runner.py
+import csv
+import logging
+import os
+import shutil
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ..store import is_sqlite_uri
+from ..transform.decode import decode_rows
+from .checkpoint import TileCheckpoint
+from .planner import BackfillPlan, partition_output_uri, with_period
+
+logger = logging.getLogger("bbg-dlws-workbench.backfill")
+
+
+def staging_uri(uri: str) -> str:
+    """
+    Where tile outputs go before the merge: <root>.tiles/<name>.csv.
+    """
+    root = os.path.splitext(uri)[0]
+    return os.path.join(root + ".tiles", os.path.basename(root) + ".csv")
+
+
+class Backfill:
+    """
+    Drives a BackfillPlan through a Pipeline:
+      - jobs() yields the tiles not yet checkpointed, each with its own daterange
+      - on_tile_done() (the pipeline's on_chunk_done) checkpoints finished tiles,
+        including tiles whose only failures are identifiers isolated as poison
+        (they stay in `report`, the pipeline's FailureReport)
+      - merge() concatenates the tile files of every complete partition into
+        <output root>.<partition><ext> (or upserts them into a SQLite output),
+        checkpoints the partition and removes its tile files
+
+    The pipeline must write partitioned output to `self.staging`, so each tile
+    lands in its own file(s) and a re-run can redo a tile without duplicates.
+    Tiles are staged as CSV text; with `typed`, merge() decodes them using
+    `datatypes` (see NormalizeSpec), so the pipeline should stage them untyped.
+    """
+
+    def __init__(self, plan: BackfillPlan, params: Dict, checkpoint: TileCheckpoint, store, uri: str,
+                 report=None, typed: bool = False, datatypes: Optional[Dict[str, str]] = None):
+        self.plan = plan
+        self.params = params
+        self.checkpoint = checkpoint
+        self.store = store
+        self.uri = uri
+        self.report = report
+        self.typed = typed
+        self.datatypes = datatypes or {}
+        self.staging = staging_uri(uri)
+        self._tiles = {t.idx: t for t in plan.tiles}
+        self.done = checkpoint.done(plan.plan_id)
+        self.merged = checkpoint.merged(plan.plan_id)
+
+    @property
+    def pending(self) -> List[int]:
+        return [t.idx for t in self.plan.tiles if t.idx not in self.done]
+
+    def tile_files(self, idx: int) -> List[str]:
+        from ..pipeline import partition_files  # keeps `bbg-dlws backfill --plan` free of the SOAP stack
+
+        return partition_files(self.staging, idx)
+
+    def jobs(self) -> Iterator[Tuple[int, List[Dict], Optional[Dict]]]:
+        for idx in self.pending:
+            tile = self._tiles[idx]
+            for stale in self.tile_files(idx):  # left over from an interrupted run
+                os.remove(stale)
+            yield idx, tile.identifiers, with_period(self.params, tile.start, tile.end)
+
+    def on_tile_done(self, idx: int, ok: bool) -> None:
+        tile = self._tiles[idx]
+        if not ok and self.report is not None and self.report.poison_only(idx):
+            ok = True  # only isolated identifiers failed; they stay in the report
+        if not ok:
+            logger.warning(f"Tile {idx} ({tile.start}..{tile.end}) had failures; it will be retried on the next run")
+            return
+        self.checkpoint.mark_done(self.plan.plan_id, tile)
+        self.done.add(idx)
+
+    def merge(self) -> Dict[str, int]:
+        """
+        Write the output of every partition whose tiles are all done and that
+        isn't merged yet, then remove its tile files.
+        Returns {partition: rows}; incomplete partitions are left alone.
+        """
+        merged: Dict[str, int] = {}
+        for key, tiles in self.plan.partitions().items():
+            if key in self.merged:
+                continue
+            missing = [t.idx for t in tiles if t.idx not in self.done]
+            if missing:
+                logger.warning(f"Partition {key}: {len(missing)} of {len(tiles)} tile(s) not done; not merged")
+                continue
+            target = self.uri if is_sqlite_uri(self.uri) else partition_output_uri(self.uri, key)
+            paths = [path for t in tiles for path in self.tile_files(t.idx)]
+            rows_out = 0
+            append = False
+            for path in paths:
+                with open(path, newline="", encoding="utf-8") as f:
+                    rows = list(csv.DictReader(f))
+                if self.typed:
+                    rows = list(decode_rows(rows, self.datatypes))
+                self.store.write_rows_to_csv(target, rows, append=append)
+                append = append or bool(rows)
+                rows_out += len(rows)
+            self.checkpoint.mark_merged(self.plan.plan_id, key)
+            self.merged.add(key)
+            for path in paths:
+                os.remove(path)
+            merged[key] = rows_out
+            logger.info(f"Partition {key}: {rows_out} row(s) -> {target}")
+        if len(self.merged) == len(self.plan.partitions()):
+            shutil.rmtree(os.path.dirname(self.staging), ignore_errors=True)
+        return merged
@@ -0,0 +1,2 @@
+
+from .fields import FieldCatalog, query_key, validate_fields
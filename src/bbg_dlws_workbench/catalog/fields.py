@@ -0,0 +1,238 @@
+# src/bbg_dlws_workbench/catalog/fields.py
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+logger = logging.getLogger("bbg-dlws-workbench.catalog")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fields (
+    id           INTEGER PRIMARY KEY,
+    mnemonic     TEXT NOT NULL UNIQUE,
+    display_name TEXT NOT NULL DEFAULT '',
+    category     TEXT NOT NULL DEFAULT '',
+    datatype     TEXT NOT NULL DEFAULT '',
+    description  TEXT NOT NULL DEFAULT '',
+    updated_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fields_category ON fields (category COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS field_sectors (
+    mnemonic TEXT NOT NULL,
+    sector   TEXT NOT NULL,
+    PRIMARY KEY (mnemonic, sector)
+);
+CREATE INDEX IF NOT EXISTS field_sectors_sector ON field_sectors (sector);
+
+CREATE TABLE IF NOT EXISTS refreshes (
+    query_key    TEXT PRIMARY KEY,
+    refreshed_at REAL NOT NULL
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS fields_fts USING fts5(
+    mnemonic, display_name, description, content='fields', content_rowid='id'
+);
+
+CREATE TRIGGER IF NOT EXISTS fields_ai AFTER INSERT ON fields BEGIN
+    INSERT INTO fields_fts (rowid, mnemonic, display_name, description)
+    VALUES (new.id, new.mnemonic, new.display_name, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS fields_ad AFTER DELETE ON fields BEGIN
+    INSERT INTO fields_fts (fields_fts, rowid, mnemonic, display_name, description)
+    VALUES ('delete', old.id, old.mnemonic, old.display_name, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS fields_au AFTER UPDATE ON fields BEGIN
+    INSERT INTO fields_fts (fields_fts, rowid, mnemonic, display_name, description)
+    VALUES ('delete', old.id, old.mnemonic, old.display_name, old.description);
+    INSERT INTO fields_fts (rowid, mnemonic, display_name, description)
+    VALUES (new.id, new.mnemonic, new.display_name, new.description);
+END;
+"""
+
+_UPSERT = """
+INSERT INTO fields (mnemonic, display_name, category, datatype, description, updated_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (mnemonic) DO UPDATE SET
+    display_name = excluded.display_name,
+    category     = CASE WHEN excluded.category != '' THEN excluded.category ELSE fields.category END,
+    datatype     = CASE WHEN excluded.datatype != '' THEN excluded.datatype ELSE fields.datatype END,
+    description  = excluded.description,
+    updated_at   = excluded.updated_at
+"""
+
+# Columns returned by queries; same shape as parse_fundamentals_headers rows
+_SELECT = "SELECT f.mnemonic, f.display_name, f.category, f.datatype, f.description FROM fields f"
+
+
+def query_key(categories: Sequence[str] = (), sectors: Sequence[str] = (), keywords: Sequence[str] = ()) -> str:
+    """
+    Stable key for a getFields criteria combination, used for TTL bookkeeping.
+    """
+    return json.dumps(
+        {
+            "categories": sorted(categories),
+            "sectors": sorted(sectors),
+            "keywords": sorted(k.lower() for k in keywords if k),
+        },
+        sort_keys=True,
+    )
+
+
+def _fts_query(keyword: str) -> str:
+    # Quote each token and prefix-match it so user input can't inject FTS syntax
+    tokens = [t.replace('"', '""') for t in keyword.split() if t]
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+class FieldCatalog:
+    """
+    Local SQLite cache of getFields metadata with a full-text index over
+    mnemonic, display name and description. Filled incrementally from live
+    getFields responses; queried offline.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "FieldCatalog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM fields").fetchone()[0]
+
+    # ---------------- writes ----------------
+
+    def upsert(self, rows: Iterable[Mapping[str, Any]], sectors: Sequence[str] = (), category: str = "") -> int:
+        """
+        Insert or refresh metadata rows (field, displayName, category, datatype, description).
+        `sectors` / `category` record the getFields criteria the rows were fetched under,
+        since the response itself doesn't carry them.
+        """
+        now = time.time()
+        n = 0
+        with self._conn:
+            for r in rows:
+                mnemonic = str(r.get("field") or "").strip()
+                if not mnemonic:
+                    continue
+                self._conn.execute(
+                    _UPSERT,
+                    (
+                        mnemonic,
+                        str(r.get("displayName") or ""),
+                        str(r.get("category") or category or ""),
+                        str(r.get("datatype") or ""),
+                        str(r.get("description") or ""),
+                        now,
+                    ),
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO field_sectors (mnemonic, sector) VALUES (?, ?)",
+                    [(mnemonic, s) for s in sectors],
+                )
+                n += 1
+        logger.debug(f"Catalog upserted {n} fields")
+        return n
+
+    def mark_refreshed(self, key: str) -> None:
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO refreshes (query_key, refreshed_at) VALUES (?, ?)",
+                (key, time.time()),
+            )
+
+    # ---------------- reads ----------------
+
+    def is_fresh(self, key: str, ttl_s: float) -> bool:
+        row = self._conn.execute("SELECT refreshed_at FROM refreshes WHERE query_key = ?", (key,)).fetchone()
+        return bool(row) and (time.time() - row[0]) < ttl_s
+
+    def search(
+            self,
+            keyword: Optional[str] = None,
+            categories: Sequence[str] = (),
+            sectors: Sequence[str] = (),
+            limit: Optional[int] = None,
+    ) -> List[Dict[str, str]]:
+        """
+        Offline equivalent of getFields(criteria=...): keyword (full-text, prefix match),
+        categories and sectors are ANDed together.
+        """
+        sql = _SELECT
+        where: List[str] = []
+        args: List[Any] = []
+        if keyword and _fts_query(keyword):
+            sql += " JOIN fields_fts ON fields_fts.rowid = f.id"
+            where.append("fields_fts MATCH ?")
+            args.append(_fts_query(keyword))
+        if categories:
+            where.append(f"f.category COLLATE NOCASE IN ({','.join('?' * len(categories))})")
+            args.extend(categories)
+        if sectors:
+            where.append(
+                f"f.mnemonic IN (SELECT mnemonic FROM field_sectors WHERE sector IN ({','.join('?' * len(sectors))}))"
+            )
+            args.extend(sectors)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY " + ("fields_fts.rank" if keyword and _fts_query(keyword) else "f.mnemonic")
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [self._row(r) for r in self._conn.execute(sql, args)]
+
+    def lookup(self, mnemonics: Iterable[str]) -> Dict[str, Dict[str, str]]:
+        """
+        Metadata for the given mnemonics; unknown ones are absent from the result.
+        """
+        names = list(dict.fromkeys(mnemonics))
+        out: Dict[str, Dict[str, str]] = {}
+        # stay well below SQLite's host-parameter limit
+        for i in range(0, len(names), 500):
+            part = names[i : i + 500]
+            sql = f"{_SELECT} WHERE f.mnemonic IN ({','.join('?' * len(part))})"
+            for r in self._conn.execute(sql, part):
+                out[r[0]] = self._row(r)
+        return out
+
+    def datatypes(self, mnemonics: Iterable[str]) -> Dict[str, str]:
+        return {k: v["datatype"] for k, v in self.lookup(mnemonics).items()}
+
+    @staticmethod
+    def _row(r: Sequence[Any]) -> Dict[str, str]:
+        return {
+            "field": r[0],
+            "displayName": r[1],
+            "category": r[2],
+            "datatype": r[3],
+            "description": r[4],
+        }
+
+
+def validate_fields(catalog: FieldCatalog, fields: Sequence[str], kind: str) -> List[str]:
+    """
+    Check requested mnemonics against the catalog. Returns a list of problems:
+    unknown mnemonics, and bulk-format fields requested in a history request
+    (DLWS only returns time series for scalar fields).
+    """
+    known = catalog.lookup(fields)
+    problems: List[str] = []
+    for f in fields:
+        meta = known.get(f)
+        if meta is None:
+            problems.append(f"unknown field {f!r}")
+        elif kind == "history" and meta["datatype"].strip().lower() in ("bulk format", "bulk"):
+            problems.append(f"field {f!r} has datatype {meta['datatype']!r}, not supported in history requests")
+    return problems
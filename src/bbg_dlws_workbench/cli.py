@@ -1,22 +1,36 @@
 # src/bbg_dlws_workbench/cli.py
+from __future__ import annotations
+
+import time
+_T0 = time.perf_counter()
+
 import typer
-import yaml
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
-from .config import AppConfig
-from .store import resolve_store
+# Only light modules at import time: zeep, requests, cryptography and lxml are
+# imported by the commands that talk to DLWS or parse XML (see --timings).
+from .util.timings import TIMINGS
+from .store import COMPRESSIONS, SqliteStore, is_sqlite_uri, resolve_store
 from .identifiers.csv_loader import load_identifiers_from_csv
-from .identifiers.chunker import chunk
+from .identifiers.chunker import balanced_chunks, chunk
 from .identifiers.fields_loader import load_fields
-from .soap.client import create_client
-from .soap.submitter import submit_request, get_response_by_id, call_sync
-from .soap.poller import Poller
-from .transform.normalize import soap_to_rows
+from .identifiers.inline import iter_inline_identifiers
+from .soap.ratelimit import RateLimiter
+from .stats import CostModel, LatencyModel, PlanEstimate, RunHistory
+from .transform.decode import load_datatypes_from_csv
 from .soap.registry import OP_HANDLERS
 from .soap.builder import build_payload
-from .soap.fields_criteria import build_fields_criteria_zeep
-from .soap.fields_ops import get_fields
-import logging, sys
+from .soap.fields_criteria import normalize_categories, normalize_sectors
+from .catalog import FieldCatalog, query_key
+from .validation import IdentifierValidator, check_headers, check_history_params, enforce
+import logging, os, sys
+
+if TYPE_CHECKING:
+    from .config import AppConfig
+    from .pipeline import ChunkExecutor, FailureReport, NormalizeSpec, Pipeline
+
+TIMINGS.started = _T0
+TIMINGS.record("import cli", time.perf_counter() - _T0)
 
 app = typer.Typer(help="Bloomberg DLWS Workbench", no_args_is_help=True)
 
@@ -25,61 +39,242 @@ logging.basicConfig(
     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
     handlers=[logging.StreamHandler(sys.stdout)],
 )
+logger = logging.getLogger("bbg-dlws-workbench.cli")
 
-@app.command("run")
-def run(
-        config: str = typer.Option(..., "-c", "--config", help="Path to YAML configuration file."),
-        dry_run: bool = typer.Option(False, "--dry-run", help="Print payloads instead of sending."),
+
+@app.callback()
+def main(
+        timings: bool = typer.Option(False, "--timings", help="Print import and phase timings to stderr on exit."),
 ):
     """
-    Build request(s) from config, then submit/poll/retrieve and write CSV.
-    With --dry-run, only print the payloads per chunk.
+    Bloomberg DLWS Workbench
     """
-    # Load and validate config
-    with open(config, "r", encoding="utf-8") as f:
-        cfg = AppConfig.model_validate(yaml.safe_load(f))
+    if timings:
+        import atexit
+        atexit.register(lambda: typer.echo(TIMINGS.report(), err=True))
 
-    # Resolve kind & op params
+def _load_config(path: str) -> AppConfig:
+    with TIMINGS.section("import config"):
+        from .config import load_config  # pydantic model building is most of the CLI's own import time
+    with TIMINGS.section("load config"):
+        return load_config(path)
+
+
+def _op_params(cfg: AppConfig) -> dict:
     kind = cfg.request.kind
-    op = OP_HANDLERS[kind]
     params = (
         cfg.request.history_params if kind == "history"
         else cfg.request.data_params if kind == "data"
         else cfg.request.fundamentals_params
     )
+    if cfg.validation.enabled and kind == "history":
+        enforce(check_history_params(params), "history_params", cfg.validation.mode)
+    return params
+
+
+def _fields_and_datatypes(cfg: AppConfig):
+    # Fields (inline or file), validated against the local catalog if enabled
+    need_catalog = cfg.catalog.validate_fields or (cfg.output.typed and not cfg.output.datatypes_file)
+    catalog = FieldCatalog(cfg.catalog.path) if need_catalog else None
+    fields = load_fields(cfg.request.fields, catalog=catalog if cfg.catalog.validate_fields else None,
+                         kind=cfg.request.kind)
+
+    # Datatypes for typed output: explicit fields CSV, else the catalog
+    datatypes = {}
+    if cfg.output.typed:
+        if cfg.output.datatypes_file:
+            datatypes = load_datatypes_from_csv(str(cfg.output.datatypes_file))
+        else:
+            datatypes = catalog.datatypes(fields)
+    if catalog is not None:
+        catalog.close()
+    return fields, datatypes
+
+
+def _identifiers(cfg: AppConfig):
+    """
+    Identifier iterator (inline or CSV file), filtered by the validator when
+    validation is enabled. Returns (iterator, validator or None).
+    """
+    if cfg.request.identifiers.source == "csv":
+        csvcfg = cfg.request.identifiers.csv
+        it = load_identifiers_from_csv(
+            path=str(csvcfg.path),
+            id_col=csvcfg.id_column,
+            yk_col=csvcfg.yellow_key_column,
+            type_col=csvcfg.type_column,
+            extra_cols=csvcfg.extra_columns,
+        )
+    else:
+        it = iter_inline_identifiers(cfg.request.identifiers.inline)
+    validator = None
+    if cfg.validation.enabled:
+        validator = IdentifierValidator(cfg.validation.mode)
+        it = validator.filter(it)
+        if cfg.validation.mode == "fail":
+            # check the whole universe before the first submit
+            it = iter(list(it))
+    return it, validator
+
+
+def _chunks(cfg: AppConfig, it, fields: List[str], params: dict):
+    """
+    Identifier batches per chunking config: streamed in input order, or (order:
+    cost) balanced by estimated cost and costliest first.
+    """
+    c = cfg.chunking
+    if not c.enabled:
+        return [list(it)]
+    if c.order == "input":
+        return chunk(it, c.max_identifiers_per_request)
+    history = None
+    if cfg.run_history.enabled and os.path.exists(cfg.run_history.path):
+        history = RunHistory(cfg.run_history.path)
+    try:
+        cost = CostModel.from_history(history, cfg.request.kind, len(fields), params)
+    finally:
+        if history is not None:
+            history.close()
+    return balanced_chunks(it, c.max_identifiers_per_request, cost.identifier_cost)
+
+
+def _new_client(cfg: AppConfig, max_sessions: int = 1):
+    with TIMINGS.section("import soap client"):
+        from .soap.client import create_client
+    with TIMINGS.section("connect"):
+        return create_client(
+            wsdl_url=str(cfg.connection.wsdl_url),
+            p12_path=str(cfg.connection.cert.p12_path),
+            p12_password=cfg.connection.cert.p12_password,
+            max_sessions=max_sessions,
+        )
+
+
+def _executor_factory(cfg: AppConfig, fields: List[str], params: dict, limiter: Optional[RateLimiter] = None,
+                      history: Optional[RunHistory] = None):
+    """
+    Connect (and check headers), then return make_executor() for the Pipeline.
+    The fetch threads' executors share one client (WSDL parsed once) with a
+    pool of HTTPS sessions, as well as `limiter`, `history` and the retrieve
+    latency window (polling.adaptive_timeout / hedge_retrieves).
+    """
+    with TIMINGS.section("import pipeline"):
+        from .pipeline import ChunkExecutor
+        from .soap.latency import RetrieveLatency
+        from .soap.poller import Poller
+    kind = cfg.request.kind
+    client = _new_client(cfg, cfg.connection.max_sessions or cfg.pipeline.fetch_workers)
+    if cfg.validation.enabled and cfg.validation.check_headers:
+        enforce(check_headers(client, kind, params), "headers", cfg.validation.mode)
+    poller = Poller(
+        attempts=cfg.polling.attempts,
+        interval_s=cfg.polling.interval_seconds,
+        per_attempt_timeout_s=cfg.polling.per_attempt_timeout_seconds,
+    )
+
+    spool_dir = cfg.pipeline.spool_dir
+    latency = RetrieveLatency.from_config(cfg.polling)
+
+    def make_executor() -> ChunkExecutor:
+        return ChunkExecutor(
+            client,
+            kind=kind,
+            fields=fields,
+            overrides=[o.model_dump() for o in cfg.request.overrides],
+            params=params,
+            poller=poller,
+            timeout=cfg.polling.per_attempt_timeout_seconds,
+            prerender=cfg.submit.prerender,
+            raw=cfg.pipeline.normalize_workers > 0 or spool_dir is not None,
+            spool_dir=spool_dir,
+            limiter=limiter,
+            history=history,
+            latency=latency,
+        )
+
+    return make_executor
+
+
+def _pipeline(cfg: AppConfig, make_executor, report: FailureReport, spec: NormalizeSpec, store, **kwargs) -> Pipeline:
+    if is_sqlite_uri(kwargs.get("uri", cfg.output.uri)) and kwargs.get("partitioned", cfg.pipeline.partitioned_output):
+        raise ValueError("pipeline.partitioned_output does not apply to SQLite (upsert) outputs")
+    options = dict(
+        uri=cfg.output.uri,
+        append=cfg.output.append_mode,
+        fetch_workers=cfg.pipeline.fetch_workers,
+        normalize_workers=cfg.pipeline.normalize_workers,
+        max_pending=cfg.pipeline.max_pending,
+        include_raw=cfg.output.include_raw_xml,
+        partitioned=cfg.pipeline.partitioned_output,
+    )
+    options.update(kwargs)
+    from .pipeline import FailurePolicy, Pipeline
+    return Pipeline(make_executor, policy=FailurePolicy.from_config(cfg.failures), report=report, spec=spec,
+                    store=store, **options)
+
+
+def _store(cfg: AppConfig, uri: Optional[str] = None):
+    out = cfg.output
+    return resolve_store(uri or out.uri, compression=out.compression, level=out.compression_level,
+                         threads=out.compression_threads)
+
+
+def _bulk_table_uri(uri: str) -> str:
+    return os.path.splitext(uri)[0] + ".bulk.csv"
+
+
+def _bulk_uri(cfg: AppConfig) -> Optional[str]:
+    if cfg.output.bulk_mode != "explode":
+        return None
+    return cfg.output.bulk_uri or _bulk_table_uri(cfg.output.uri)
+
+
+def _run_history(cfg: AppConfig) -> Optional[RunHistory]:
+    return RunHistory(cfg.run_history.path) if cfg.run_history.enabled else None
+
+
+def _write_rejects(cfg: AppConfig, store, validator) -> None:
+    if validator is not None and validator.rejects:
+        reject_uri = cfg.validation.reject_uri or cfg.output.uri + ".rejects.csv"
+        store.write_rows_to_csv(reject_uri, validator.rejects, append=False)
+        logger.warning(f"{len(validator.rejects)} identifier(s) quarantined to {reject_uri}")
+
+
+def _write_reports(cfg: AppConfig, store, validator, report: FailureReport,
+                   limiter: Optional[RateLimiter] = None, history: Optional[RunHistory] = None) -> None:
+    if limiter is not None:
+        logger.info(f"DLWS usage: {limiter.summary() or 'no calls'}")
+        limiter.close()
+    if history is not None:
+        history.close()
+    _write_rejects(cfg, store, validator)
+    if report:
+        report_uri = cfg.failures.report_uri or cfg.output.uri + ".failures.json"
+        store.write_text(report_uri, report.to_json())
+        logger.error(f"{len(report.failures)} batch(es) failed; see {report_uri}")
 
-    # Prepare fields (inline or file)
-    fields = load_fields(cfg.request.fields)
 
-    # Prepare identifiers iterator (inline or CSV file)
+@app.command("run")
+def run(
+        config: str = typer.Option(..., "-c", "--config", help="Path to YAML configuration file."),
+        dry_run: bool = typer.Option(False, "--dry-run", help="Print payloads instead of sending."),
+):
+    """
+    Build request(s) from config, then submit/poll/retrieve and write CSV.
+    With --dry-run, only print the payloads per chunk.
+    """
+    cfg = _load_config(config)
+    kind = cfg.request.kind
+    params = _op_params(cfg)
+    fields, datatypes = _fields_and_datatypes(cfg)
+
+    validator = None
     if kind == "fundamentals_headers":
         # fundamentals headers normally don't use identifiers; force single batch
         batches = [[{}]]
     else:
-        if cfg.request.identifiers.source == "csv":
-            csvcfg = cfg.request.identifiers.csv
-            it = load_identifiers_from_csv(
-                path=str(csvcfg.path),
-                id_col=csvcfg.id_column,
-                yk_col=csvcfg.yellow_key_column,
-                type_col=csvcfg.type_column,
-                extra_cols=csvcfg.extra_columns,
-            )
-        else:
-            it = (
-                {
-                    "id": x["id"],
-                    "yellow_key": x.get("yellow_key", ""),
-                    "type": x.get("type", ""),
-                    "extras": x.get("extras", {}),
-                }
-                for x in cfg.request.identifiers.inline
-            )
-        batches = (
-            chunk(it, cfg.chunking.max_identifiers_per_request)
-            if cfg.chunking.enabled
-            else [list(it)]
-        )
+        it, validator = _identifiers(cfg)
+        batches = _chunks(cfg, it, fields, params)
 
     # DRY RUN: print payloads and exit
     if dry_run:
@@ -93,23 +288,91 @@ def run(
             )
             typer.echo(f"--- Chunk {idx} {kind} payload (dry-run) ---")
             typer.echo(str(payload))
+        if validator is not None and validator.rejects:
+            typer.echo(f"--- {len(validator.rejects)} identifier(s) quarantined ---")
+            for r in validator.rejects:
+                typer.echo(f"{r['id']!r}: {r['reason']}")
         raise typer.Exit(code=0)
 
     # LIVE RUN
-    store = resolve_store(cfg.output.uri)
-    client = create_client(
-        wsdl_url=str(cfg.connection.wsdl_url),
-        p12_path=str(cfg.connection.cert.p12_path),
-        p12_password=cfg.connection.cert.p12_password,
-    )
-    poller = Poller(
-        attempts=cfg.polling.attempts,
-        interval_s=cfg.polling.interval_seconds,
-        per_attempt_timeout_s=cfg.polling.per_attempt_timeout_seconds,
-    )
+    with TIMINGS.section("import pipeline"):
+        from .pipeline import FailureReport, NormalizeSpec
+    store = _store(cfg)
+    limiter = RateLimiter.from_config(cfg.rate_limit)
+    history = _run_history(cfg)
+    make_executor = _executor_factory(cfg, fields, params, limiter, history)
+    report = FailureReport()
+    spec = NormalizeSpec(kind, fields, typed=cfg.output.typed, datatypes=datatypes, bulk_uri=_bulk_uri(cfg),
+                         compact=cfg.pipeline.compact_rows)
+    pipeline = _pipeline(cfg, make_executor, report, spec, store)
 
-    append = cfg.output.append_mode
-    for idx, batch in enumerate(batches, start=1):
+    try:
+        # Submit / poll / normalize / write; failing batches are retried or bisected by the policy
+        with TIMINGS.section("pipeline"):
+            written = pipeline.run(batches)
+        logger.info(f"Wrote {written} rows to {cfg.output.uri}")
+    finally:
+        _write_reports(cfg, store, validator, report, limiter, history)
+    if report:
+        # partial success: output is written, but signal the failures to the caller
+        raise typer.Exit(code=1)
+
+
+@app.command("plan")
+def plan(
+        config: str = typer.Option(..., "-c", "--config", help="Path to YAML configuration file."),
+        sample: int = typer.Option(0, "--sample", help="Also print the payloads of N randomly sampled chunks."),
+        seed: Optional[int] = typer.Option(None, "--seed", help="Random seed for --sample."),
+):
+    """
+    Estimate a run without sending anything: chunk count, cells per chunk,
+    response size and wall time (from the run history, when there is one).
+    Identifiers are streamed; only the sampled chunks are kept.
+    """
+    import json
+    import random
+
+    cfg = _load_config(config)
+    kind = cfg.request.kind
+    params = _op_params(cfg)
+    fields, _ = _fields_and_datatypes(cfg)
+
+    model = None
+    if cfg.run_history.enabled and os.path.exists(cfg.run_history.path):
+        with RunHistory(cfg.run_history.path) as history:
+            model = LatencyModel.fit(history.samples(kind))
+    estimate = PlanEstimate(kind, len(fields), params, model)
+
+    validator = None
+    if kind == "fundamentals_headers":
+        batches = [[{}]]
+    else:
+        it, validator = _identifiers(cfg)
+        batches = _chunks(cfg, it, fields, params)
+
+    # reservoir sample of chunks, so the universe is never held in memory
+    rng = random.Random(seed)
+    sampled: List[tuple] = []
+    with TIMINGS.section("plan"):
+        for idx, batch in enumerate(batches, start=1):
+            estimate.add(0 if kind == "fundamentals_headers" else len(batch))
+            if len(sampled) < sample:
+                sampled.append((idx, batch))
+            elif sample:
+                j = rng.randrange(idx)
+                if j < sample:
+                    sampled[j] = (idx, batch)
+
+    rate = cfg.rate_limit.submit_per_second if cfg.rate_limit.enabled else 0.0
+    summary = estimate.summary(fetch_workers=cfg.pipeline.fetch_workers, submit_per_second=rate)
+    if validator is not None:
+        summary["quarantined"] = len(validator.rejects)
+        summary["validation_warnings"] = validator.warnings
+    typer.echo(json.dumps(summary, indent=2))
+    if model is None:
+        typer.echo("(no run history for this kind yet: wall time not estimated)", err=True)
+
+    for idx, batch in sorted(sampled, key=lambda s: s[0]):
         payload = build_payload(
             kind=kind,
             fields=fields,
@@ -117,38 +380,238 @@ def run(
             overrides=[o.model_dump() for o in cfg.request.overrides],
             params=params,
         )
+        typer.echo(f"--- Chunk {idx} {kind} payload (sample) ---")
+        typer.echo(json.dumps(payload, indent=2, default=str))
 
-        # Submit / Call
-        if op["async"]:
-            response_id = submit_request(client, str(cfg.connection.endpoint), kind, payload)
 
-            def fetch():
-                return get_response_by_id(
-                    client,
-                    kind,
-                    response_id,
-                    timeout=cfg.polling.per_attempt_timeout_seconds,
-                )
+@app.command("stats")
+def stats(
+        config: str = typer.Option(..., "-c", "--config", help="Path to YAML configuration file (uses run_history.path)."),
+        kind: Optional[str] = typer.Option(None, "--kind", help="Only this request kind."),
+        days: Optional[float] = typer.Option(None, "--days", min=0, help="Only chunks recorded in the last N days."),
+        as_json: bool = typer.Option(False, "--json", help="Print every percentile as JSON."),
+):
+    """
+    Percentiles of past chunks from the run history, by kind, identifiers
+    per chunk and field count: submit-to-ready latency, poll attempts,
+    response size and rows, with failures and the most common sequence of
+    DLWS status codes. Evidence for chunking.max_identifiers_per_request and
+    the polling settings.
+    """
+    import json
 
-            soap_response = poller.poll(fetch)
-        else:
-            soap_response = call_sync(
-                client,
-                str(cfg.connection.endpoint),
-                kind,
-                payload,
-                timeout=cfg.polling.per_attempt_timeout_seconds,
+    cfg = _load_config(config)
+    path = cfg.run_history.path
+    if not os.path.exists(path):
+        typer.echo(f"No run history at {path}")
+        raise typer.Exit(code=0)
+    since = time.time() - days * 86400 if days is not None else None
+    with RunHistory(path) as history:
+        groups = history.stats(kind, since)
+    if as_json:
+        typer.echo(json.dumps(groups, indent=2))
+        return
+    if not groups:
+        typer.echo("No chunks recorded yet.")
+        return
+
+    def fmt(value, scale: float = 1.0, digits: int = 1) -> str:
+        return "-" if value is None else f"{value / scale:.{digits}f}"
+
+    header = ("kind", "ids", "fields", "chunks", "failed", "ready_p50", "ready_p90", "ready_p99",
+              "polls_p50", "polls_p90", "kb_p50", "kb_p99", "rows_p50", "statuses")
+    lines = [header]
+    for g in groups:
+        lines.append((
+            g["kind"], str(g["identifiers"]), str(g["fields"]), str(g["chunks"]), str(g["failed"]),
+            fmt(g["ready_seconds_p50"]), fmt(g["ready_seconds_p90"]), fmt(g["ready_seconds_p99"]),
+            fmt(g["poll_attempts_p50"], digits=0), fmt(g["poll_attempts_p90"], digits=0),
+            fmt(g["response_bytes_p50"], 1024), fmt(g["response_bytes_p99"], 1024),
+            fmt(g["rows_p50"], digits=0), g["statuses"] or "-",
+        ))
+    widths = [max(len(line[i]) for line in lines) for i in range(len(header))]
+    for line in lines:
+        typer.echo("  ".join(v.ljust(w) if i in (0, len(header) - 1) else v.rjust(w)
+                             for i, (v, w) in enumerate(zip(line, widths))).rstrip())
+
+
+@app.command("backfill")
+def backfill(
+        config: str = typer.Option(..., "-c", "--config", help="Path to YAML configuration file (kind: history)."),
+        plan_only: bool = typer.Option(False, "--plan", help="Print the tile plan and exit."),
+        restart: bool = typer.Option(False, "--restart", help="Forget checkpointed tiles of this plan."),
+):
+    """
+    Split history_params.daterange.period × the identifier universe into tiles
+    of at most backfill.max_cells_per_job estimated cells, run the pending
+    tiles through the pipeline, checkpoint them, and merge complete partitions
+    into <output root>.<YYYY[-MM]><ext>. Re-running resumes where it stopped.
+    """
+    from .backfill import Backfill, BackfillPlan, TileCheckpoint, history_period, periodicity
+
+    cfg = _load_config(config)
+    if cfg.request.kind != "history":
+        raise typer.BadParameter("backfill only applies to request.kind: history", param_hint="--config")
+    params = _op_params(cfg)
+    start, end = history_period(params)
+    fields, datatypes = _fields_and_datatypes(cfg)
+    it, validator = _identifiers(cfg)
+
+    plan = BackfillPlan(
+        list(it),
+        fields,
+        start,
+        end,
+        max_cells=cfg.backfill.max_cells_per_job,
+        max_ids=cfg.chunking.max_identifiers_per_request,
+        freq=periodicity(params),
+        partition_by=cfg.backfill.partition_by,
+    )
+    store = _store(cfg)
+    with TileCheckpoint(cfg.backfill.checkpoint_path) as checkpoint:
+        if restart:
+            checkpoint.reset(plan.plan_id)
+        job = Backfill(plan, params, checkpoint, store, cfg.output.uri, typed=cfg.output.typed, datatypes=datatypes)
+        summary = dict(plan.summary(), done=len(job.done), pending=len(job.pending))
+        typer.echo(" ".join(f"{k}={v}" for k, v in summary.items()))
+        if plan_only:
+            raise typer.Exit(code=0)
+
+        from .pipeline import FailureReport, NormalizeSpec
+        report = job.report = FailureReport()
+        if job.pending:
+            limiter = RateLimiter.from_config(cfg.rate_limit)
+            history = _run_history(cfg)
+            pipeline = _pipeline(
+                cfg, _executor_factory(cfg, fields, params, limiter, history), report,
+                NormalizeSpec("history", fields, compact=cfg.pipeline.compact_rows),  # merge() decodes
+                resolve_store(job.staging),  # tiles are staged uncompressed; merge() writes through `store`
+                uri=job.staging, append=False, partitioned=True, on_chunk_done=job.on_tile_done,
             )
+            try:
+                with TIMINGS.section("pipeline"):
+                    written = pipeline.run_jobs(job.jobs())
+                logger.info(f"Backfill wrote {written} rows to {job.staging}")
+            finally:
+                _write_reports(cfg, store, validator, report, limiter, history)
+        merged = job.merge()
+        typer.echo(f"Merged {len(merged)} of {len(plan.partitions())} partition(s); "
+                   f"{len(job.pending)} tile(s) still pending.")
+    if report or job.pending:
+        raise typer.Exit(code=1)
+
+
+def _work_queue(cfg: AppConfig):
+    from .workqueue import open_queue
+
+    q = cfg.queue
+    return open_queue(q.path, lease_seconds=q.lease_seconds, max_attempts=q.max_attempts)
+
 
-        # Optionally save raw
-        if cfg.output.include_raw_xml:
-            suffix = f".chunk{idx}.xml" if idx > 1 else ".xml"
-            store.write_text(cfg.output.uri + suffix, str(soap_response))
+def _queue_config_id(cfg: AppConfig, fields: List[str], params: dict) -> str:
+    from .workqueue import config_id
 
-        # Normalize and write CSV
-        rows = list(soap_to_rows(kind, soap_response, fields))
-        store.write_rows_to_csv(cfg.output.uri, rows, append=append)
-        append = True  # subsequent chunks append
+    return config_id(cfg.request.kind, fields, params, [o.model_dump() for o in cfg.request.overrides],
+                     cfg.output.uri)
+
+
+@app.command("enqueue")
+def enqueue(
+        config: str = typer.Option(..., "-c", "--config", help="Path to YAML configuration file."),
+        reset: bool = typer.Option(False, "--reset", help="Replace the run held by the queue, whatever its state."),
+):
+    """
+    Chunk the config's identifiers into the work queue (queue.path) for
+    `bbg-dlws worker` processes. Enqueuing the same run again only prints
+    its progress.
+    """
+    from .workqueue import queue_id
+
+    cfg = _load_config(config)
+    params = _op_params(cfg)
+    fields, _ = _fields_and_datatypes(cfg)
+    validator = None
+    if cfg.request.kind == "fundamentals_headers":
+        batches = [[{}]]
+    else:
+        it, validator = _identifiers(cfg)
+        batches = _chunks(cfg, it, fields, params)
+    jobs = list(enumerate(batches, start=1))
+    config_id = _queue_config_id(cfg, fields, params)
+    run_id = queue_id(config_id, jobs)
+
+    wq = _work_queue(cfg)
+    try:
+        added = wq.enqueue(run_id, config_id, jobs, reset=reset)
+        _write_rejects(cfg, _store(cfg), validator)
+        summary = dict(queue=cfg.queue.path, run_id=run_id, chunks=len(jobs), added=added, **wq.counts())
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--reset")
+    finally:
+        wq.close()
+    typer.echo(" ".join(f"{k}={v}" for k, v in summary.items()))
+
+
+@app.command("worker")
+def worker(
+        config: str = typer.Option(..., "-c", "--config", help="Path to YAML configuration file (same as enqueue)."),
+        worker_id: Optional[str] = typer.Option(None, "--id", help="Worker name in the queue (default: <host>-<pid>)."),
+        max_chunks: Optional[int] = typer.Option(None, "--max-chunks", min=1, help="Stop after claiming this many chunks."),
+        wait: bool = typer.Option(True, "--wait/--no-wait",
+                                  help="Keep polling while other workers hold claims (to take over expired leases)."),
+):
+    """
+    Claim chunks from the work queue and run them through submit/poll/
+    normalize with this process's own client, writing one partition file per
+    chunk (<output.uri root>.partNNNNN<ext>). Leases are renewed while a
+    chunk runs; chunks of a dead worker are retried once their lease expires.
+    """
+    import socket
+
+    from .workqueue import Worker, worker_name
+
+    cfg = _load_config(config)
+    params = _op_params(cfg)
+    fields, datatypes = _fields_and_datatypes(cfg)
+    name = worker_name(worker_id or f"{socket.gethostname()}-{os.getpid()}")
+
+    wq = _work_queue(cfg)
+    try:
+        meta = wq.meta()
+        if not meta:
+            raise typer.BadParameter(f"queue {cfg.queue.path} is empty; run `bbg-dlws enqueue` first",
+                                     param_hint="--config")
+        if meta.get("config_id") != _queue_config_id(cfg, fields, params):
+            raise typer.BadParameter(f"run {meta.get('run_id')} in {cfg.queue.path} was enqueued with a different "
+                                     f"request or output.uri", param_hint="--config")
+
+        from .pipeline import FailureReport, NormalizeSpec
+        report = FailureReport()
+        job = Worker(wq, name, cfg.output.uri, bulk_uri=_bulk_uri(cfg), wait=wait,
+                     poll_s=cfg.queue.poll_seconds, max_chunks=max_chunks, report=report)
+        store = _store(cfg)
+        limiter = RateLimiter.from_config(cfg.rate_limit)
+        history = _run_history(cfg)
+        spec = NormalizeSpec(cfg.request.kind, fields, typed=cfg.output.typed, datatypes=datatypes,
+                             bulk_uri=_bulk_uri(cfg), compact=cfg.pipeline.compact_rows)
+        pipeline = _pipeline(cfg, _executor_factory(cfg, fields, params, limiter, history), report, spec, store,
+                             append=False, partitioned=True, on_chunk_done=job.on_chunk_done)
+        # one failure report per worker: <report root>.<worker><ext>
+        root, ext = os.path.splitext(cfg.failures.report_uri or cfg.output.uri + ".failures.json")
+        cfg.failures.report_uri = f"{root}.{name}{ext}"
+        try:
+            with TIMINGS.section("pipeline"), job.heartbeat():
+                written = pipeline.run_jobs(job.jobs())
+            logger.info(f"{name}: wrote {written} rows from {job.claimed} chunk(s)")
+        finally:
+            _write_reports(cfg, store, None, report, limiter, history)
+        summary = dict(worker=name, claimed=job.claimed, **job.completed,
+                       **{f"queue_{k}": v for k, v in wq.counts().items()})
+    finally:
+        wq.close()
+    typer.echo(" ".join(f"{k}={v}" for k, v in summary.items()))
+    if report:
+        raise typer.Exit(code=1)
 
 
 @app.command("fields")
@@ -159,25 +622,38 @@ def fields(
         sector: List[str] = typer.Option([], "--sector", "-S", help="Market sector filter (repeatable)."),
         keyword: List[str] = typer.Option([], "--keyword", "-K", help="Keyword filter (repeatable)."),
         timeout: int = typer.Option(30, "--timeout", help="Per-request timeout (seconds)."),
+        offline: bool = typer.Option(False, "--offline", help="Query the local field catalog only; never call getFields."),
+        refresh: bool = typer.Option(False, "--refresh", help="Call getFields even if the catalog is within its TTL."),
 ):
     """
     Fetch Bloomberg field mnemonics & metadata via getFields(criteria=...).
+    Results are cached in the local field catalog; repeated queries within
+    catalog.ttl_hours are answered offline.
     """
-    with open(config, "r", encoding="utf-8") as f:
-        raw = yaml.safe_load(f)
-    cfg = AppConfig.model_validate(raw)
+    cfg = _load_config(config)
 
-    client = create_client(
-        wsdl_url=str(cfg.connection.wsdl_url),
-        p12_path=str(cfg.connection.cert.p12_path),
-        p12_password=cfg.connection.cert.p12_password,
-    )
+    cats = normalize_categories(category)
+    secs = normalize_sectors(sector)
+    key = query_key(cats, secs, keyword)
+
+    with FieldCatalog(cfg.catalog.path) as catalog:
+        if not offline and (refresh or not catalog.is_fresh(key, cfg.catalog.ttl_hours * 3600)):
+            from .soap.fields_criteria import build_fields_criteria_zeep
+            from .soap.fields_ops import get_fields
+            from .transform.normalize import soap_to_rows
 
-    criteria = build_fields_criteria_zeep(client, categories=category, sectors=sector, keywords=keyword)
+            client = _new_client(cfg)
 
-    resp = get_fields(client, criteria=criteria)
+            criteria = build_fields_criteria_zeep(client, categories=category, sectors=sector, keywords=keyword)
+
+            resp = get_fields(client, criteria=criteria)
+
+            rows = list(soap_to_rows("fundamentals_headers", resp, []))
+            catalog.upsert(rows, sectors=secs, category=cats[0] if len(cats) == 1 else "")
+            catalog.mark_refreshed(key)
+        else:
+            rows = catalog.search(keyword=" ".join(keyword), categories=cats, sectors=secs)
 
-    rows = list(soap_to_rows("fundamentals_headers", resp, []))
     if not rows:
         typer.echo("No fields found with the given criteria.")
         raise typer.Exit(code=0)
@@ -188,5 +664,110 @@ def fields(
     typer.echo(f"Wrote {len(rows)} fields to: {uri}")
 
 
+@app.command("replay")
+def replay_cmd(
+        raw_dir: str = typer.Option(..., "--raw-dir", help="Folder of archived raw responses (searched recursively)."),
+        kind: str = typer.Option(..., "--kind", help="Request kind the responses belong to (history, data, ...)."),
+        out: str = typer.Option(..., "--out", help="Output URI."),
+        pattern: str = typer.Option("*.xml", "--pattern", help="Glob for raw response files."),
+        workers: int = typer.Option(0, "--workers", "-w", help="Normalizer processes; 0 = in-process."),
+        typed: bool = typer.Option(False, "--typed", help="Decode cells using --datatypes."),
+        datatypes: Optional[str] = typer.Option(None, "--datatypes", help="CSV from `bbg-dlws fields` (mnemonic, datatype)."),
+        append: bool = typer.Option(False, "--append", help="Append to an existing output."),
+        partitioned: bool = typer.Option(False, "--partitioned", help="One <out>.partNNNNN file per response."),
+        explode_bulk: bool = typer.Option(False, "--explode-bulk",
+                                          help="Write bulk array cells to <out root>.bulk.csv instead of inline."),
+        compression: str = typer.Option("none", "--compression", help="none, gzip or zstd (writes <out>.gz/.zst)."),
+):
+    """
+    Re-normalize archived raw responses (output.include_raw_xml) offline and
+    write them through the store for --out. Never calls DLWS.
+    """
+    if kind not in OP_HANDLERS:
+        raise typer.BadParameter(f"Unknown kind: {kind}", param_hint="--kind")
+    if typed and not datatypes:
+        raise typer.BadParameter("--typed needs --datatypes", param_hint="--datatypes")
+    if compression not in COMPRESSIONS:
+        raise typer.BadParameter(f"Unknown compression: {compression}", param_hint="--compression")
+
+    with TIMINGS.section("import pipeline"):
+        from .pipeline import NormalizeSpec, find_raw_files, replay
+
+    paths = find_raw_files(raw_dir, pattern)
+    if not paths:
+        typer.echo(f"No raw responses matching {pattern} under {raw_dir}.")
+        raise typer.Exit(code=0)
+
+    spec = NormalizeSpec(kind, [], typed=typed, datatypes=load_datatypes_from_csv(datatypes) if typed else None,
+                         bulk_uri=_bulk_table_uri(out) if explode_bulk else None)
+    written, failed = replay(
+        paths, spec, resolve_store(out, compression=compression), out, workers=workers, append=append,
+        partitioned=partitioned,
+    )
+    typer.echo(f"Wrote {written} rows from {len(paths) - len(failed)} response(s) to: {out}")
+    if failed:
+        typer.echo(f"{len(failed)} response(s) could not be replayed.", err=True)
+        raise typer.Exit(code=1)
+
+
+@app.command("watch")
+def watch(
+        config: str = typer.Option(..., "-c", "--config", help="Path to YAML configuration file (kind: data)."),
+        every: str = typer.Option("5m", "--every", help="Refresh interval, start to start (e.g. 30s, 5m, 1h)."),
+        out: Optional[str] = typer.Option(None, "--out", help="Delta output (default: <output.uri root>.delta.csv)."),
+        cycles: Optional[int] = typer.Option(None, "--cycles", min=1, help="Stop after this many refreshes."),
+):
+    """
+    Re-run a data request on a schedule with one warm client, and append
+    only the cells that changed since the previous refresh to the delta
+    output (observed_at, identifier, field, value, change). The first
+    refresh writes every cell as "new".
+    """
+    from .api import Workbench
+    from .watch import Watcher, parse_every
+
+    cfg = _load_config(config)
+    if cfg.request.kind != "data":
+        raise typer.BadParameter("watch only applies to request.kind: data", param_hint="--config")
+    try:
+        every_s = parse_every(every)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--every")
+    out = out or os.path.splitext(cfg.output.uri)[0] + ".delta.csv"
+    if is_sqlite_uri(out):
+        # the SQLite store upserts by identifier, which would collapse the delta log
+        raise typer.BadParameter("delta output must be a file, not a SQLite database", param_hint="--out")
+    store = _store(cfg, out)
+
+    with Workbench(cfg) as wb:
+        watcher = Watcher(wb, on_delta=lambda rows: store.write_rows_to_csv(out, rows, append=True))
+        typer.echo(f"Watching every {every_s:g}s; deltas -> {out}")
+        try:
+            watcher.run(every_s, cycles)
+        except KeyboardInterrupt:
+            typer.echo(f"Stopped after {watcher.cycles} cycle(s).")
+
+
+@app.command("snapshot")
+def snapshot(
+        db: str = typer.Option(..., "--db", help="SQLite output (*.sqlite / *.db) written by `run`."),
+        out: str = typer.Option(..., "--out", help="Output CSV path."),
+        identifier: List[str] = typer.Option([], "--id", help="Only these identifiers (repeatable); all rows, not just the latest."),
+):
+    """
+    Export the latest row per identifier from an upsert (SQLite) output, or
+    every row of the given --id identifiers.
+    """
+    if not is_sqlite_uri(db) or not os.path.exists(db):
+        raise typer.BadParameter(f"Not an existing SQLite output: {db}", param_hint="--db")
+    src = SqliteStore()
+    try:
+        rows = list(src.read(db, identifier) if identifier else src.latest(db))
+    finally:
+        src.close()
+    resolve_store(out).write_rows_to_csv(out, rows, append=False)
+    typer.echo(f"Wrote {len(rows)} rows to: {out}")
+
+
 if __name__ == "__main__":
     app()
@@ -1,6 +1,12 @@
 
+import hashlib
+import json
+import os
+import stat
+
+import yaml
 from pydantic import BaseModel, Field, HttpUrl, FilePath, PositiveInt
-from typing import List, Literal, Optional, Union
+from typing import Any, Iterator, List, Literal, Optional, Union
 
 class CertConfig(BaseModel):
     p12_path: FilePath
@@ -10,6 +16,8 @@ class ConnectionConfig(BaseModel):
     wsdl_url: HttpUrl = "https://service.bloomberg.com/assets/dl/dlws.wsdl"
     endpoint: HttpUrl
     cert: CertConfig
+    # HTTPS sessions shared by the fetch threads' requests (default: pipeline.fetch_workers)
+    max_sessions: Optional[PositiveInt] = None
 
 class CsvSourceConfig(BaseModel):
     path: FilePath
@@ -21,7 +29,7 @@ class CsvSourceConfig(BaseModel):
 class IdentifiersConfig(BaseModel):
     source: Literal["csv", "inline"] = "csv"
     csv: Optional[CsvSourceConfig] = None
-    inline: List[dict] = Field(default_factory=list)
+    inline: List[dict] = Field(default_factory=list)  # checked lazily by load_config (iter_inline_identifiers)
 
 class OverrideKV(BaseModel):
     name: str
@@ -47,17 +55,103 @@ class RequestConfig(BaseModel):
 class ChunkingConfig(BaseModel):
     enabled: bool = True
     max_identifiers_per_request: PositiveInt = 500
+    # input: chunks in identifier order, streamed. cost: regrouped into chunks of
+    # balanced estimated cost (run history), dispatched costliest first
+    order: Literal["input", "cost"] = "input"
 
 class PollingConfig(BaseModel):
     attempts: PositiveInt = 120
     interval_seconds: PositiveInt = 5
     per_attempt_timeout_seconds: PositiveInt = 15
+    # Retrieve timeouts from observed latency (3 × p99, capped at per_attempt_timeout_seconds),
+    # and a duplicate retrieve on another session once one runs past p95 (first reply wins)
+    adaptive_timeout: bool = False
+    hedge_retrieves: bool = False
+
+class SubmitConfig(BaseModel):
+    # Serialize headers/fields/overrides once per run; only <instruments> per chunk.
+    # Relies on zeep internals (verified with zeep 4.3); falls back to plain zeep if they change
+    prerender: bool = False
+
+class RateLimitConfig(BaseModel):
+    # Token buckets in front of every DLWS call (requests/second, burst)
+    enabled: bool = False
+    submit_per_second: float = Field(default=1.0, ge=0)    # 0 = unlimited
+    submit_burst: PositiveInt = 5
+    retrieve_per_second: float = Field(default=4.0, ge=0)
+    retrieve_burst: PositiveInt = 10
+    call_per_second: float = Field(default=1.0, ge=0)
+    call_burst: PositiveInt = 5
+    max_requests_per_day: Optional[PositiveInt] = None
+    max_cells_per_day: Optional[PositiveInt] = None      # identifiers × fields submitted
+    # Shared by every process on the host using the same file; None = per process
+    shared_path: Optional[str] = ".bbg-dlws/ratelimit.sqlite"
+
+class FailuresConfig(BaseModel):
+    # Retry transient errors, bisect batches on identifier errors, keep going
+    max_retries: int = Field(default=2, ge=0)
+    backoff_seconds: float = Field(default=5.0, ge=0)
+    backoff_factor: float = Field(default=2.0, ge=1)
+    bisect: bool = True
+    max_bisect_submits: int = Field(default=32, ge=0)  # extra submits per chunk spent isolating bad identifiers
+    on_failure: Literal["continue", "abort"] = "continue"
+    report_uri: Optional[str] = None  # default: <output.uri>.failures.json
+
+class PipelineConfig(BaseModel):
+    fetch_workers: PositiveInt = 1                   # chunks submitted/polled concurrently
+    normalize_workers: int = Field(default=0, ge=0)  # processes parsing raw responses; 0 = in-process
+    max_pending: Optional[PositiveInt] = None        # retrieved-but-unwritten responses (default 2 × normalize_workers)
+    partitioned_output: bool = False                 # one <uri>.partNNNNN file per chunk, written by the workers
+    spool_dir: Optional[str] = None                  # stream retrieve replies to files here and memory-map them
+    compact_rows: bool = False                       # history rows as shared-header tuples instead of dicts
 
 class OutputConfig(BaseModel):
     uri: str
     format: Literal["csv"] = "csv"
     include_raw_xml: bool = False
     append_mode: bool = False
+    # Decode cells into float/int/date/bool using getFields datatypes (e.g. a `bbg-dlws fields` CSV)
+    typed: bool = False
+    datatypes_file: Optional[FilePath] = None
+    # Bulk array fields: serialized into one cell, or exploded into a child table
+    # of (identifier, field, row, col, value) rows with "@<table name>" left in the cell
+    bulk_mode: Literal["inline", "explode"] = "inline"
+    bulk_uri: Optional[str] = None  # default: <output.uri root>.bulk.csv
+    # Files written as <uri>.gz / <uri>.zst (streaming, one frame per append) with a .sha256 sidecar
+    compression: Literal["none", "gzip", "zstd"] = "none"
+    compression_level: Optional[int] = None    # gzip 1-9 (6), zstd 1-22 (3)
+    compression_threads: Optional[int] = None  # zstd workers; None = all cores for large writes only
+
+class CatalogConfig(BaseModel):
+    # Local SQLite cache of getFields metadata (see `bbg-dlws fields`)
+    path: str = ".bbg-dlws/fields.sqlite"
+    ttl_hours: PositiveInt = 24
+    validate_fields: bool = False
+
+class ValidationConfig(BaseModel):
+    # Local checks run before any payload is built
+    enabled: bool = True
+    mode: Literal["warn", "fail", "quarantine"] = "warn"  # warn: log problems, submit everything as given
+    reject_uri: Optional[str] = None  # default: <output.uri>.rejects.csv
+    check_headers: bool = True        # validate headers against the WSDL types (live runs)
+
+class BackfillConfig(BaseModel):
+    # `bbg-dlws backfill`: history_params.daterange.period tiled into jobs
+    max_cells_per_job: PositiveInt = 1_000_000       # identifiers × fields × expected observations
+    partition_by: Literal["year", "month"] = "year"  # <output.uri root>.<YYYY[-MM]><ext>
+    checkpoint_path: str = ".bbg-dlws/backfill.sqlite"
+
+class QueueConfig(BaseModel):
+    # `bbg-dlws enqueue` / `bbg-dlws worker`: chunks shared by worker processes or hosts
+    path: str = ".bbg-dlws/queue.sqlite"  # SQLite file (one host), or a directory (shared filesystem)
+    lease_seconds: PositiveInt = 900      # a claimed chunk returns to the queue if not renewed for this long
+    max_attempts: PositiveInt = 3         # claims per chunk before it is marked failed
+    poll_seconds: float = Field(default=5.0, gt=0)
+
+class RunHistoryConfig(BaseModel):
+    # Per-chunk latency/size/poll trace of past runs, used by `bbg-dlws plan` estimates and `bbg-dlws stats`
+    enabled: bool = True
+    path: str = ".bbg-dlws/runs.sqlite"
 
 class LoggingConfig(BaseModel):
     level: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = "INFO"
@@ -68,5 +162,163 @@ class AppConfig(BaseModel):
     request: RequestConfig
     chunking: ChunkingConfig = ChunkingConfig()
     polling: PollingConfig = PollingConfig()
+    submit: SubmitConfig = SubmitConfig()
+    rate_limit: RateLimitConfig = RateLimitConfig()
+    failures: FailuresConfig = FailuresConfig()
+    pipeline: PipelineConfig = PipelineConfig()
     output: OutputConfig
     logging: LoggingConfig = LoggingConfig()
+    catalog: CatalogConfig = CatalogConfig()
+    validation: ValidationConfig = ValidationConfig()
+    backfill: BackfillConfig = BackfillConfig()
+    queue: QueueConfig = QueueConfig()
+    run_history: RunHistoryConfig = RunHistoryConfig()
+
+
+# ---------------- loading ----------------
+
+# The parsed request.identifiers.inline list of files at least this big is
+# cached as JSON, keyed by content; the rest of the file is parsed and
+# validated on every load, and nothing else (no secrets) is cached.
+# BBG_DLWS_CONFIG_CACHE names the cache directory, or turns the cache off ("off").
+CACHE_MIN_BYTES = 64 * 1024
+CACHE_DIR = ".bbg-dlws/config-cache"
+CACHE_VERSION = 2
+_INLINE_PATH = ("request", "identifiers", "inline")
+
+
+def load_yaml(data: Union[str, bytes]) -> Any:
+    # libyaml's C loader when PyYAML was built with it (several times faster)
+    return yaml.load(data, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+
+def validate_config(doc: Any) -> AppConfig:
+    """
+    AppConfig from a parsed document. request.identifiers.inline is kept as
+    parsed instead of being validated element by element; each identifier
+    is checked when it is read (iter_inline_identifiers).
+    """
+    ids = ((doc or {}).get("request") or {}).get("identifiers") if isinstance(doc, dict) else None
+    inline = ids.get("inline") if isinstance(ids, dict) else None
+    if not isinstance(inline, list):
+        return AppConfig.model_validate(doc)
+    doc = {**doc, "request": {**doc["request"], "identifiers": {**ids, "inline": []}}}
+    cfg = AppConfig.model_validate(doc)
+    cfg.request.identifiers.inline = inline
+    return cfg
+
+
+def _cache_path(data: bytes) -> Optional[str]:
+    cache_dir = os.environ.get("BBG_DLWS_CONFIG_CACHE", CACHE_DIR)
+    if len(data) < CACHE_MIN_BYTES or cache_dir.lower() in ("", "0", "off"):
+        return None
+    key = hashlib.sha256(data)
+    key.update(f"\0{CACHE_VERSION}".encode("utf-8"))
+    return os.path.join(cache_dir, key.hexdigest()[:32] + ".inline.json")
+
+
+def _private(path: str) -> bool:
+    # only trust cache files (and their folder) that no one else can write
+    try:
+        for p in (os.path.dirname(path) or ".", path):
+            st = os.stat(p)
+            if st.st_mode & (stat.S_IWGRP | stat.S_IWOTH) or (hasattr(os, "getuid") and st.st_uid != os.getuid()):
+                return False
+    except OSError:
+        return False
+    return True
+
+
+def _drop_inline(events: Iterator[yaml.Event]) -> Iterator[yaml.Event]:
+    """
+    Parser events of a document with request.identifiers.inline emptied, so
+    the rest of a large config can be loaded without building the list.
+    """
+    frames: List[List[Any]] = []  # per open collection: [is mapping, expecting a key, current key]
+    skip = 0
+
+    def consumed() -> None:
+        if frames and frames[-1][0]:
+            frames[-1][1] = True
+
+    for ev in events:
+        if skip:
+            if isinstance(ev, yaml.CollectionStartEvent):
+                skip += 1
+            elif isinstance(ev, yaml.CollectionEndEvent):
+                skip -= 1
+                if not skip:
+                    consumed()
+                    yield yaml.SequenceEndEvent()
+            continue
+        if frames and frames[-1][0] and frames[-1][1]:  # a mapping key
+            if isinstance(ev, yaml.MappingEndEvent):
+                frames.pop()
+                consumed()
+            elif isinstance(ev, yaml.ScalarEvent):
+                frames[-1][1:] = [False, ev.value]
+            else:
+                raise ValueError("complex mapping key")
+            yield ev
+            continue
+        if isinstance(ev, yaml.SequenceStartEvent) and all(f[0] for f in frames) \
+                and tuple(f[2] for f in frames) == _INLINE_PATH:
+            skip = 1
+            yield ev
+        elif isinstance(ev, yaml.CollectionStartEvent):
+            frames.append([isinstance(ev, yaml.MappingStartEvent), True, None])
+            yield ev
+        elif isinstance(ev, yaml.CollectionEndEvent):
+            frames.pop()
+            consumed()
+            yield ev
+        else:
+            if isinstance(ev, (yaml.ScalarEvent, yaml.AliasEvent)):
+                consumed()
+            yield ev
+
+
+def _inline_of(doc: Any) -> Any:
+    for key in _INLINE_PATH:
+        doc = doc.get(key) if isinstance(doc, dict) else None
+    return doc
+
+
+def _with_inline(doc: Any, inline: List[Any]) -> Any:
+    ids = doc["request"]["identifiers"]
+    return {**doc, "request": {**doc["request"], "identifiers": {**ids, "inline": inline}}}
+
+
+def load_config(path: str) -> AppConfig:
+    """
+    Read and validate a YAML config. For large files, the parsed inline
+    identifier list is cached and only the rest of the file is loaded.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    cache = _cache_path(data)
+    if cache and os.path.exists(cache) and _private(cache):
+        try:
+            with open(cache, encoding="utf-8") as f:
+                inline = json.load(f)
+            loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+            rest = load_yaml(yaml.emit(_drop_inline(yaml.parse(data, Loader=loader))))
+            if isinstance(inline, list) and _inline_of(rest) == []:
+                return validate_config(_with_inline(rest, inline))
+        except (ValueError, yaml.YAMLError, KeyError, TypeError):
+            pass  # stale, truncated or unusual layout: parse the whole file
+    doc = load_yaml(data)
+    inline = _inline_of(doc)
+    if cache and isinstance(inline, list):
+        try:
+            text = json.dumps(inline)
+            if json.loads(text) == inline:  # only plain data round-trips (no dates, non-string keys)
+                os.makedirs(os.path.dirname(cache), mode=0o700, exist_ok=True)
+                tmp = f"{cache}.{os.getpid()}.tmp"
+                fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(text)
+                os.replace(tmp, cache)
+        except (OSError, TypeError, ValueError):
+            pass
+    return validate_config(doc)
@@ -1,5 +1,5 @@
-
-from typing import Iterator, List, Dict
+import heapq
+from typing import Callable, Iterable, Iterator, List, Dict
 
 def chunk(items: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
     batch = []
@@ -10,3 +10,30 @@ def chunk(items: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
             batch = []
     if batch:
         yield batch
+
+
+def balanced_chunks(items: Iterable[Dict], size: int, cost: Callable[[Dict], float]) -> List[List[Dict]]:
+    """
+    Regroup items into as many chunks as chunk() would make (at most `size`
+    each) with balanced total cost: costliest item first, into the cheapest
+    chunk that has room. Chunks are returned costliest first, so that with
+    concurrent workers the long ones start early instead of ending the run
+    as stragglers (longest-processing-time-first). Items keep their input
+    order within a chunk. Needs the whole universe in memory.
+    """
+    items = list(items)
+    n_chunks = -(-len(items) // size)
+    if n_chunks <= 1:
+        return [items] if items else []
+    costs = [cost(x) for x in items]
+    members: List[List[int]] = [[] for _ in range(n_chunks)]
+    totals = [0.0] * n_chunks
+    heap = [(0.0, c) for c in range(n_chunks)]
+    for i in sorted(range(len(items)), key=lambda i: -costs[i]):
+        total, c = heapq.heappop(heap)
+        members[c].append(i)
+        totals[c] = total + costs[i]
+        if len(members[c]) < size:  # full chunks leave the heap
+            heapq.heappush(heap, (totals[c], c))
+    order = sorted(range(n_chunks), key=lambda c: -totals[c])
+    return [[items[i] for i in sorted(members[c])] for c in order]
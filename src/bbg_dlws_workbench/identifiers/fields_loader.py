@@ -1,9 +1,25 @@
 
+import logging
 from typing import List
 from pathlib import Path
 
-def load_fields(cfg) -> List[str]:
-    # cfg is FieldsConfig
+from ..catalog import validate_fields
+
+logger = logging.getLogger("bbg-dlws-workbench.fields")
+
+def load_fields(cfg, catalog=None, kind: str = "") -> List[str]:
+    # cfg is FieldsConfig; catalog is an optional FieldCatalog used to validate mnemonics
+    fields = _read_fields(cfg)
+    if catalog is not None:
+        if not len(catalog):
+            logger.warning("Field catalog is empty; skipping field validation (run `bbg-dlws fields` to fill it)")
+        else:
+            problems = validate_fields(catalog, fields, kind)
+            if problems:
+                raise ValueError("Field validation failed: " + "; ".join(problems))
+    return fields
+
+def _read_fields(cfg) -> List[str]:
     if cfg.file:
         p = Path(cfg.file)
         with p.open("r", encoding="utf-8") as f:
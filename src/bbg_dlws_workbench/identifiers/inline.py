@@ -0,0 +1,17 @@
+from typing import Any, Dict, Iterable, Iterator
+
+
+def iter_inline_identifiers(items: Iterable[Any], where: str = "request.identifiers.inline") -> Iterator[Dict]:
+    """
+    Identifier dicts from a config's inline list, checked one by one as they
+    are consumed (the list isn't validated up front with the rest of the config).
+    """
+    for i, x in enumerate(items):
+        if not isinstance(x, dict) or "id" not in x:
+            raise ValueError(f"{where}[{i}]: expected a mapping with an 'id', got {x!r}")
+        yield {
+            "id": x["id"],
+            "yellow_key": x.get("yellow_key", ""),
+            "type": x.get("type", ""),
+            "extras": x.get("extras", {}),
+        }
@@ -0,0 +1,6 @@
+
+from .executor import ChunkExecutor
+from .failures import FailurePolicy, FailureReport, is_transient
+from .stages import NormalizeSpec, RowBatch, normalize_response
+from .runner import Pipeline, partition_files, partition_uri, raw_uri
+from .replay import find_raw_files, replay
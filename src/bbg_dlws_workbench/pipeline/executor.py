@@ -0,0 +1,199 @@
+# src/bbg_dlws_workbench/pipeline/executor.py
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from ..soap.builder import build_payload, with_instruments
+from ..soap.latency import hedged_call
+from ..soap.poller import Poller, is_ready
+from ..soap.raw import RawResponse
+from ..soap.registry import OP_HANDLERS
+from ..soap.submitter import call_sync, get_response_by_id, remove_spooled, submit_envelope, submit_request
+from ..soap.templates import EnvelopeTemplate
+from ..stats.estimate import observations
+
+logger = logging.getLogger("bbg-dlws-workbench.executor")
+
+
+class ChunkExecutor:
+    """
+    Runs one batch of identifiers end to end: build payload, then
+    submit + poll (async kinds) or call (sync kinds). Returns the SOAP response.
+
+    The invariant part of the payload (headers, fields, overrides) is built once.
+    With prerender=True, submits go through an EnvelopeTemplate so only the
+    <instruments> fragment is serialized per chunk. With raw=True, retrieves
+    return a RawResponse (undecoded bytes) for out-of-process normalization;
+    with spool_dir as well, reply bodies are streamed to files in that folder.
+    Every DLWS call goes through `limiter` (a RateLimiter) when one is given,
+    and every chunk's size and latency is recorded in `history` (a RunHistory),
+    with its submit time, submit-to-ready latency and poll status codes;
+    `last_record` is this thread's latest record id, for RunHistory.record_rows.
+    With `latency` (a RetrieveLatency shared by the run's executors), retrieve
+    timeouts follow the observed latency and slow retrieves are hedged.
+    """
+
+    def __init__(
+            self,
+            client,
+            kind: str,
+            fields: List[str],
+            overrides: List[Dict],
+            params: Optional[Dict],
+            poller: Poller,
+            timeout: int,
+            prerender: bool = False,
+            raw: bool = False,
+            spool_dir: Optional[str] = None,
+            limiter=None,
+            history=None,
+            latency=None,
+    ):
+        self.client = client
+        self.kind = kind
+        self.fields = fields
+        self.overrides = overrides
+        self.params = params
+        self.poller = poller
+        self.timeout = timeout
+        self.raw = raw
+        self.spool_dir = spool_dir
+        self.prerender = prerender
+        self.limiter = limiter
+        self.history = history
+        self.latency = latency
+        self._local = threading.local()  # per fetch thread: last reply size, chunk trace and record id
+        self._obs = observations(kind, params)
+        self.op = OP_HANDLERS[kind]
+        self._base = build_payload(kind=kind, fields=fields, identifiers_batch=[], overrides=overrides, params=params)
+        self._template: Optional[EnvelopeTemplate] = None
+        if prerender and self.op["async"]:
+            try:
+                self._template = EnvelopeTemplate(client, kind, self._base)
+            except Exception as e:
+                logger.warning(f"Envelope template unavailable for {kind}, using zeep serialization: {e}")
+
+    def with_params(self, params: Optional[Dict]) -> "ChunkExecutor":
+        """
+        Same client, fields and settings with different op params (e.g. another daterange).
+        """
+        return ChunkExecutor(
+            self.client, self.kind, self.fields, self.overrides, params, self.poller, self.timeout,
+            prerender=self.prerender, raw=self.raw, spool_dir=self.spool_dir, limiter=self.limiter,
+            history=self.history, latency=self.latency,
+        )
+
+    def build(self, batch: List[Dict]) -> Dict[str, Any]:
+        if self.kind == "fundamentals_headers":
+            return self._base
+        return with_instruments(self._base, batch)
+
+    @property
+    def last_record(self) -> Optional[int]:
+        return getattr(self._local, "record", None)
+
+    def __call__(self, batch: List[Dict]) -> Any:
+        if self.history is None:
+            return self._execute(batch)
+        t0 = time.perf_counter()
+        ok = False
+        resp = None
+        trace = self._local.trace = {}
+        self._local.record = None
+        try:
+            resp = self._execute(batch)
+            ok = True
+            return resp
+        finally:
+            n_ids = len(batch)
+            self._local.record = self.history.record_chunk(
+                self.kind, n_ids, len(self.fields), n_ids * max(1, len(self.fields)) * self._obs,
+                time.perf_counter() - t0, self._response_bytes(resp), ok,
+                ids=[(str(x.get("id", "")), str(x.get("yellow_key", ""))) for x in batch if x], **trace,
+            )
+
+    def _response_bytes(self, resp: Any) -> Optional[int]:
+        if isinstance(resp, RawResponse):
+            return len(resp)
+        if self.latency is not None:
+            return getattr(self._local, "last_bytes", None)  # retrieved in a helper thread
+        # zeep-decoded: the transport remembers the size of this thread's last reply
+        return getattr(getattr(self.client, "transport", None), "last_response_bytes", None)
+
+    def _execute(self, batch: List[Dict]) -> Any:
+        if not self.op["async"]:
+            return call_sync(self.client, self.kind, self.build(batch), timeout=self.timeout, limiter=self.limiter)
+
+        trace = getattr(self._local, "trace", None) if self.history is not None else None
+        submitted_at, t0 = time.time(), time.perf_counter()
+        if self._template is not None and batch:
+            response_id = submit_envelope(self._template, batch, limiter=self.limiter)
+        else:
+            response_id = submit_request(self.client, self.kind, self.build(batch), limiter=self.limiter)
+        t_submitted = time.perf_counter()
+        statuses: Optional[List[str]] = None
+        if trace is not None:
+            statuses = []
+            trace.update(submitted_at=submitted_at, submit_seconds=t_submitted - t0, statuses=statuses)
+
+        def fetch():
+            if self.latency is not None:
+                return self._retrieve(response_id)
+            return get_response_by_id(
+                self.client, self.kind, response_id, timeout=self.timeout, raw=self.raw, spool_dir=self.spool_dir,
+                limiter=self.limiter,
+            )
+
+        try:
+            resp = self.poller.poll(fetch, statuses)
+        except BaseException:
+            if self.raw and self.spool_dir:
+                remove_spooled(self.spool_dir, response_id)  # the reply will never be used
+            raise
+        if trace is not None:
+            trace["ready_seconds"] = time.perf_counter() - t_submitted
+        return resp
+
+    def _retrieve(self, response_id: str) -> Any:
+        """
+        One retrieve attempt with the adaptive timeout; past the hedge delay,
+        a duplicate goes out on another pooled session and the first reply wins.
+        """
+        latency = self.latency
+        timeout = latency.timeout(self.timeout)
+        transport = getattr(self.client, "transport", None)
+
+        def attempt(hedge: bool):
+            t0 = time.perf_counter()
+            try:
+                resp = get_response_by_id(
+                    self.client, self.kind, response_id, timeout=timeout, raw=self.raw, spool_dir=self.spool_dir,
+                    limiter=self.limiter, spool_name=f"{response_id}.hedge.xml" if hedge else None,
+                )
+            except requests.Timeout:
+                latency.record_timeout(timeout)
+                raise
+            latency.record(time.perf_counter() - t0, ready=is_ready(resp))
+            return resp, getattr(transport, "last_response_bytes", None)
+
+        delay = latency.hedge_after()
+        if delay is None:
+            resp, self._local.last_bytes = attempt(False)
+            return resp
+        resp, self._local.last_bytes = hedged_call(
+            attempt, delay, ok=lambda r: r[0] is not None, discard=lambda r: _discard(r[0]),
+            on_hedge=latency.count_hedge,
+        )
+        return resp
+
+
+def _discard(resp: Any) -> None:
+    # the losing copy of a hedged retrieve
+    if isinstance(resp, RawResponse):
+        resp.close()
+        if resp.path and os.path.exists(resp.path):
+            os.remove(resp.path)
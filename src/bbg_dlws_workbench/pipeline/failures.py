@@ -0,0 +1,303 @@
+# src/bbg_dlws_workbench/pipeline/failures.py
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Generator, Iterator, List, Optional, Set, Tuple
+
+import requests
+from zeep.exceptions import Fault, TransportError
+
+from ..soap.poller import TerminalStatusError
+from ..soap.ratelimit import QuotaExceededError
+
+logger = logging.getLogger("bbg-dlws-workbench.failures")
+
+# Errors worth retrying as-is: network trouble or a job that never became ready.
+TRANSIENT_ERRORS = (requests.RequestException, TransportError, TimeoutError, ConnectionError)
+
+# Errors that may be caused by some of the batch's identifiers, isolated by
+# bisecting. Anything else (e.g. a missing responseId) fails the whole batch.
+BISECT_ERRORS = (TerminalStatusError, Fault)
+
+# Errors that stop the run outright: nothing about the batch can fix them
+FATAL_ERRORS = (QuotaExceededError,)
+
+# FailureReport reasons that don't make a chunk worth fetching again
+POISON_ONLY = {"poison"}
+
+
+def is_transient(exc: BaseException) -> bool:
+    return isinstance(exc, TRANSIENT_ERRORS)
+
+
+def _signature(exc: BaseException) -> Tuple[str, Any]:
+    # what makes two failures "the same": type plus status code or message
+    code = getattr(exc, "code", None)
+    return type(exc).__name__, code if code is not None else str(exc)
+
+
+class FailureReport:
+    """
+    Structured record of everything that could not be fetched in a run.
+    """
+
+    def __init__(self):
+        self.failures: List[Dict[str, Any]] = []
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.failures)
+
+    def add(self, chunk_idx: int, batch: List[Dict], exc: BaseException, attempts: int, reason: str) -> None:
+        entry = {
+            "chunk": chunk_idx,
+            "reason": reason,  # "poison" | "transient" | "batch"
+            "attempts": attempts,
+            "error_type": type(exc).__name__,
+            "error": str(exc),
+            "identifiers": [
+                {"id": x.get("id", ""), "yellow_key": x.get("yellow_key", ""), "type": x.get("type", "")}
+                for x in batch
+            ],
+        }
+        with self._lock:  # shared by fetch threads
+            self.failures.append(entry)
+
+    def has_chunk(self, chunk_idx: int) -> bool:
+        with self._lock:
+            return any(f["chunk"] == chunk_idx for f in self.failures)
+
+    def chunk_reasons(self, chunk_idx: int) -> Set[str]:
+        with self._lock:
+            return {f["reason"] for f in self.failures if f["chunk"] == chunk_idx}
+
+    def poison_only(self, chunk_idx: int) -> bool:
+        """
+        True when every failure of the chunk is an isolated identifier: the
+        rest of it was written, and fetching it again can't fix those.
+        """
+        return self.chunk_reasons(chunk_idx) <= POISON_ONLY
+
+    def discard_chunk(self, chunk_idx: int) -> None:
+        """
+        Forget a chunk's failures (it will be fetched again).
+        """
+        with self._lock:
+            self.failures = [f for f in self.failures if f["chunk"] != chunk_idx]
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "started_at": self.started_at,
+                "finished_at": datetime.now(timezone.utc).isoformat(),
+                "failed_identifiers": sum(len(f["identifiers"]) for f in self.failures),
+                "failures": self.failures,
+            },
+            indent=2,
+        )
+
+
+class FailurePolicy:
+    """
+    Decides what happens when a chunk fails:
+      - transient errors are retried with exponential backoff
+      - BISECT_ERRORS bisect the batch until the failing identifiers are
+        isolated; when both halves fail the same way a single identifier of
+        each is probed, and only if those fail too is the error taken to be
+        about the batch and the part fails as a whole. At most
+        `max_bisect_submits` extra submits are spent per chunk
+      - whatever still fails is recorded in the FailureReport; with
+        on_failure="abort" the error is re-raised instead
+      - FATAL_ERRORS (e.g. a local quota) are re-raised immediately
+    """
+
+    def __init__(
+            self,
+            max_retries: int = 2,
+            backoff_s: float = 5.0,
+            backoff_factor: float = 2.0,
+            bisect: bool = True,
+            on_failure: str = "continue",
+            sleep: Callable[[float], None] = time.sleep,
+            max_bisect_submits: int = 32,
+    ):
+        if on_failure not in ("continue", "abort"):
+            raise ValueError(f"Unsupported on_failure: {on_failure}")
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.backoff_factor = backoff_factor
+        self.bisect = bisect
+        self.max_bisect_submits = max_bisect_submits
+        self.on_failure = on_failure
+        self._sleep = sleep
+
+    @classmethod
+    def from_config(cls, cfg) -> "FailurePolicy":
+        # cfg is FailuresConfig
+        return cls(
+            max_retries=cfg.max_retries,
+            backoff_s=cfg.backoff_seconds,
+            backoff_factor=cfg.backoff_factor,
+            bisect=cfg.bisect,
+            on_failure=cfg.on_failure,
+            max_bisect_submits=cfg.max_bisect_submits,
+        )
+
+    def run(
+            self,
+            execute: Callable[[List[Dict]], Any],
+            batch: List[Dict],
+            chunk_idx: int,
+            report: FailureReport,
+    ) -> Iterator[Tuple[List[Dict], Any]]:
+        """
+        Yield (sub_batch, response) for every part of `batch` that succeeded.
+        Without failures that's exactly one item: (batch, response).
+        """
+        resp, exc, attempts = self._attempt(execute, batch, chunk_idx)
+        if exc is None:
+            yield batch, resp
+            return
+        state = {"budget": self.max_bisect_submits, "isolating": False}
+        yield from self._failed(execute, batch, exc, attempts, chunk_idx, report, state)
+
+    def _failed(
+            self,
+            execute: Callable[[List[Dict]], Any],
+            part: List[Dict],
+            exc: BaseException,
+            attempts: int,
+            chunk_idx: int,
+            report: FailureReport,
+            state: Dict[str, Any],
+    ) -> Iterator[Tuple[List[Dict], Any]]:
+        """
+        Handle a part that failed with `exc`: bisect it or report it.
+        `state` holds the chunk's remaining bisect submits ("budget") and whether
+        the error is known to come from identifiers ("isolating").
+        """
+        bisectable = self.bisect and len(part) > 1 and isinstance(exc, BISECT_ERRORS)
+        if bisectable and state["budget"] >= 2:
+            state["budget"] -= 2
+            mid = len(part) // 2
+            logger.warning(
+                f"Chunk {chunk_idx}: {type(exc).__name__} on {len(part)} identifiers; "
+                f"bisecting into {mid} + {len(part) - mid}"
+            )
+            first, second = part[:mid], part[mid:]
+            resp, e, a = self._attempt(execute, first, chunk_idx)
+            if e is None:
+                # the culprit is in the second half: bisect it without resubmitting it whole
+                state["budget"] += 1
+                yield first, resp
+                yield from self._failed(execute, second, exc, attempts, chunk_idx, report, state)
+                return
+            halves = [(first, resp, e, a), (second, *self._attempt(execute, second, chunk_idx))]
+            sig = _signature(exc)
+            if not state["isolating"] and all(e is not None and _signature(e) == sig for _, _, e, _ in halves):
+                halves = yield from self._probe(execute, part, exc, attempts, halves, chunk_idx, report, state)
+            for half, resp, e, a in halves:
+                if e is None:
+                    yield half, resp
+                else:
+                    yield from self._failed(execute, half, e, a, chunk_idx, report, state)
+            return
+        if bisectable:
+            logger.warning(f"Chunk {chunk_idx}: bisect budget ({self.max_bisect_submits} submits) used up")
+        if is_transient(exc):
+            reason = "transient"
+        elif len(part) == 1 and self.bisect and isinstance(exc, BISECT_ERRORS):
+            reason = "poison"
+        else:
+            reason = "batch"
+        logger.error(f"Chunk {chunk_idx}: giving up on {len(part)} identifier(s) ({reason}): {exc}")
+        self._give_up(part, exc, attempts, reason, chunk_idx, report)
+
+    def _probe(
+            self,
+            execute: Callable[[List[Dict]], Any],
+            part: List[Dict],
+            exc: BaseException,
+            attempts: int,
+            halves: List[Tuple[List[Dict], Any, Optional[BaseException], int]],
+            chunk_idx: int,
+            report: FailureReport,
+            state: Dict[str, Any],
+    ) -> Generator[Tuple[List[Dict], Any], None, List[Tuple[List[Dict], Any, Optional[BaseException], int]]]:
+        """
+        Both halves failed exactly like `part`: either the error is not about
+        identifiers (a bad field, ...) or each half holds a culprit. Submit the
+        first identifier of each half on its own until one passes; if none does
+        the whole part fails as "batch". Returns the halves left to handle.
+        """
+        sig = _signature(exc)
+        probes = []  # (response, error) per probed half; singletons failed on their own already
+        for half, _, e, _ in halves:
+            if len(half) == 1:
+                probes.append((None, e))
+                continue
+            if state["budget"] < 1:
+                return halves  # can't tell; plain bisecting runs out of budget anyway
+            state["budget"] -= 1
+            resp, pe, _ = self._attempt(execute, half[:1], chunk_idx)
+            probes.append((resp, pe))
+            if pe is None or _signature(pe) != sig:
+                break
+        else:
+            logger.error(f"Chunk {chunk_idx}: single identifiers fail with the same {type(exc).__name__}; "
+                         f"giving up on {len(part)} identifier(s) (batch): {exc}")
+            spent = sum(a for _, _, _, a in halves) + sum(len(h) > 1 for h, _, _, _ in halves)
+            self._give_up(part, exc, attempts + spent, "batch", chunk_idx, report)
+            return []
+        state["isolating"] = True
+        rest = []
+        for (half, resp, e, a), (probe_resp, pe) in zip(halves, probes):
+            if len(half) == 1:
+                rest.append((half, resp, e, a))
+                continue
+            head, tail = half[:1], half[1:]
+            if pe is None:
+                yield head, probe_resp
+                rest.append((tail, None, e, a))  # the culprit is in the tail
+            else:
+                yield from self._failed(execute, head, pe, 1, chunk_idx, report, state)
+                if state["budget"] >= 1:  # the tail may be clean: submit it again
+                    state["budget"] -= 1
+                    rest.append((tail, *self._attempt(execute, tail, chunk_idx)))
+                else:
+                    rest.append((tail, None, e, a))
+        return rest + halves[len(probes):]
+
+    def _give_up(self, part: List[Dict], exc: BaseException, attempts: int, reason: str, chunk_idx: int,
+                 report: FailureReport) -> None:
+        report.add(chunk_idx, part, exc, attempts, reason)
+        if self.on_failure == "abort":
+            raise exc
+
+    def _attempt(
+            self, execute: Callable[[List[Dict]], Any], part: List[Dict], chunk_idx: int
+    ) -> Tuple[Any, Optional[BaseException], int]:
+        """
+        Run one batch, retrying transient errors. Returns (response, None, attempts)
+        or (None, last_error, attempts).
+        """
+        delay = self.backoff_s
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return execute(part), None, attempt
+            except FATAL_ERRORS:
+                raise
+            except Exception as e:
+                if not is_transient(e) or attempt > self.max_retries:
+                    return None, e, attempt
+                logger.warning(
+                    f"Chunk {chunk_idx}: transient {type(e).__name__} (attempt {attempt}/{self.max_retries + 1}); "
+                    f"retrying in {delay:.1f}s"
+                )
+                self._sleep(delay)
+                delay *= self.backoff_factor
@@ -0,0 +1,133 @@
+# src/bbg_dlws_workbench/pipeline/replay.py
+import logging
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+from ..store.compression import EXTENSIONS
+from .runner import partition_uri
+from .stages import (
+    NormalizeSpec, RowBatch, append_bulk_part, normalize_response, normalize_to_batch, normalize_to_partition, open_raw,
+)
+
+logger = logging.getLogger("bbg-dlws-workbench.replay")
+
+_DIGITS = re.compile(r"(\d+)")
+
+
+def _natural_key(path: str):
+    # out.csv.chunk2.xml before out.csv.chunk10.xml
+    return [int(p) if p.isdigit() else p for p in _DIGITS.split(path)]
+
+
+def find_raw_files(raw_dir: str, pattern: str = "*.xml") -> List[str]:
+    """
+    Archived raw responses under `raw_dir` (recursively), in natural order,
+    including compressed archives (<pattern>.gz / .zst).
+    """
+    if not os.path.isdir(raw_dir):
+        raise FileNotFoundError(f"Raw directory not found: {raw_dir}")
+    paths = {
+        str(p)
+        for pat in (pattern, *(pattern + ext for ext in EXTENSIONS.values()))
+        for p in Path(raw_dir).rglob(pat)
+        if p.is_file() and not p.name.endswith(".part")
+    }
+    return sorted(paths, key=_natural_key)
+
+
+def replay(
+        paths: Iterable[str],
+        spec: NormalizeSpec,
+        store,
+        uri: str,
+        workers: int = 0,
+        append: bool = False,
+        partitioned: bool = False,
+        max_pending: int = 0,
+) -> Tuple[int, List[Tuple[str, str]]]:
+    """
+    Re-normalize archived raw responses and write them to `uri` through `store`.
+
+    With `workers` > 0 files are parsed in a process pool (each worker maps
+    the file itself); output order follows `paths` either way. At most
+    `max_pending` (default 2 × workers) files are in flight. A file that
+    fails to parse is skipped and reported. Exploded bulk cells (spec.bulk_uri)
+    are collected as in Pipeline.
+    Returns (rows written, [(path, error), ...]).
+    """
+    workers = max(0, workers)
+    max_pending = max_pending or max(2 * workers, 1)
+    written = 0
+    files = 0
+    failed: List[Tuple[str, str]] = []
+    started = time.perf_counter()
+    bulk_append = append
+
+    def bulk_part(idx: int):
+        return partition_uri(spec.bulk_uri, idx) if spec.bulk_uri else None
+
+    def submit(pool, idx: int, path: str) -> Future:
+        target = partition_uri(uri, idx) if partitioned else None
+        if pool is not None:
+            if target:
+                return pool.submit(normalize_to_partition, spec, path, target, bulk_part(idx),
+                                   getattr(store, "options", None))
+            return pool.submit(normalize_to_batch, spec, path, bulk_part(idx))
+        fut: Future = Future()
+        raw = open_raw(path)
+        try:
+            rows = list(normalize_response(spec, raw, bulk_part(idx)))
+            if target:
+                store.write_rows_to_csv(target, rows, append=False)
+                fut.set_result(len(rows))
+            else:
+                fut.set_result(rows)
+        except Exception as e:
+            fut.set_exception(e)
+        finally:
+            raw.close()
+        return fut
+
+    pool_cm = ProcessPoolExecutor(workers) if workers else nullcontext()
+    with pool_cm as pool:
+        pending: "deque[Tuple[int, str, Future]]" = deque()
+
+        def drain(limit: int) -> None:
+            nonlocal written, append, bulk_append
+            while len(pending) > limit:
+                idx, path, fut = pending.popleft()
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    logger.error(f"Could not replay {path}: {type(e).__name__}: {e}")
+                    failed.append((path, f"{type(e).__name__}: {e}"))
+                    continue
+                if isinstance(result, int):
+                    written += result
+                    continue
+                rows = list(result.iter_rows()) if isinstance(result, RowBatch) else result
+                store.write_rows_to_csv(uri, rows, append=append)
+                if rows:
+                    append = True
+                written += len(rows)
+                if spec.bulk_uri and append_bulk_part(bulk_part(idx), spec.bulk_uri, bulk_append):
+                    bulk_append = True
+
+        for idx, path in enumerate(paths, start=1):
+            files = idx
+            pending.append((idx, path, submit(pool, idx, path)))
+            drain(max_pending)
+        drain(0)
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"Replayed {files - len(failed)}/{files} file(s) into {written} row(s) in {elapsed:.2f}s"
+        + (f" ({written / elapsed:,.0f} rows/s)" if elapsed > 0 else "")
+    )
+    return written, failed
@@ -0,0 +1,294 @@
+# src/bbg_dlws_workbench/pipeline/runner.py
+import glob
+import json
+import logging
+import os
+import queue
+import re
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..soap.raw import RawResponse
+from .executor import ChunkExecutor
+from .failures import FailurePolicy, FailureReport
+from .stages import (
+    NormalizeSpec, RowBatch, append_bulk_part, normalize_response, normalize_to_batch, normalize_to_partition,
+)
+
+logger = logging.getLogger("bbg-dlws-workbench.pipeline")
+
+_DONE = object()
+
+
+def partition_uri(uri: str, chunk_idx: int, part: int = 1) -> str:
+    """
+    <root>.part00012<ext>, or <root>.part00012-2<ext> for the 2nd sub-batch of a bisected chunk.
+    """
+    root, ext = os.path.splitext(uri)
+    return f"{root}.part{chunk_idx:05d}{f'-{part}' if part > 1 else ''}{ext}"
+
+
+def partition_files(uri: str, chunk_idx: int) -> List[str]:
+    """
+    Existing partition files of a chunk (all its sub-batches), in part order.
+    """
+    ext = os.path.splitext(uri)[1]
+    first = partition_uri(uri, chunk_idx)
+    parts = glob.glob(glob.escape(os.path.splitext(first)[0]) + "-*" + ext)
+    parts.sort(key=lambda p: int(re.search(r"-(\d+)" + re.escape(ext) + "$", p).group(1)))
+    return ([first] if os.path.exists(first) else []) + parts
+
+
+def raw_uri(uri: str, chunk_idx: int, part: int = 1) -> str:
+    suffix = f".chunk{chunk_idx}" if chunk_idx > 1 else ""
+    suffix += f".{part}.xml" if part > 1 else ".xml"
+    return uri + suffix
+
+
+class Pipeline:
+    """
+    fetch → normalize → write.
+
+    `fetch_workers` threads pull chunks from the batch iterator and run them
+    through the FailurePolicy, each with its own ChunkExecutor (and client).
+    Responses are normalized either in the fetch thread or, with
+    `normalize_workers` > 0, as raw bytes in a process pool; worker processes
+    return columnar RowBatches or, with `partitioned`, write their own
+    partition files. The calling thread is the single writer to the output.
+
+    At most `max_pending` responses are retrieved-but-not-written at any time;
+    fetch threads block until the writer catches up.
+
+    Responses spooled to disk (RawResponse.path) are handed to the workers by
+    path; once written, the spool file is moved into the raw archive
+    (`include_raw`) or deleted.
+
+    `on_chunk_done(idx, ok)` is called from the writer once every part of a
+    chunk has been written; ok is False if any part ended in the FailureReport.
+    The rows of each response are added to the executor's run history record.
+
+    With spec.bulk_uri, normalizers stream bulk array cells to a child-table
+    piece per response (partition_uri of spec.bulk_uri), which the writer
+    appends to spec.bulk_uri after the response's rows, or leaves in place
+    with `partitioned`.
+    """
+
+    def __init__(
+            self,
+            make_executor: Callable[[], ChunkExecutor],
+            policy: FailurePolicy,
+            report: FailureReport,
+            spec: NormalizeSpec,
+            store,
+            uri: str,
+            append: bool = False,
+            fetch_workers: int = 1,
+            normalize_workers: int = 0,
+            max_pending: Optional[int] = None,
+            include_raw: bool = False,
+            partitioned: bool = False,
+            on_chunk_done: Optional[Callable[[int, bool], None]] = None,
+    ):
+        self.make_executor = make_executor
+        self.policy = policy
+        self.report = report
+        self.spec = spec
+        self.store = store
+        self.uri = uri
+        self.append = append
+        self.fetch_workers = max(1, fetch_workers)
+        self.normalize_workers = max(0, normalize_workers)
+        self.max_pending = max_pending or max(2 * self.normalize_workers, 2)
+        self.include_raw = include_raw
+        self.partitioned = partitioned
+        self.on_chunk_done = on_chunk_done
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(self.max_pending)
+        self._out: "queue.Queue[Any]" = queue.Queue()
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+        self._batches: Any = None
+        self._bulk_append = append
+        self._records: Dict[Tuple[int, int], Tuple[Any, int]] = {}  # (idx, part) -> (RunHistory, record id)
+
+    def run(self, batches: Iterable[List[Dict]]) -> int:
+        """
+        Process every batch; returns the number of rows written.
+        Re-raises the first error that stopped the run (failures handled by the
+        policy don't count as errors).
+        """
+        return self.run_jobs((idx, batch, None) for idx, batch in enumerate(batches, start=1))
+
+    def run_jobs(self, jobs: Iterable[Tuple[int, List[Dict], Optional[Dict]]]) -> int:
+        """
+        Like run(), for (chunk_idx, batch, params) jobs: chunk numbers are the
+        caller's, and params (when not None) replace the executor's op params
+        for that batch (see ChunkExecutor.with_params).
+        """
+        self._batches = iter(jobs)
+        pool_cm = ProcessPoolExecutor(self.normalize_workers) if self.normalize_workers else nullcontext()
+        with pool_cm as pool:
+            threads = [
+                threading.Thread(target=self._fetch_loop, args=(pool,), name=f"bbg-fetch-{i}", daemon=True)
+                for i in range(self.fetch_workers)
+            ]
+            for t in threads:
+                t.start()
+            written = self._write_loop(len(threads))
+            for t in threads:
+                t.join()
+        if self._errors:
+            raise self._errors[0]
+        return written
+
+    # ---------------- fetch side (worker threads) ----------------
+
+    def _executor(self, params: Optional[Dict]) -> ChunkExecutor:
+        ex = getattr(self._local, "executor", None)
+        if ex is None:
+            ex = self._local.executor = self.make_executor()
+            self._local.variants = {}
+        if params is None:
+            return ex
+        key = json.dumps(params, sort_keys=True, default=str)
+        variant = self._local.variants.get(key)
+        if variant is None:
+            variant = self._local.variants[key] = ex.with_params(params)
+        return variant
+
+    def _fetch_loop(self, pool: Optional[ProcessPoolExecutor]) -> None:
+        try:
+            while not self._stop.is_set():
+                with self._lock:
+                    nxt = next(self._batches, None)
+                if nxt is None:
+                    break
+                idx, batch, params = nxt
+                executor = self._executor(params)
+                for part, (_, resp) in enumerate(self.policy.run(executor, batch, idx, self.report), start=1):
+                    self._slots.acquire()  # backpressure: wait for the writer
+                    if self.include_raw and not getattr(resp, "path", None):
+                        self._save_raw(idx, part, resp)
+                    record = getattr(executor, "last_record", None)
+                    if record is not None:
+                        self._records[(idx, part)] = (executor.history, record)
+                    self._out.put((self._dispatch(pool, idx, part, resp), idx, part, resp))
+                if self.on_chunk_done is not None:
+                    # queued behind this chunk's parts, so the writer sees it after they're written
+                    self._out.put((None, idx, 0, not self.report.has_chunk(idx)))
+        except BaseException as e:
+            logger.error(f"Fetch worker stopped: {type(e).__name__}: {e}")
+            self._errors.append(e)
+            self._stop.set()
+        finally:
+            self._out.put(_DONE)
+
+    def _save_raw(self, idx: int, part: int, resp: Any) -> None:
+        text = bytes(resp.content).decode("utf-8") if isinstance(resp, RawResponse) else str(resp)
+        self.store.write_text(raw_uri(self.uri, idx, part), text)
+
+    def _release(self, idx: int, part: int, resp: Any) -> None:
+        # Done with a spooled response: unmap it, then archive or delete the file
+        if not isinstance(resp, RawResponse):
+            return
+        resp.close()
+        if not resp.path or not os.path.exists(resp.path):
+            return
+        if self.include_raw:
+            self.store.put_file(raw_uri(self.uri, idx, part), resp.path)
+        else:
+            os.remove(resp.path)
+
+    def _bulk_part(self, idx: int, part: int) -> Optional[str]:
+        return partition_uri(self.spec.bulk_uri, idx, part) if self.spec.bulk_uri else None
+
+    def _dispatch(self, pool: Optional[ProcessPoolExecutor], idx: int, part: int, resp: Any) -> Future:
+        target = partition_uri(self.uri, idx, part) if self.partitioned else None
+        bulk_part = self._bulk_part(idx, part)
+        if pool is not None and isinstance(resp, RawResponse):
+            source = resp.path or bytes(resp.content)
+            if target:
+                return pool.submit(normalize_to_partition, self.spec, source, target, bulk_part,
+                                   getattr(self.store, "options", None))
+            return pool.submit(normalize_to_batch, self.spec, source, bulk_part)
+
+        # In-thread normalization (zeep objects, or no process pool)
+        fut: Future = Future()
+        try:
+            rows = list(normalize_response(self.spec, resp, bulk_part))
+            if target:
+                self.store.write_rows_to_csv(target, rows, append=False)
+                fut.set_result(len(rows))
+            else:
+                fut.set_result(rows)
+        except BaseException as e:
+            fut.set_exception(e)
+        return fut
+
+    # ---------------- write side (calling thread) ----------------
+
+    def _write_loop(self, producers: int) -> int:
+        done = 0
+        written = 0
+        append = self.append
+        while done < producers:
+            item = self._out.get()
+            if item is _DONE:
+                done += 1
+                continue
+            fut, idx, part, resp = item
+            if fut is None:
+                if not self._stop.is_set():
+                    self._chunk_done(idx, resp)
+                continue
+            try:
+                if self._stop.is_set():
+                    fut.cancel()
+                    continue
+                result = fut.result()
+                self._record_rows(idx, part, result if isinstance(result, int) else len(result))
+                if isinstance(result, int):
+                    written += result  # already written to a partition
+                    continue
+                if isinstance(result, RowBatch) and not getattr(self.store, "accepts_row_batches", False):
+                    result = list(result.iter_rows())
+                rows = result
+                self.store.write_rows_to_csv(self.uri, rows, append=append)
+                append = True  # subsequent chunks append
+                written += len(rows)
+                if self.spec.bulk_uri and append_bulk_part(self._bulk_part(idx, part), self.spec.bulk_uri,
+                                                           self._bulk_append):
+                    self._bulk_append = True
+            except BaseException as e:
+                logger.error(f"Normalize/write failed: {type(e).__name__}: {e}")
+                self._errors.append(e)
+                self._stop.set()
+            finally:
+                try:
+                    self._release(idx, part, resp)
+                except OSError as e:
+                    logger.warning(f"Could not clean up spooled response of chunk {idx}: {e}")
+                self._slots.release()
+        return written
+
+    def _record_rows(self, idx: int, part: int, rows: int) -> None:
+        record = self._records.pop((idx, part), None)
+        if record is None:
+            return
+        history, record_id = record
+        try:
+            history.record_rows(record_id, rows)
+        except Exception as e:
+            logger.warning(f"Could not record rows of chunk {idx} in the run history: {e}")
+
+    def _chunk_done(self, idx: int, ok: bool) -> None:
+        try:
+            self.on_chunk_done(idx, ok)
+        except BaseException as e:
+            logger.error(f"on_chunk_done failed for chunk {idx}: {type(e).__name__}: {e}")
+            self._errors.append(e)
+            self._stop.set()
@@ -0,0 +1,184 @@
+# src/bbg_dlws_workbench/pipeline/stages.py
+import csv
+import os
+import shutil
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Union
+
+from ..soap.raw import RawResponse
+from ..store import read_bytes, resolve_store
+from ..store.compression import compression_of
+from ..transform.decode import decode_rows
+from ..transform.normalize import iter_bulk_cells, soap_to_rows
+from ..transform.xml_reader import parse_response_xml
+
+
+class NormalizeSpec:
+    """
+    Everything a normalizer needs besides the response itself.
+    Plain attributes only, so it pickles cheaply into worker processes.
+    """
+
+    def __init__(self, kind: str, fields: List[str], typed: bool = False, datatypes: Optional[Dict[str, str]] = None,
+                 bulk_uri: Optional[str] = None, compact: bool = False):
+        self.kind = kind
+        self.fields = fields
+        self.typed = typed
+        self.datatypes = datatypes or {}
+        # explode bulk arrays into this child table (see BulkTableWriter)
+        self.bulk_uri = bulk_uri
+        # history rows as CompactRows (shared header + value tuple) instead of dicts
+        self.compact = compact
+
+    @property
+    def bulk_ref(self) -> str:
+        """
+        Value left in the main row for an exploded bulk field.
+        """
+        return "@" + os.path.basename(self.bulk_uri or "")
+
+
+BULK_COLUMNS = ("identifier", "field", "row", "col", "value")
+
+
+class BulkTableWriter:
+    """
+    bulk_sink for soap_to_rows: streams every cell of a bulk array field to
+    a CSV child table as one (identifier, field, row, col, value) row, and
+    returns `ref` for the main row. Nothing is buffered beyond the csv
+    writer; the file is created on the first bulk field.
+    """
+
+    def __init__(self, uri: str, ref: str):
+        self.uri = uri
+        self.ref = ref
+        self.cells = 0
+        self._f = None
+        self._writer = None
+
+    def __call__(self, identifier: str, field: str, bulk: Any) -> str:
+        if self._f is None:
+            os.makedirs(os.path.dirname(self.uri) or ".", exist_ok=True)
+            self._f = open(self.uri, "w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._f)
+            self._writer.writerow(BULK_COLUMNS)
+        for row, col, value in iter_bulk_cells(bulk):
+            self._writer.writerow((identifier, field, row, col, value))
+            self.cells += 1
+        return self.ref
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+def append_bulk_part(part_uri: str, table_uri: str, append: bool) -> bool:
+    """
+    Move the child rows a normalizer wrote to `part_uri` into the child
+    table (block copy, header kept only when the table is (re)started).
+    Returns True if there was a part file.
+    """
+    if not os.path.exists(part_uri):
+        return False
+    os.makedirs(os.path.dirname(table_uri) or ".", exist_ok=True)
+    if not append or not os.path.exists(table_uri):
+        shutil.move(part_uri, table_uri)
+        return True
+    with open(part_uri, "rb") as src, open(table_uri, "ab") as dst:
+        src.readline()  # header
+        shutil.copyfileobj(src, dst)
+    os.remove(part_uri)
+    return True
+
+
+class RowBatch:
+    """
+    Normalized rows of one response in columnar form: one list per column,
+    columns in first-seen order, None where a row had no value.
+    """
+
+    __slots__ = ("columns", "length")
+
+    def __init__(self, columns: Dict[str, List[Any]], length: int):
+        self.columns = columns
+        self.length = length
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]]) -> "RowBatch":
+        columns: Dict[str, List[Any]] = {}
+        n = 0
+        for row in rows:
+            for k, v in row.items():
+                col = columns.get(k)
+                if col is None:
+                    col = columns[k] = [None] * n
+                col.append(v)
+            n += 1
+            for col in columns.values():
+                if len(col) < n:
+                    col.append(None)
+        return cls(columns, n)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def iter_rows(self) -> Iterator[Dict[str, Any]]:
+        names = list(self.columns)
+        cols = [self.columns[k] for k in names]
+        for i in range(self.length):
+            yield {k: c[i] for k, c in zip(names, cols)}
+
+
+def normalize_response(spec: NormalizeSpec, response: Any, bulk_part: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Rows for one response, either a zeep object or a RawResponse.
+    With spec.bulk_uri, bulk array cells are streamed to `bulk_part` (this
+    response's piece of the child table) as the rows are produced.
+    """
+    if isinstance(response, RawResponse):
+        response = parse_response_xml(response.content)
+    sink = BulkTableWriter(bulk_part, spec.bulk_ref) if spec.bulk_uri and bulk_part else None
+    try:
+        rows = soap_to_rows(spec.kind, response, spec.fields, bulk_as_list=spec.typed, bulk_sink=sink,
+                            compact=spec.compact)
+        if spec.typed:
+            rows = decode_rows(rows, spec.datatypes)
+        yield from rows
+    finally:
+        if sink is not None:
+            sink.close()
+
+
+# ---------------- process-pool entry points (module level so they pickle) ----------------
+# `source` is either the reply bytes or the path of a spooled reply, which the
+# worker memory-maps itself so the body never crosses the process boundary.
+
+def open_raw(source: Union[bytes, str]) -> RawResponse:
+    if not isinstance(source, str):
+        return RawResponse(source)
+    if compression_of(source) != "none":
+        return RawResponse(read_bytes(source))  # compressed archive (replay)
+    return RawResponse.from_file(source)
+
+def normalize_to_batch(spec: NormalizeSpec, source: Union[bytes, str], bulk_part: Optional[str] = None) -> RowBatch:
+    raw = open_raw(source)
+    try:
+        return RowBatch.from_rows(normalize_response(spec, raw, bulk_part))
+    finally:
+        raw.close()
+
+
+def normalize_to_partition(spec: NormalizeSpec, source: Union[bytes, str], uri: str,
+                           bulk_part: Optional[str] = None, store_options: Optional[Dict] = None) -> int:
+    """
+    Normalize and write straight to a partition file from the worker process,
+    through a store built with `store_options` (e.g. compression).
+    Returns the number of rows written.
+    """
+    raw = open_raw(source)
+    try:
+        rows = list(normalize_response(spec, raw, bulk_part))
+    finally:
+        raw.close()
+    resolve_store(uri, **(store_options or {})).write_rows_to_csv(uri, rows, append=False)
+    return len(rows)
@@ -86,3 +86,13 @@ def build_payload(
         return {"criteria": criteria}
 
     raise ValueError(f"Unsupported kind: {kind}")
+
+
+def with_instruments(base_payload: Dict[str, Any], identifiers_batch: List[Dict]) -> Dict[str, Any]:
+    """
+    Reuse a payload built once per run (headers/fields/overrides) for another
+    batch of identifiers; only the instruments are rebuilt.
+    """
+    payload = dict(base_payload)
+    payload["instruments"] = _build_instruments(identifiers_batch)
+    return payload
@@ -1,10 +1,27 @@
 
+import threading
+
 from zeep import Client, Settings
-from zeep.transports import Transport
-from .transport import build_session_with_p12
+from .pool import SessionPool
+from .transport import DlwsTransport, build_session_with_p12, p12_ssl_context
+
+def create_client(wsdl_url: str, p12_path: str, p12_password: str, max_sessions: int = 1) -> Client:
+    """
+    zeep Client that threads may share: per-call timeouts and spooling are
+    per thread (DlwsTransport), and each request checks out one of up to
+    `max_sessions` HTTPS sessions. The sessions share one TLS context,
+    loaded from the p12 file when the first one is created.
+    """
+    lock = threading.Lock()
+    context = []
+
+    def make_session():
+        with lock:
+            if not context:
+                context.append(p12_ssl_context(p12_path, p12_password))
+        return build_session_with_p12(p12_path, p12_password, ssl_context=context[0])
 
-def create_client(wsdl_url: str, p12_path: str, p12_password: str) -> Client:
-    session = build_session_with_p12(p12_path, p12_password)
-    transport = Transport(session=session, operation_timeout=30)
+    sessions = SessionPool(make_session, size=max_sessions)
+    transport = DlwsTransport(sessions=sessions, operation_timeout=30)
     settings = Settings(strict=False, xml_huge_tree=True)
     return Client(wsdl=wsdl_url, transport=transport, settings=settings)
@@ -1,5 +1,5 @@
 # fields_criteria.py
-from typing import List, Any
+from typing import List, Any, Optional
 
 # Exact enums per your WSDL
 VALID_SECTORS = {
@@ -53,19 +53,22 @@ CATEGORY_ALIASES = {
     # Note: "Market Data" is NOT in the enum → will be dropped
 }
 
-def _normalize_sectors(sectors: List[str]) -> List[str]:
+def normalize_sector(sector: str) -> Optional[str]:
+    # WSDL MarketSector value for a sector or alias ("fx" -> "Curncy"); None if it isn't one
+    key = (sector or "").strip()
+    norm = SECTOR_ALIASES.get(key.lower(), key)
+    return norm if norm in VALID_SECTORS else None
+
+def normalize_sectors(sectors: List[str]) -> List[str]:
     out: List[str] = []
     for s in sectors:
-        if not s:
-            continue
-        key = s.strip()
-        norm = SECTOR_ALIASES.get(key.lower(), key)
-        if norm in VALID_SECTORS:
+        norm = normalize_sector(s) if s else None
+        if norm:
             out.append(norm)
     # respect maxOccurs=10
     return out[:10]
 
-def _normalize_categories(categories: List[str]) -> List[str]:
+def normalize_categories(categories: List[str]) -> List[str]:
     out: List[str] = []
     for c in categories:
         if not c:
@@ -81,8 +84,8 @@ def build_fields_criteria_zeep(client, categories: List[str], sectors: List[str]
     FieldSearchCriteria = client.get_type("ns0:FieldSearchCriteria")
 
     kwargs = {}
-    cats = _normalize_categories(categories)
-    secs = _normalize_sectors(sectors)
+    cats = normalize_categories(categories)
+    secs = normalize_sectors(sectors)
 
     if keywords:
         kwargs["keyword"] = " ".join(k for k in keywords if k).strip() or None
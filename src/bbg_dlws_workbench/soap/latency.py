@@ -0,0 +1,148 @@
+# src/bbg_dlws_workbench/soap/latency.py
+import logging
+import queue
+import threading
+from collections import deque
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger("bbg-dlws-workbench.latency")
+
+MIN_SAMPLES = 20        # completed retrieves before percentiles are trusted
+TIMEOUT_FACTOR = 3.0    # adaptive timeout = factor × p99
+MIN_TIMEOUT_S = 2.0
+HEDGE_QUANTILE = 0.95
+
+
+class RetrieveLatency:
+    """
+    Durations of completed retrieve calls over sliding windows, shared by
+    the fetch threads of a run, and what follows from them. Replies that
+    carried the result ("ready") are kept apart from the small not-ready
+    poll replies, which are far more frequent and far faster:
+
+      - timeout(cap): per-attempt timeout of TIMEOUT_FACTOR × p99 of the
+        slower window, kept within [MIN_TIMEOUT_S, cap]; `cap` (the
+        configured timeout) until MIN_SAMPLES retrieves have completed, or
+        when not `adaptive`. Timed-out attempts count at their timeout, so
+        when the service slows down the timeout grows with it.
+      - hedge_after(): p95 of ready replies, after which a retrieve still
+        running gets a duplicate on another session (None when not
+        `hedge`, or too early)
+
+    requests' timeout bounds the wait for each read, not the whole
+    download, so large replies that keep streaming are not cut short.
+    """
+
+    def __init__(self, adaptive: bool = True, hedge: bool = False, window: int = 256):
+        self.adaptive = adaptive
+        self.hedge = hedge
+        self._ready: "deque[float]" = deque(maxlen=window)
+        self._pending: "deque[float]" = deque(maxlen=window)  # not-ready replies and timeouts
+        self._lock = threading.Lock()
+        self.hedges = 0      # duplicates sent
+        self.hedge_wins = 0  # duplicates that answered first
+
+    @classmethod
+    def from_config(cls, cfg) -> Optional["RetrieveLatency"]:
+        # cfg is PollingConfig
+        if not (cfg.adaptive_timeout or cfg.hedge_retrieves):
+            return None
+        return cls(adaptive=cfg.adaptive_timeout, hedge=cfg.hedge_retrieves)
+
+    def record(self, seconds: float, ready: bool = True) -> None:
+        with self._lock:
+            (self._ready if ready else self._pending).append(seconds)
+
+    def record_timeout(self, timeout: float) -> None:
+        self.record(timeout, ready=False)
+
+    def percentile(self, q: float, ready: bool = True) -> Optional[float]:
+        with self._lock:
+            samples = self._ready if ready else self._pending
+            if len(samples) < MIN_SAMPLES:
+                return None
+            ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def timeout(self, cap: float) -> float:
+        if not self.adaptive:
+            return cap
+        p99s = [p for p in (self.percentile(0.99), self.percentile(0.99, ready=False)) if p is not None]
+        if not p99s:
+            return cap
+        return min(cap, max(MIN_TIMEOUT_S, TIMEOUT_FACTOR * max(p99s)))
+
+    def hedge_after(self) -> Optional[float]:
+        return self.percentile(HEDGE_QUANTILE) if self.hedge else None
+
+    def count_hedge(self, won: bool) -> None:
+        with self._lock:
+            self.hedges += 1
+            self.hedge_wins += won
+
+
+def hedged_call(
+        call: Callable[[bool], Any],
+        delay: float,
+        ok: Callable[[Any], bool] = lambda r: r is not None,
+        discard: Callable[[Any], None] = lambda r: None,
+        on_hedge: Callable[[bool], None] = lambda won: None,
+) -> Any:
+    """
+    Run call(False); if it hasn't returned after `delay` seconds, also run
+    call(True). The first result for which ok() holds is returned; a result
+    from the other call that arrives later is handed to discard(). When
+    neither succeeds, the first call's outcome (result or exception) wins.
+    Only for idempotent calls. on_hedge(won) reports each duplicate sent.
+    """
+    results: "queue.Queue[tuple]" = queue.Queue()
+
+    def run(hedge: bool) -> None:
+        try:
+            results.put((hedge, call(hedge), None))
+        except BaseException as e:
+            results.put((hedge, None, e))
+
+    def start(hedge: bool) -> None:
+        threading.Thread(target=run, args=(hedge,), name="bbg-retrieve" + ("-hedge" if hedge else ""),
+                         daemon=True).start()
+
+    start(False)
+    running = 1
+    hedged = False
+    try:
+        item = results.get(timeout=delay)
+    except queue.Empty:
+        start(True)
+        running, hedged = 2, True
+        item = results.get()
+    outcomes = {}
+    while True:
+        running -= 1
+        hedge, result, error = item
+        if error is None and ok(result):
+            if hedged:
+                on_hedge(hedge)
+            if running:
+                threading.Thread(target=_discard_rest, args=(results, running, discard), daemon=True).start()
+            return result
+        outcomes[hedge] = (result, error)
+        if not running:
+            break
+        item = results.get()
+    if hedged:
+        on_hedge(False)
+    result, error = outcomes[False]
+    if error is not None:
+        raise error
+    return result
+
+
+def _discard_rest(results: "queue.Queue[tuple]", n: int, discard: Callable[[Any], None]) -> None:
+    for _ in range(n):
+        _, result, error = results.get()
+        if error is None and result is not None:
+            try:
+                discard(result)
+            except Exception as e:
+                logger.warning(f"Could not discard the losing retrieve: {type(e).__name__}: {e}")
@@ -1,15 +1,32 @@
 # src/bbg_dlws_workbench/soap/poller.py
 import time
 import logging
-from typing import Any, Optional
+from typing import Any, List, Optional
 
 import requests
 
+from .ratelimit import QuotaExceededError
+
 logger = logging.getLogger("bbg-dlws-workbench.poller")
 
 READY_CODES = {0}
 CONTINUE_CODES = {100, 300}
 
+# Entries of Poller.poll's `statuses` for attempts without a status code
+NO_RESPONSE = "-"
+TIMED_OUT = "timeout"
+NO_CODE = "?"
+
+
+class TerminalStatusError(RuntimeError):
+    """
+    DLWS reported a terminal (non-ready, non-processing) status for a request.
+    """
+
+    def __init__(self, message: str, code: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+
 def _extract_status_code(resp: Any) -> Optional[int]:
     """
     Try multiple common DLWS shapes to extract an integer status code.
@@ -54,13 +71,23 @@ def _extract_status_code(resp: Any) -> Optional[int]:
     return None
 
 
+def is_ready(resp: Any) -> bool:
+    """
+    Whether a retrieve reply carries the result, as Poller.poll decides it.
+    """
+    if resp is None:
+        return False
+    code = _extract_status_code(resp)
+    return code is None or code in READY_CODES
+
+
 class Poller:
     def __init__(self, attempts: int, interval_s: int, per_attempt_timeout_s: int):
         self.attempts = attempts
         self.interval_s = interval_s
         self.per_attempt_timeout_s = per_attempt_timeout_s
 
-    def poll(self, fetch_fn):
+    def poll(self, fetch_fn, statuses: Optional[List[str]] = None):
         """
         fetch_fn() should perform one retrieve attempt and return:
           - a response object when available (even if still 'processing')
@@ -68,25 +95,35 @@ class Poller:
         We decode a status code from the response:
           0   -> success (return response)
           100/300 -> keep polling
-          other -> raise RuntimeError (terminal/unknown)
+          other -> raise TerminalStatusError (terminal/unknown)
+        When given, `statuses` gets one entry per attempt: the status code,
+        or NO_RESPONSE, TIMED_OUT or NO_CODE.
         """
+        trace = statuses.append if statuses is not None else lambda s: None
         last_resp: Any = None
         for i in range(1, self.attempts + 1):
             try:
                 resp = fetch_fn()  # your get_response_by_id already applies per-attempt timeout
                 last_resp = resp
             except requests.Timeout:
+                # still wait the interval: a slow service shouldn't get retrieves back to back
+                trace(TIMED_OUT)
                 logger.debug(f"[poll] Attempt {i}/{self.attempts}: request timeout")
-                resp = None
+                time.sleep(self.interval_s)
+                continue
+            except QuotaExceededError:
+                raise  # a local limit, not the service: polling on can't help
             except Exception as e:
                 # Treat unexpected transient errors as "not ready", but log them
                 logger.debug(f"[poll] Attempt {i}/{self.attempts}: transient error: {e}")
                 resp = None
 
             if resp is None:
+                trace(NO_RESPONSE)
                 logger.debug(f"[poll] Attempt {i}/{self.attempts}: no response yet")
             else:
                 code = _extract_status_code(resp)
+                trace(NO_CODE if code is None else str(code))
                 if code is None:
                     # If there is a response but no code, assume success and return (conservative)
                     logger.info(f"[poll] Attempt {i}/{self.attempts}: no status code present; assuming ready")
@@ -99,7 +136,9 @@ class Poller:
                     logger.debug(f"[poll] Attempt {i}/{self.attempts}: still processing (statusCode={code})")
                 else:
                     # Unknown/terminal code -> stop with context
-                    raise RuntimeError(f"Polling stopped: terminal statusCode={code} on attempt {i}/{self.attempts}")
+                    raise TerminalStatusError(
+                        f"Polling stopped: terminal statusCode={code} on attempt {i}/{self.attempts}", code=code
+                    )
 
             # sleep before next attempt
             logger.debug(f"[poll] Sleeping {self.interval_s}s before next attempt")
@@ -0,0 +1,63 @@
+# src/bbg_dlws_workbench/soap/pool.py
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+import requests
+
+
+class SessionPool:
+    """
+    Bounded pool of HTTP sessions that threads check out for one request at
+    a time. Sessions are created on demand, up to `size`; when all are in use,
+    checkout() blocks until one is returned (or `timeout` seconds pass).
+
+    Each session keeps its own keep-alive connection (and TLS context), so N
+    threads sharing one client get N connections instead of contending for one.
+    """
+
+    def __init__(self, make_session: Callable[[], requests.Session], size: int = 1):
+        if size < 1:
+            raise ValueError("SessionPool size must be at least 1")
+        self.size = size
+        self._make = make_session
+        self._idle: "queue.LifoQueue[requests.Session]" = queue.LifoQueue()
+        self._all: List[requests.Session] = []
+        self._lock = threading.Lock()
+        # created eagerly: used for WSDL/XSD loading and as the first pooled session
+        self.primary = self._new()
+        self._idle.put(self.primary)
+
+    def _new(self) -> requests.Session:
+        session = self._make()
+        self._all.append(session)
+        return session
+
+    @property
+    def created(self) -> int:
+        return len(self._all)
+
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None) -> Iterator[requests.Session]:
+        session = None
+        try:
+            session = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if len(self._all) < self.size:
+                    session = self._new()
+            if session is None:
+                try:
+                    session = self._idle.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"No HTTP session free within {timeout}s (pool size {self.size})") from None
+        try:
+            yield session
+        finally:
+            self._idle.put(session)
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._all:
+                session.close()
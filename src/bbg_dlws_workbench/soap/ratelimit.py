@@ -0,0 +1,247 @@
+# src/bbg_dlws_workbench/soap/ratelimit.py
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger("bbg-dlws-workbench.ratelimit")
+
+OPERATIONS = ("submit", "retrieve", "call")
+
+
+class QuotaExceededError(RuntimeError):
+    """
+    A local daily quota (requests or cells) would be exceeded by the next call.
+    Stops the run: retrying or bisecting can't help until the quota resets.
+    """
+
+
+def _check_quota(requests_today: int, cells_today: int, cells: int,
+                 max_requests: Optional[int], max_cells: Optional[int]) -> None:
+    if max_requests is not None and requests_today + 1 > max_requests:
+        raise QuotaExceededError(f"Daily request quota reached ({requests_today}/{max_requests})")
+    if max_cells is not None and cells_today + cells > max_cells:
+        raise QuotaExceededError(f"Daily cell quota would be exceeded ({cells_today} + {cells} > {max_cells})")
+
+
+def payload_cells(payload: Dict[str, Any]) -> int:
+    """
+    Estimated billable cells of a request payload: identifiers × fields.
+    """
+    def count(node: Any, key: str) -> int:
+        items = (node or {}).get(key) if isinstance(node, dict) else None
+        if items is None:
+            return 0
+        return len(items) if isinstance(items, (list, tuple)) else 1
+
+    ids = count(payload.get("instruments"), "instrument")
+    fields = count(payload.get("fields"), "field")
+    return ids * fields
+
+
+class _MemoryBuckets:
+    """
+    Bucket state and daily usage for this process only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._usage: Dict[Tuple[str, str], Tuple[int, int]] = {}
+
+    def take(self, name: str, rate: float, burst: float, n: float, now: float) -> float:
+        with self._lock:
+            tokens, updated = self._buckets.get(name, (burst, now))
+            tokens, wait = _refill_and_take(tokens, updated, rate, burst, n, now)
+            self._buckets[name] = (tokens, now)
+            return wait
+
+    def add_usage(self, day: str, op: str, requests: int, cells: int,
+                  max_requests: Optional[int] = None, max_cells: Optional[int] = None) -> Tuple[int, int]:
+        with self._lock:
+            _check_quota(*self.usage(day), cells, max_requests, max_cells)
+            r, c = self._usage.get((day, op), (0, 0))
+            self._usage[(day, op)] = (r + requests, c + cells)
+            return self.usage(day)
+
+    def usage(self, day: str) -> Tuple[int, int]:
+        return (sum(r for (d, _), (r, _) in self._usage.items() if d == day),
+                sum(c for (d, _), (_, c) in self._usage.items() if d == day))
+
+    def close(self) -> None:
+        pass
+
+
+class _SqliteBuckets:
+    """
+    Bucket state and daily usage in a SQLite file, so every process on the
+    host that points at the same file draws from the same budgets.
+    """
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS buckets (
+        name    TEXT PRIMARY KEY,
+        tokens  REAL NOT NULL,
+        updated REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS usage (
+        day      TEXT NOT NULL,
+        op       TEXT NOT NULL,
+        requests INTEGER NOT NULL DEFAULT 0,
+        cells    INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, op)
+    );
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # autocommit mode; every read-modify-write runs in BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.executescript(self._SCHEMA)
+        self._lock = threading.Lock()
+
+    def _tx(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def take(self, name: str, rate: float, burst: float, n: float, now: float) -> float:
+        def fn(conn):
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (name,)).fetchone()
+            tokens, updated = row if row else (burst, now)
+            tokens, wait = _refill_and_take(tokens, updated, rate, burst, n, now)
+            conn.execute(
+                "INSERT INTO buckets (name, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                (name, tokens, now),
+            )
+            return wait
+        return self._tx(fn)
+
+    def add_usage(self, day: str, op: str, requests: int, cells: int,
+                  max_requests: Optional[int] = None, max_cells: Optional[int] = None) -> Tuple[int, int]:
+        # quota check and increment in one transaction, so processes can't overshoot together
+        def fn(conn):
+            if max_requests is not None or max_cells is not None:
+                _check_quota(*self._sum(conn, day), cells, max_requests, max_cells)
+            conn.execute(
+                "INSERT INTO usage (day, op, requests, cells) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (day, op) DO UPDATE SET requests = requests + excluded.requests, "
+                "cells = cells + excluded.cells",
+                (day, op, requests, cells),
+            )
+            return self._sum(conn, day)
+        return self._tx(fn)
+
+    def usage(self, day: str) -> Tuple[int, int]:
+        with self._lock:
+            return self._sum(self._conn, day)
+
+    @staticmethod
+    def _sum(conn: sqlite3.Connection, day: str) -> Tuple[int, int]:
+        r, c = conn.execute(
+            "SELECT COALESCE(SUM(requests), 0), COALESCE(SUM(cells), 0) FROM usage WHERE day = ?", (day,)
+        ).fetchone()
+        return r, c
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _refill_and_take(
+        tokens: float, updated: float, rate: float, burst: float, n: float, now: float
+) -> Tuple[float, float]:
+    # Returns (tokens left, seconds to wait); nothing is taken when a wait is needed
+    tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+    if tokens >= n:
+        return tokens - n, 0.0
+    return tokens, (n - tokens) / rate
+
+
+class RateLimiter:
+    """
+    Token buckets in front of DLWS calls, one per operation ("submit",
+    "retrieve", "call"), plus request/cell accounting.
+
+      - rates are requests per second with a burst size; a rate of 0 disables
+        that bucket
+      - `usage` counts requests and estimated cells (identifiers × fields) of
+        this limiter's calls; daily totals live in the backend, and the
+        optional daily quotas raise QuotaExceededError before the call is made
+      - with `path`, bucket state and daily totals are kept in a SQLite file
+        shared by every process using it; otherwise they are per process
+    """
+
+    def __init__(
+            self,
+            rates: Dict[str, Tuple[float, float]],
+            path: Optional[str] = None,
+            max_requests_per_day: Optional[int] = None,
+            max_cells_per_day: Optional[int] = None,
+            sleep: Callable[[float], None] = time.sleep,
+            clock: Callable[[], float] = time.time,
+    ):
+        self.rates = rates
+        self.max_requests_per_day = max_requests_per_day
+        self.max_cells_per_day = max_cells_per_day
+        self._backend = _SqliteBuckets(path) if path else _MemoryBuckets()
+        self._sleep = sleep
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.usage: Dict[str, Dict[str, int]] = {op: {"requests": 0, "cells": 0} for op in OPERATIONS}
+        self.waited_s = 0.0
+
+    @classmethod
+    def from_config(cls, cfg) -> Optional["RateLimiter"]:
+        # cfg is RateLimitConfig
+        if not cfg.enabled:
+            return None
+        return cls(
+            rates={
+                "submit": (cfg.submit_per_second, cfg.submit_burst),
+                "retrieve": (cfg.retrieve_per_second, cfg.retrieve_burst),
+                "call": (cfg.call_per_second, cfg.call_burst),
+            },
+            path=cfg.shared_path,
+            max_requests_per_day=cfg.max_requests_per_day,
+            max_cells_per_day=cfg.max_cells_per_day,
+        )
+
+    def close(self) -> None:
+        self._backend.close()
+
+    def acquire(self, op: str, cells: int = 0) -> None:
+        """
+        Block until `op` may be sent, then account for it.
+        """
+        # counted (and checked against the daily quotas) up front, atomically
+        day = date.fromtimestamp(self._clock()).isoformat()
+        self._backend.add_usage(day, op, 1, cells, self.max_requests_per_day, self.max_cells_per_day)
+
+        rate, burst = self.rates.get(op, (0, 0))
+        if rate > 0:
+            while True:
+                wait = self._backend.take(op, rate, max(burst, 1), 1, self._clock())
+                if wait <= 0:
+                    break
+                with self._lock:
+                    self.waited_s += wait
+                logger.debug(f"Rate limit: waiting {wait:.2f}s before {op}")
+                self._sleep(wait)
+
+        with self._lock:
+            self.usage[op]["requests"] += 1
+            self.usage[op]["cells"] += cells
+
+    def summary(self) -> str:
+        parts = [f"{op} {u['requests']} req / {u['cells']} cells" for op, u in self.usage.items() if u["requests"]]
+        return ", ".join(parts) + (f"; throttled {self.waited_s:.1f}s" if self.waited_s else "")
@@ -0,0 +1,61 @@
+# src/bbg_dlws_workbench/soap/raw.py
+import mmap
+import os
+import re
+from typing import Optional, Union
+
+# <statusCode><code>0</code>... with any namespace prefix; it sits near the top of the body
+_STATUS_RE = re.compile(rb"<(?:[\w.-]+:)?statusCode\b[^>]*>\s*<(?:[\w.-]+:)?code\b[^>]*>\s*(\d+)\s*<")
+_FAULT_RE = re.compile(rb"<(?:[\w.-]+:)?Fault\b")
+_PEEK_BYTES = 64 * 1024
+
+
+def peek_status_code(content: bytes) -> Optional[int]:
+    m = _STATUS_RE.search(content, 0, _PEEK_BYTES)
+    return int(m.group(1)) if m else None
+
+
+def is_fault(content: bytes) -> bool:
+    return _FAULT_RE.search(content, 0, _PEEK_BYTES) is not None
+
+
+def map_file(path: str) -> Union[mmap.mmap, bytes]:
+    """
+    Read-only memory map of a file (b"" for an empty one, which mmap rejects).
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class RawResponse:
+    """
+    Undecoded SOAP reply body of a retrieve call. Only the DLWS status code is
+    read up front (for the Poller); the body is parsed later, possibly in
+    another process (see transform.xml_reader).
+
+    When the body was spooled to disk, `path` is set and `content` is a
+    read-only memory map of that file; other processes reopen it by path.
+    """
+
+    __slots__ = ("content", "statusCode", "path")
+
+    def __init__(self, content: Union[bytes, mmap.mmap], path: Optional[str] = None):
+        self.content = content
+        self.path = path
+        self.statusCode = peek_status_code(content)
+
+    @classmethod
+    def from_file(cls, path: str) -> "RawResponse":
+        return cls(map_file(path), path=path)
+
+    def close(self) -> None:
+        if isinstance(self.content, mmap.mmap):
+            self.content.close()
+
+    def __len__(self) -> int:
+        return len(self.content)
+
+    def __repr__(self) -> str:
+        return f"RawResponse(statusCode={self.statusCode}, bytes={len(self.content)}, path={self.path!r})"
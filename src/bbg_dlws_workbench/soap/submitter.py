@@ -1,20 +1,27 @@
 # src/bbg_dlws_workbench/soap/submitter.py
-from typing import Any, Dict
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional
 import logging
+import os
 from zeep.exceptions import Fault, TransportError
 from .registry import OP_HANDLERS
+from .raw import RawResponse, is_fault
+from .ratelimit import payload_cells
 
 logger = logging.getLogger("bbg-dlws-workbench.submitter")
 
 
-def submit_request(client, kind: str, payload: Dict) -> str:
+def submit_request(client, kind: str, payload: Dict, limiter=None) -> str:
     """
     Submit an asynchronous Bloomberg DLWS request (history or data).
     Returns the responseId / jobId to poll later.
+    With a RateLimiter, waits for a submit token first.
     """
     op = OP_HANDLERS[kind]
     method_name = op["submit"]
     method = getattr(client.service, method_name)
+    if limiter is not None:
+        limiter.acquire("submit", cells=payload_cells(payload))
 
     logger.info(f"Submitting {kind} request via {method_name}…")
 
@@ -27,6 +34,32 @@ def submit_request(client, kind: str, payload: Dict) -> str:
         logger.error(f"Transport error contacting Bloomberg: {e}")
         raise
 
+    return _submitted_response_id(kind, resp)
+
+
+def submit_envelope(template, identifiers_batch: List[Dict], limiter=None) -> str:
+    """
+    Same as submit_request, but posts a pre-rendered EnvelopeTemplate
+    instead of serializing the payload through zeep.
+    """
+    kind, method_name = template.kind, template.method_name
+    if limiter is not None:
+        limiter.acquire("submit", cells=len(identifiers_batch) * template.n_fields)
+    logger.info(f"Submitting {kind} request via {method_name} (pre-rendered envelope)…")
+
+    try:
+        resp = template.send(identifiers_batch)
+    except Fault as e:
+        logger.error(f"SOAP Fault during {method_name}: {e.message}")
+        raise
+    except TransportError as e:
+        logger.error(f"Transport error contacting Bloomberg: {e}")
+        raise
+
+    return _submitted_response_id(kind, resp)
+
+
+def _submitted_response_id(kind: str, resp: Any) -> str:
     # The DLWS 'submit' responses typically include <responseId> inside the returned object.
     response_id = getattr(resp, "responseId", None) or getattr(resp, "responseID", None)
     if not response_id:
@@ -40,27 +73,40 @@ def submit_request(client, kind: str, payload: Dict) -> str:
     return str(response_id)
 
 
-def get_response_by_id(client, kind: str, response_id: str, timeout: int) -> Any:
+def get_response_by_id(
+        client, kind: str, response_id: str, timeout: float, raw: bool = False, spool_dir: Optional[str] = None,
+        limiter=None, spool_name: Optional[str] = None,
+) -> Any:
     """
     Retrieve an asynchronous DLWS response using its responseId.
     Returns the SOAP response object if ready; otherwise None.
-    Uses a per-attempt timeout by temporarily setting the transport's operation_timeout.
+    With raw=True the reply body isn't deserialized by zeep; a RawResponse
+    (bytes + status code) is returned instead. With spool_dir as well, the
+    body is streamed to <spool_dir>/<responseId>.xml (or `spool_name`) and
+    memory-mapped.
+    `timeout` applies to this call only (see _call_timeout).
     """
     op = OP_HANDLERS[kind]
     method_name = op["retrieve"]
     method = getattr(client.service, method_name)
+    if limiter is not None:
+        limiter.acquire("retrieve")
 
-    # Per-attempt timeout applied to this call only
     transport = getattr(client, "transport", None)
-    prev_timeout = getattr(transport, "operation_timeout", None) if transport else None
-    if transport is not None and timeout is not None:
-        transport.operation_timeout = timeout  # seconds
-
     logger.debug(f"Polling {kind} responseId={response_id} with timeout={timeout}s…")
 
     try:
-        # No _timeout kwarg here—use the transport's operation_timeout
-        resp = method(responseId=response_id)
+        with _call_timeout(transport, timeout):
+            if raw:
+                spool_path = None
+                if spool_dir and hasattr(transport, "spool_to"):
+                    spool_path = os.path.join(spool_dir, spool_name or f"{response_id}.xml")
+                with client.settings(raw_response=True), (
+                        transport.spool_to(spool_path) if spool_path else nullcontext()
+                ):
+                    http_resp = method(responseId=response_id)
+            else:
+                resp = method(responseId=response_id)
     except Fault as e:
         # Not ready or other SOAP condition — treat as "keep polling"
         logger.debug(f"SOAP Fault during {method_name}: {e}")
@@ -68,10 +114,17 @@ def get_response_by_id(client, kind: str, response_id: str, timeout: int) -> Any
     except TransportError as e:
         logger.warning(f"Transport error while polling {response_id}: {e}")
         return None
-    finally:
-        # Restore previous timeout to avoid leaking per-attempt settings
-        if transport is not None:
-            transport.operation_timeout = prev_timeout
+
+    if raw:
+        if http_resp.status_code >= 400 or is_fault(http_resp.content):
+            # Same as a Fault/TransportError above: keep polling
+            logger.debug(f"{method_name} for {response_id} returned HTTP {http_resp.status_code}")
+            if spool_path:
+                getattr(http_resp.content, "close", lambda: None)()  # unmap before deleting
+                _remove(spool_path)
+            return None
+        logger.info(f"{kind} responseId={response_id} retrieved ({len(http_resp.content)} bytes).")
+        return RawResponse(http_resp.content, path=spool_path)
 
     status = getattr(resp, "status", None) or getattr(resp, "processingStatus", None)
     if status and str(status).lower() not in ("completed", "success", "done"):
@@ -82,36 +135,48 @@ def get_response_by_id(client, kind: str, response_id: str, timeout: int) -> Any
     return resp
 
 
-def call_sync(client, kind: str, payload: Dict, timeout: int) -> Any:
+def remove_spooled(spool_dir: str, response_id: str) -> None:
+    """
+    Delete whatever retrieves of `response_id` left in `spool_dir`, for a
+    response that will never be used (polling gave up or failed).
+    """
+    for name in (f"{response_id}.xml", f"{response_id}.hedge.xml"):
+        for path in (os.path.join(spool_dir, name), os.path.join(spool_dir, name + ".part")):
+            _remove(path)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove spool file {path}: {e}")
+
+
+def call_sync(client, kind: str, payload: Dict, timeout: int, limiter=None) -> Any:
     """
     Execute a synchronous DLWS request (e.g., getFields).
     Returns the SOAP response object directly.
-    Uses per-call timeout by temporarily setting transport.operation_timeout.
+    `timeout` applies to this call only (see _call_timeout).
     """
     op = OP_HANDLERS[kind]
     method_name = op["call"]
     method = getattr(client.service, method_name)
+    if limiter is not None:
+        limiter.acquire("call", cells=payload_cells(payload))
 
     logger.info(f"Calling synchronous operation {method_name} for {kind}…")
 
-    # Temporarily set per-call timeout
-    transport = getattr(client, "transport", None)
-    prev_timeout = getattr(transport, "operation_timeout", None) if transport else None
-    if transport is not None and timeout is not None:
-        transport.operation_timeout = timeout
-
     try:
-        resp = method(**payload)
+        with _call_timeout(getattr(client, "transport", None), timeout):
+            resp = method(**payload)
     except Fault as e:
         logger.error(f"SOAP Fault during {method_name}: {e.message}")
         raise
     except TransportError as e:
         logger.error(f"Transport error contacting Bloomberg: {e}")
         raise
-    finally:
-        # Restore previous timeout
-        if transport is not None:
-            transport.operation_timeout = prev_timeout
 
     logger.info(f"Synchronous call {method_name} completed successfully.")
     return resp
@@ -120,6 +185,17 @@ def call_sync(client, kind: str, payload: Dict, timeout: int) -> Any:
 
 # ----------------- Helper -----------------
 
+def _call_timeout(transport, timeout: Optional[int]):
+    """
+    Timeout for the calls made inside the block. DlwsTransport.settings is
+    per thread, so clients can be shared between threads; a plain zeep
+    Transport's settings() swaps the shared operation_timeout instead.
+    """
+    if transport is None or timeout is None or not hasattr(transport, "settings"):
+        return nullcontext()
+    return transport.settings(timeout=timeout)
+
+
 def _extract_response_id(resp: Any) -> str | None:
     """
     Walk generic Zeep/dict responses to find a responseId field.
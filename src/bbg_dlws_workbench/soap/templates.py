@@ -0,0 +1,103 @@
+# src/bbg_dlws_workbench/soap/templates.py
+import logging
+import re
+from typing import Any, Dict, List
+
+from zeep.wsdl.utils import etree_to_string
+
+from .registry import OP_HANDLERS
+
+logger = logging.getLogger("bbg-dlws-workbench.templates")
+
+# Private-use code points: never appear in DLWS data, survive lxml serialization verbatim
+_HEAD = "\ue000"
+_TAIL = "\ue001"
+_SLOTS = {"\ue010": "id", "\ue011": "yellow_key", "\ue012": "type"}
+_SLOT_RE = re.compile("(" + "|".join(_SLOTS) + ")")
+
+
+def _escape(value: Any) -> str:
+    # Same escaping lxml applies to element text
+    s = "" if value is None else str(value)
+    return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace("\r", "&#13;")
+
+
+class EnvelopeTemplate:
+    """
+    A submit envelope with everything but <instruments> serialized once.
+
+    zeep renders the envelope for a single placeholder instrument; the
+    serialized bytes are split around the instruments' children and the
+    placeholder instrument is kept as a fragment with value slots. Rendering
+    a chunk is then string concatenation, and produces exactly the bytes
+    zeep would have produced for the same payload.
+    """
+
+    def __init__(self, client, kind: str, payload: Dict[str, Any]):
+        op = OP_HANDLERS[kind]
+        if not op.get("async"):
+            raise ValueError(f"Envelope templates only apply to submit operations, not {kind}")
+        self.client = client
+        self.kind = kind
+        self.method_name = op["submit"]
+        self.n_fields = len((payload.get("fields") or {}).get("field") or [])
+
+        service = client.service
+        self._binding = service._binding
+        self._options = service._binding_options
+        self._operation = self._binding.get(self.method_name)
+
+        placeholder = {"id": "\ue010", "yellowkey": "\ue011", "type": "\ue012"}
+        probe = {k: v for k, v in payload.items() if k != "instruments"}
+        probe["instruments"] = {"instrument": [placeholder]}
+        envelope, self.http_headers = self._binding._create(
+            self.method_name, (), probe, client=client, options=self._options
+        )
+
+        instruments = self._find(envelope, "instruments")
+        if instruments is None or len(instruments) != 1:
+            raise ValueError(f"Could not locate <instruments> in the {self.method_name} envelope")
+        instruments.text = _HEAD
+        instruments[0].tail = _TAIL
+
+        text = etree_to_string(envelope).decode("utf-8")
+        head, rest = text.split(_HEAD)
+        fragment, tail = rest.split(_TAIL)
+        self._prefix = head.encode("utf-8")
+        self._suffix = tail.encode("utf-8")
+        # ["<ns0:instrument><ns0:id>", "id", "</ns0:id>...", ...]: odd positions are slot names
+        self._fragment = [
+            _SLOTS[p] if i % 2 else p for i, p in enumerate(_SLOT_RE.split(fragment))
+        ]
+        logger.debug(f"Prepared {self.method_name} envelope template ({len(self._prefix) + len(self._suffix)} bytes)")
+
+    @staticmethod
+    def _find(envelope: Any, local_name: str) -> Any:
+        for el in envelope.iter():
+            if isinstance(el.tag, str) and el.tag.rsplit("}", 1)[-1] == local_name:
+                return el
+        return None
+
+    def render(self, identifiers_batch: List[Dict]) -> bytes:
+        """
+        Serialized envelope for one chunk of normalized identifiers (id, yellow_key, type).
+        """
+        if not identifiers_batch:
+            raise ValueError("Envelope templates need at least one identifier")
+        frag = self._fragment
+        parts: List[str] = []
+        for x in identifiers_batch:
+            for i, p in enumerate(frag):
+                parts.append(_escape(x.get(p, "")) if i % 2 else p)
+        return self._prefix + "".join(parts).encode("utf-8") + self._suffix
+
+    def send(self, identifiers_batch: List[Dict]) -> Any:
+        """
+        POST the rendered envelope and process the reply through zeep, as
+        client.service.<submit op>(**payload) would.
+        """
+        message = self.render(identifiers_batch)
+        response = self.client.transport.post(self._options["address"], message, self.http_headers)
+        if self.client.settings.raw_response:
+            return response
+        return self._binding.process_reply(self.client, self._operation, response)
@@ -1,36 +1,154 @@
 
-import ssl, requests, urllib3, tempfile
+import logging, os, ssl, requests, urllib3, tempfile, threading
+from contextlib import contextmanager
 from requests.adapters import HTTPAdapter
 from urllib3 import PoolManager
 from cryptography.hazmat.primitives.serialization import Encoding, NoEncryption, PrivateFormat
 from cryptography.hazmat.primitives.serialization.pkcs12 import load_key_and_certificates
+from typing import Optional
+from zeep.transports import Transport
+from .pool import SessionPool
+from .raw import map_file
+
+def p12_ssl_context(p12_path: str, p12_password: str) -> ssl.SSLContext:
+    """
+    Client TLS context with the certificate and key of a PKCS#12 file. The
+    PEM copies ssl needs are written to a private temp folder that is
+    removed as soon as they are loaded. One context can serve many sessions.
+    """
+    ctx = ssl.create_default_context(purpose=ssl.Purpose.SERVER_AUTH)
+    ctx.minimum_version = ssl.TLSVersion.TLSv1_2
+    # Load p12
+    with open(p12_path, "rb") as f:
+        key, cert, chain = load_key_and_certificates(f.read(), p12_password.encode())
+    pem_key = key.private_bytes(Encoding.PEM, PrivateFormat.TraditionalOpenSSL, NoEncryption())
+    pem_cert = cert.public_bytes(Encoding.PEM)
+    pem_chain = b"".join(c.public_bytes(Encoding.PEM) for c in (chain or []))
+    # Write temp PEMs (mkdtemp: mode 0700); load into SSL context
+    with tempfile.TemporaryDirectory(prefix="bbg-dlws-") as tmp:
+        cert_path, key_path = os.path.join(tmp, "cert.pem"), os.path.join(tmp, "key.pem")
+        for path, data in ((cert_path, pem_cert + pem_chain), (key_path, pem_key)):
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+        ctx.load_cert_chain(certfile=cert_path, keyfile=key_path)
+    return ctx
 
 class P12HttpAdapter(HTTPAdapter):
-    def __init__(self, p12_path: str, p12_password: str, **kwargs):
+    def __init__(self, p12_path: str, p12_password: str, ssl_context: Optional[ssl.SSLContext] = None, **kwargs):
         self.p12_path = p12_path
         self.p12_password = p12_password
+        self.ssl_context = ssl_context
         super().__init__(**kwargs)
 
     def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
-        ctx = ssl.create_default_context(purpose=ssl.Purpose.SERVER_AUTH)
-        ctx.minimum_version = ssl.TLSVersion.TLSv1_2
-        # Load p12
-        with open(self.p12_path, "rb") as f:
-            key, cert, chain = load_key_and_certificates(f.read(), self.p12_password.encode())
-        pem_key = key.private_bytes(Encoding.PEM, PrivateFormat.TraditionalOpenSSL, NoEncryption())
-        pem_cert = cert.public_bytes(Encoding.PEM)
-        pem_chain = b"".join(c.public_bytes(Encoding.PEM) for c in (chain or []))
-        # Write temp PEMs; load into SSL context
-        with tempfile.NamedTemporaryFile(delete=False) as cert_file, tempfile.NamedTemporaryFile(delete=False) as key_file:
-            cert_file.write(pem_cert + pem_chain)
-            cert_file.flush()
-            key_file.write(pem_key)
-            key_file.flush()
-            ctx.load_cert_chain(certfile=cert_file.name, keyfile=key_file.name)
-        pool_kwargs["ssl_context"] = ctx
+        pool_kwargs["ssl_context"] = self.ssl_context or p12_ssl_context(self.p12_path, self.p12_password)
         self.poolmanager = PoolManager(num_pools=connections, maxsize=maxsize, block=block, **pool_kwargs)
 
-def build_session_with_p12(p12_path: str, p12_password: str) -> requests.Session:
+def build_session_with_p12(p12_path: str, p12_password: str,
+                           ssl_context: Optional[ssl.SSLContext] = None) -> requests.Session:
     s = requests.Session()
-    s.mount("https://", P12HttpAdapter(p12_path, p12_password))
+    s.mount("https://", P12HttpAdapter(p12_path, p12_password, ssl_context=ssl_context))
     return s
+
+
+class DlwsTransport(Transport):
+    """
+    zeep Transport that is safe to share between threads:
+
+      - per-call settings are per thread: settings(timeout=...) applies to the
+        calling thread's requests only, and replies can be spooled straight to
+        a file while they download (see spool_to); the response's content is
+        then a read-only memory map of that file instead of a bytes copy
+      - with a SessionPool, every POST checks out its own session, so
+        concurrent calls don't share one connection
+    """
+
+    SPOOL_CHUNK = 1024 * 1024
+
+    def __init__(self, *args, sessions: Optional[SessionPool] = None, **kwargs):
+        if sessions is not None:
+            kwargs["session"] = sessions.primary
+        super().__init__(*args, **kwargs)
+        self.sessions = sessions
+        self._local = threading.local()
+
+    @contextmanager
+    def settings(self, timeout=None):
+        """
+        Operation timeout (seconds) for requests made by this thread inside
+        the block. Unlike zeep's Transport.settings, other threads keep theirs.
+        """
+        prev = getattr(self._local, "timeout", None)
+        self._local.timeout = timeout
+        try:
+            yield
+        finally:
+            self._local.timeout = prev
+
+    @contextmanager
+    def spool_to(self, path: str):
+        """
+        Spool replies of calls made by this thread inside the block to `path`
+        (overwritten by each call).
+        """
+        prev = getattr(self._local, "path", None)
+        self._local.path = path
+        try:
+            yield
+        finally:
+            self._local.path = prev
+
+    @property
+    def last_response_bytes(self):
+        """
+        Body size of the last reply received by the calling thread.
+        """
+        return getattr(self._local, "last_bytes", None)
+
+    def _timeout(self):
+        timeout = getattr(self._local, "timeout", None)
+        return self.operation_timeout if timeout is None else timeout
+
+    @contextmanager
+    def _session(self):
+        if self.sessions is None:
+            yield self.session
+        else:
+            with self.sessions.checkout(timeout=self._timeout()) as session:
+                yield session
+
+    def post(self, address, message, headers):
+        # Same as zeep's Transport.post, with this thread's timeout and a pooled session
+        path = getattr(self._local, "path", None)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("HTTP Post to %s:\n%s", address,
+                              message.decode("utf-8") if isinstance(message, bytes) else message)
+        if path is None:
+            with self._session() as session:
+                response = session.post(address, data=message, headers=headers, timeout=self._timeout())
+                content = response.content  # read the body before the session goes back to the pool
+            self._local.last_bytes = len(content)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("HTTP Response from %s (status: %d):\n%s", address, response.status_code,
+                                  content.decode(response.encoding or "utf-8", errors="replace"))
+            return response
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".part"
+        with self._session() as session:
+            response = session.post(address, data=message, headers=headers, timeout=self._timeout(), stream=True)
+            try:
+                with open(tmp, "wb") as f:
+                    for block in response.iter_content(self.SPOOL_CHUNK):
+                        f.write(block)
+                os.replace(tmp, path)
+            finally:
+                response.close()
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+        response._content = map_file(path)
+        response._content_consumed = True
+        self._local.last_bytes = len(response._content)
+        self.logger.debug("HTTP Response from %s (status: %d) spooled to %s", address, response.status_code, path)
+        return response
@@ -0,0 +1,3 @@
+
+from .history import RunHistory
+from .estimate import CostModel, LatencyModel, PlanEstimate, chunk_cells, observations
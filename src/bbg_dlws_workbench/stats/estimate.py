@@ -0,0 +1,188 @@
+# src/bbg_dlws_workbench/stats/estimate.py
+import statistics
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..backfill.planner import estimate_observations, max_observations, periodicity
+
+# Calendar days per daterange.duration unit
+_DURATION_DAYS = {"days": 1, "weeks": 7, "months": 30.44, "years": 365.25}
+
+# Reply bytes per cell when there is no history yet (order of magnitude of
+# <data value="123.456"/> plus per-row instrument/date overhead)
+DEFAULT_BYTES_PER_CELL = {"history": 40, "data": 60, "fundamentals_headers": 200}
+
+
+def _find_key(d: Dict, name: str) -> Optional[str]:
+    for k in d:
+        if k.lower() == name:
+            return k
+    return None
+
+
+def observations(kind: str, params: Optional[Dict]) -> int:
+    """
+    Expected rows per identifier: 1 except for history, where it follows
+    the daterange (period, or duration in days/weeks/months/years) and periodicity.
+    """
+    if kind != "history":
+        return 1
+    params = params or {}
+    dr = params.get(_find_key(params, "daterange") or "", None)
+    if not isinstance(dr, dict):
+        return 1
+    try:
+        freq = periodicity(params)
+    except ValueError:
+        freq = "daily"
+    period = dr.get(_find_key(dr, "period") or "", None)
+    if isinstance(period, dict):
+        try:
+            start = date.fromisoformat(str(period[_find_key(period, "start")]))
+            end = date.fromisoformat(str(period[_find_key(period, "end")]))
+            return estimate_observations(start, end, freq) if start <= end else 1
+        except (KeyError, TypeError, ValueError):
+            return 1
+    duration = dr.get(_find_key(dr, "duration") or "", None)
+    if isinstance(duration, dict):
+        days = sum(_DURATION_DAYS.get(str(k).lower(), 0) * v for k, v in duration.items() if isinstance(v, int))
+        return max_observations(max(1, round(days)), freq)
+    return 1
+
+
+def chunk_cells(kind: str, identifiers: int, fields: int, params: Optional[Dict]) -> int:
+    return identifiers * max(1, fields) * observations(kind, params)
+
+
+class LatencyModel:
+    """
+    seconds ≈ intercept + per_cell × cells, fitted on past chunks
+    (least squares with both terms kept non-negative; a median rate when the
+    samples don't span enough sizes), plus median reply bytes per cell.
+    """
+
+    def __init__(self, intercept: float, per_cell: float, bytes_per_cell: Optional[float], samples: int):
+        self.intercept = intercept
+        self.per_cell = per_cell
+        self.bytes_per_cell = bytes_per_cell
+        self.samples = samples
+
+    @classmethod
+    def fit(cls, samples: Sequence[Tuple[int, float, Optional[int]]]) -> Optional["LatencyModel"]:
+        pts = [(c, s) for c, s, _ in samples if c > 0]
+        if not pts:
+            return None
+        sizes = [b / c for c, _, b in samples if b and c > 0]
+        bytes_per_cell = statistics.median(sizes) if sizes else None
+
+        xs = [c for c, _ in pts]
+        ys = [s for _, s in pts]
+        if len(set(xs)) >= 3:
+            mx, my = statistics.fmean(xs), statistics.fmean(ys)
+            var = sum((x - mx) ** 2 for x in xs)
+            slope = sum((x - mx) * (y - my) for x, y in pts) / var
+            intercept = my - slope * mx
+            if slope >= 0 and intercept >= 0:
+                return cls(intercept, slope, bytes_per_cell, len(pts))
+        return cls(0.0, statistics.median(s / c for c, s in pts), bytes_per_cell, len(pts))
+
+    def seconds(self, cells: int) -> float:
+        return self.intercept + self.per_cell * cells
+
+
+class CostModel:
+    """
+    Estimated seconds of a chunk from what is in it: per identifier, its
+    cells (fields × observations) times its own historical seconds per cell,
+    else the average of its yellow key, else the LatencyModel's rate; plus
+    the model's fixed per-chunk cost. Without any history every identifier
+    costs the same, i.e. chunk cost follows chunk size.
+    """
+
+    def __init__(self, kind: str, n_fields: int, params: Optional[Dict], model: Optional[LatencyModel] = None,
+                 rates: Optional[Dict[str, float]] = None, yellow_key_rates: Optional[Dict[str, float]] = None):
+        self.cells_per_id = max(1, n_fields) * observations(kind, params)
+        self.intercept = model.intercept if model else 0.0
+        self.default_rate = model.per_cell if model and model.per_cell > 0 else 1.0
+        self.rates = rates or {}
+        self.yellow_key_rates = yellow_key_rates or {}
+
+    @classmethod
+    def from_history(cls, history, kind: str, n_fields: int, params: Optional[Dict]) -> "CostModel":
+        if history is None:
+            return cls(kind, n_fields, params)
+        return cls(kind, n_fields, params, LatencyModel.fit(history.samples(kind)),
+                   history.identifier_rates(kind), history.yellow_key_rates(kind))
+
+    def identifier_cost(self, identifier: Dict) -> float:
+        rate = (self.rates.get(str(identifier.get("id", "")))
+                or self.yellow_key_rates.get(str(identifier.get("yellow_key", "")))
+                or self.default_rate)
+        return self.cells_per_id * rate
+
+    def chunk_cost(self, batch: Sequence[Dict]) -> float:
+        return self.intercept + sum(self.identifier_cost(x) for x in batch)
+
+
+class PlanEstimate:
+    """
+    Streaming accumulator over chunk sizes: counts, cells and the estimated
+    bytes and wall time of a run.
+    """
+
+    def __init__(self, kind: str, n_fields: int, params: Optional[Dict], model: Optional[LatencyModel]):
+        self.kind = kind
+        self.n_fields = n_fields
+        self.obs = observations(kind, params)
+        self.model = model
+        self.chunk_cells: List[int] = []
+        self.identifiers = 0
+
+    def add(self, identifiers: int) -> int:
+        cells = identifiers * max(1, self.n_fields) * self.obs
+        self.identifiers += identifiers
+        self.chunk_cells.append(cells)
+        return cells
+
+    @property
+    def cells(self) -> int:
+        return sum(self.chunk_cells)
+
+    def bytes(self) -> int:
+        per_cell = (self.model.bytes_per_cell if self.model and self.model.bytes_per_cell
+                    else DEFAULT_BYTES_PER_CELL.get(self.kind, 50))
+        return int(self.cells * per_cell)
+
+    def wall_seconds(self, fetch_workers: int = 1, submit_per_second: float = 0.0) -> Optional[float]:
+        """
+        Chunk latencies spread over `fetch_workers` (greedy, in order), but no
+        faster than the submit rate limit allows. None without history.
+        """
+        if self.model is None:
+            return None
+        lanes = [0.0] * max(1, fetch_workers)
+        for c in self.chunk_cells:
+            i = lanes.index(min(lanes))
+            lanes[i] += self.model.seconds(c)
+        wall = max(lanes)
+        if submit_per_second > 0:
+            wall = max(wall, len(self.chunk_cells) / submit_per_second)
+        return wall
+
+    def summary(self, fetch_workers: int = 1, submit_per_second: float = 0.0) -> Dict[str, object]:
+        cc = self.chunk_cells
+        wall = self.wall_seconds(fetch_workers, submit_per_second)
+        return {
+            "chunks": len(cc),
+            "identifiers": self.identifiers,
+            "fields": self.n_fields,
+            "observations_per_identifier": self.obs,
+            "cells": self.cells,
+            "cells_per_chunk_min": min(cc, default=0),
+            "cells_per_chunk_median": int(statistics.median(cc)) if cc else 0,
+            "cells_per_chunk_max": max(cc, default=0),
+            "estimated_bytes": self.bytes(),
+            "bytes_source": "history" if self.model and self.model.bytes_per_cell else "default",
+            "estimated_wall_seconds": round(wall, 1) if wall is not None else None,
+            "latency_samples": self.model.samples if self.model else 0,
+        }
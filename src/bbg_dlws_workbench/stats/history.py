@@ -0,0 +1,224 @@
+# src/bbg_dlws_workbench/stats/history.py
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    id             INTEGER PRIMARY KEY,
+    run_id         TEXT NOT NULL,
+    kind           TEXT NOT NULL,
+    identifiers    INTEGER NOT NULL,
+    fields         INTEGER NOT NULL,
+    cells          INTEGER NOT NULL,
+    seconds        REAL NOT NULL,
+    response_bytes INTEGER,
+    ok             INTEGER NOT NULL,
+    recorded_at    REAL NOT NULL,
+    submitted_at   REAL,
+    submit_seconds REAL,
+    ready_seconds  REAL,
+    poll_attempts  INTEGER,
+    statuses       TEXT,
+    rows           INTEGER
+);
+CREATE INDEX IF NOT EXISTS chunks_kind ON chunks (kind, ok, recorded_at);
+CREATE TABLE IF NOT EXISTS identifier_rates (
+    kind             TEXT NOT NULL,
+    identifier       TEXT NOT NULL,
+    yellow_key       TEXT NOT NULL,
+    seconds_per_cell REAL NOT NULL,
+    samples          INTEGER NOT NULL,
+    recorded_at      REAL NOT NULL,
+    PRIMARY KEY (kind, identifier)
+);
+"""
+
+# Columns added after the first release: ALTERed into older history files
+_CHUNK_COLUMNS = {
+    "submitted_at": "REAL",
+    "submit_seconds": "REAL",
+    "ready_seconds": "REAL",
+    "poll_attempts": "INTEGER",
+    "statuses": "TEXT",
+    "rows": "INTEGER",
+}
+
+# Metrics summarized by stats(), in output order
+STAT_METRICS = ("ready_seconds", "seconds", "poll_attempts", "response_bytes", "rows")
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Weight of the newest chunk in an identifier's moving-average rate
+RATE_ALPHA = 0.3
+
+
+class RunHistory:
+    """
+    Per-chunk outcomes of past runs in a local SQLite file: size of the
+    request, wall time from submit to retrieved response, and response size.
+    Used to estimate the cost of future runs (`bbg-dlws plan`).
+
+    Async chunks also keep when they were submitted, how long the submit
+    took, submit-to-ready latency, poll attempts and the sequence of DLWS
+    status codes the Poller saw; the pipeline adds the rows each response
+    produced (record_rows). stats() summarizes them (`bbg-dlws stats`).
+
+    Each identifier of a successful chunk also gets the chunk's seconds per
+    cell folded into a moving average, so chunks can be costed (and
+    scheduled) by what they contain (see stats.CostModel).
+    """
+
+    def __init__(self, path: str, run_id: Optional[str] = None):
+        self.path = path
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # written from the pipeline's fetch threads
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(chunks)")}
+        with self._conn:
+            for name, decl in _CHUNK_COLUMNS.items():
+                if name not in existing:
+                    self._conn.execute(f"ALTER TABLE chunks ADD COLUMN {name} {decl}")
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "RunHistory":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def record_chunk(
+            self,
+            kind: str,
+            identifiers: int,
+            fields: int,
+            cells: int,
+            seconds: float,
+            response_bytes: Optional[int] = None,
+            ok: bool = True,
+            ids: Optional[Sequence[Tuple[str, str]]] = None,
+            submitted_at: Optional[float] = None,
+            submit_seconds: Optional[float] = None,
+            ready_seconds: Optional[float] = None,
+            statuses: Optional[Sequence[str]] = None,
+    ) -> int:
+        """
+        `ids`: (identifier, yellow_key) of the chunk's instruments, if known.
+        `statuses`: one entry per poll attempt (see Poller.poll). Returns the
+        chunk's record id, for record_rows().
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT INTO chunks (run_id, kind, identifiers, fields, cells, seconds, response_bytes, ok, recorded_at, "
+                "submitted_at, submit_seconds, ready_seconds, poll_attempts, statuses) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.run_id, kind, identifiers, fields, cells, seconds, response_bytes, int(ok), now,
+                 submitted_at, submit_seconds, ready_seconds, None if statuses is None else len(statuses),
+                 None if statuses is None else ",".join(statuses)),
+            )
+            if ok and ids and cells > 0:
+                rate = seconds / cells
+                self._conn.executemany(
+                    "INSERT INTO identifier_rates (kind, identifier, yellow_key, seconds_per_cell, samples, recorded_at) "
+                    "VALUES (?, ?, ?, ?, 1, ?) ON CONFLICT (kind, identifier) DO UPDATE SET "
+                    "seconds_per_cell = seconds_per_cell + ? * (excluded.seconds_per_cell - seconds_per_cell), "
+                    "yellow_key = excluded.yellow_key, samples = samples + 1, recorded_at = excluded.recorded_at",
+                    [(kind, ident, yk, rate, now, RATE_ALPHA) for ident, yk in ids],
+                )
+        return cur.lastrowid
+
+    def record_rows(self, record_id: int, rows: int) -> None:
+        """
+        Add `rows` normalized rows to a chunk recorded by record_chunk().
+        """
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE chunks SET rows = COALESCE(rows, 0) + ? WHERE id = ?", (rows, record_id))
+
+    def samples(self, kind: str, limit: int = 500) -> List[Tuple[int, float, Optional[int]]]:
+        """
+        (cells, seconds, response_bytes) of the most recent successful chunks of `kind`.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT cells, seconds, response_bytes FROM chunks WHERE kind = ? AND ok = 1 "
+                "ORDER BY recorded_at DESC LIMIT ?",
+                (kind, limit),
+            ).fetchall()
+
+    def identifier_rates(self, kind: str) -> Dict[str, float]:
+        """
+        {identifier: seconds per cell} (moving average) for `kind`.
+        """
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT identifier, seconds_per_cell FROM identifier_rates WHERE kind = ?", (kind,)
+            ).fetchall())
+
+    def yellow_key_rates(self, kind: str) -> Dict[str, float]:
+        """
+        {yellow_key: mean seconds per cell of its identifiers} for `kind`.
+        """
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT yellow_key, AVG(seconds_per_cell) FROM identifier_rates WHERE kind = ? GROUP BY yellow_key",
+                (kind,),
+            ).fetchall())
+
+    def stats(self, kind: Optional[str] = None, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        One summary per (kind, identifiers per chunk, fields): chunk and
+        failure counts, QUANTILES of each of STAT_METRICS over successful
+        chunks (as "<metric>_p50" etc., None without samples) and the most
+        common status sequence. `since` is a unix time.
+        """
+        where, args = ["1 = 1"], []
+        if kind:
+            where.append("kind = ?")
+            args.append(kind)
+        if since is not None:
+            where.append("recorded_at >= ?")
+            args.append(since)
+        with self._lock:
+            records = self._conn.execute(
+                f"SELECT kind, identifiers, fields, ok, statuses, {', '.join(STAT_METRICS)} FROM chunks "
+                f"WHERE {' AND '.join(where)} ORDER BY kind, identifiers, fields",
+                args,
+            ).fetchall()
+
+        groups: Dict[Tuple[str, int, int], List[Tuple]] = {}
+        for r in records:
+            groups.setdefault(r[:3], []).append(r[3:])
+        out = []
+        for (k, identifiers, fields), recs in groups.items():
+            good = [r for r in recs if r[0]]
+            summary: Dict[str, Any] = {
+                "kind": k, "identifiers": identifiers, "fields": fields,
+                "chunks": len(recs), "failed": len(recs) - len(good),
+            }
+            for i, metric in enumerate(STAT_METRICS, start=2):
+                values = sorted(r[i] for r in good if r[i] is not None)
+                for q in QUANTILES:
+                    summary[f"{metric}_p{round(q * 100)}"] = _quantile(values, q)
+            sequences: Dict[str, int] = {}
+            for r in recs:
+                if r[1] is not None:
+                    sequences[r[1]] = sequences.get(r[1], 0) + 1
+            summary["statuses"] = max(sequences, key=sequences.get) if sequences else None
+            out.append(summary)
+        return out
+
+
+def _quantile(ordered: Sequence[float], q: float) -> Optional[float]:
+    # nearest rank, as RetrieveLatency.percentile
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
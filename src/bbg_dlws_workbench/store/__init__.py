@@ -1,8 +1,21 @@
 
+import re
+
+from .compression import COMPRESSIONS, Compressor, compressed_path, open_text, read_bytes
 from .filesystem import FileSystemStore
+from .sqlite import SqliteStore, is_sqlite_uri
+
+# "<scheme>:" prefix; one letter is a Windows drive, not a scheme
+_SCHEME_RE = re.compile(r"[A-Za-z][A-Za-z0-9+.-]+:")
 
-def resolve_store(uri: str):
+def resolve_store(uri: str, **options):
+    # options: compression / level / threads (see FileSystemStore)
     if uri.startswith("s3://"):
         # Future: return S3Store()
         raise NotImplementedError("S3 output not implemented yet. Please use a local path.")
-    return FileSystemStore()
+    if _SCHEME_RE.match(uri):
+        # would otherwise be written as a relative path named after the URI
+        raise ValueError(f"Unsupported output URI: {uri!r} (use a local path; *.sqlite / *.db for SQLite)")
+    if is_sqlite_uri(uri):
+        return SqliteStore(**options)
+    return FileSystemStore(**options)
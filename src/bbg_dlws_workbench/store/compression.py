@@ -0,0 +1,224 @@
+# src/bbg_dlws_workbench/store/compression.py
+import gzip
+import hashlib
+import io
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, Iterator, Optional
+
+COMPRESSIONS = ("none", "gzip", "zstd")
+EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+# Auto mode: multi-threaded zstd from this many bytes (files) or rows (CSV writes) on
+LARGE_BYTES = 8 * 1024 * 1024
+LARGE_ROWS = 20_000
+
+_BLOCK = 1024 * 1024
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "output.compression: zstd needs zstandard; install it with `pip install 'bbg-dlws-workbench[zstd]'`"
+        ) from e
+    return zstandard
+
+
+def compressed_path(uri: str, compression: str) -> str:
+    """
+    Where a store with `compression` writes `uri`: <uri>.gz / <uri>.zst.
+    """
+    ext = EXTENSIONS.get(compression, "")
+    return uri if not ext or uri.endswith(ext) else uri + ext
+
+
+def compression_of(path: str) -> str:
+    for name, ext in EXTENSIONS.items():
+        if path.endswith(ext):
+            return name
+    return "none"
+
+
+def sidecar_path(path: str) -> str:
+    return path + ".sha256"
+
+
+class _HashingFile(io.RawIOBase):
+    """
+    Write-only file that feeds every byte written to a running digest.
+    """
+
+    def __init__(self, f: BinaryIO, digest):
+        self._f = f
+        self._digest = digest
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._digest.update(b)
+        return self._f.write(b)
+
+    def flush(self) -> None:
+        self._f.flush()
+
+
+class _TextSink:
+    """
+    Minimal text stream for csv writers: encodes to UTF-8 and hands the
+    compressor blocks of about 1 MB.
+    """
+
+    def __init__(self, out: BinaryIO):
+        self._out = out
+        self._parts = []
+        self._size = 0
+
+    def write(self, s: str) -> int:
+        self._parts.append(s)
+        self._size += len(s)
+        if self._size >= _BLOCK:
+            self.flush()
+        return len(s)
+
+    def flush(self) -> None:
+        if self._parts:
+            self._out.write("".join(self._parts).encode("utf-8"))
+            self._parts = []
+            self._size = 0
+
+
+class Compressor:
+    """
+    Streaming compression of store outputs.
+
+      - every open() appends one gzip member / zstd frame, so appending to a
+        compressed file keeps it readable as a whole (concatenated frames)
+      - zstd uses `threads` worker threads; None means single-threaded for
+        small writes and all cores for large ones (see LARGE_BYTES/LARGE_ROWS)
+      - next to each compressed file, <file>.sha256 holds the SHA-256 of its
+        bytes (sha256sum format); the digest is kept running across appends,
+        seeded from the file already on disk the first time it's appended to
+    """
+
+    def __init__(self, compression: str = "none", level: Optional[int] = None, threads: Optional[int] = None):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unsupported compression: {compression!r} (expected one of {', '.join(COMPRESSIONS)})")
+        if compression == "zstd":
+            _zstd()  # fail at setup, not at the first write
+        self.compression = compression
+        self.level = level
+        self.threads = threads
+        self._digests: Dict[str, "hashlib._Hash"] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.compression != "none"
+
+    def path(self, uri: str) -> str:
+        return compressed_path(uri, self.compression)
+
+    def _digest(self, path: str, append: bool):
+        with self._lock:
+            digest = self._digests.get(path) if append else None
+            if digest is None:
+                digest = hashlib.sha256()
+                if append and os.path.exists(path):
+                    with open(path, "rb") as f:
+                        for block in iter(lambda: f.read(_BLOCK), b""):
+                            digest.update(block)
+                self._digests[path] = digest
+            return digest
+
+    def _threads(self, large: bool) -> int:
+        if self.threads is not None:
+            return self.threads
+        return -1 if large else 0  # -1: one per logical CPU
+
+    @contextmanager
+    def open(self, path: str, append: bool = False, large: bool = False) -> Iterator[BinaryIO]:
+        """
+        Binary stream that compresses into `path` (already compressed_path'd).
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        digest = self._digest(path, append)
+        with open(path, "ab" if append else "wb") as raw:
+            sink = _HashingFile(raw, digest)
+            if self.compression == "gzip":
+                level = 6 if self.level is None else self.level
+                with gzip.GzipFile(filename="", mode="wb", fileobj=sink, compresslevel=level, mtime=0) as out:
+                    yield out
+            else:
+                zstandard = _zstd()
+                params = zstandard.ZstdCompressionParameters.from_level(
+                    3 if self.level is None else self.level, threads=self._threads(large), write_checksum=True,
+                )
+                cctx = zstandard.ZstdCompressor(compression_params=params)
+                with cctx.stream_writer(sink, closefd=False) as out:
+                    yield out
+            sink.flush()
+        self._write_sidecar(path, digest.hexdigest())
+
+    @contextmanager
+    def open_text(self, path: str, append: bool = False, large: bool = False) -> Iterator["_TextSink"]:
+        with self.open(path, append, large) as out:
+            text = _TextSink(out)
+            yield text
+            text.flush()
+
+    def compress_file(self, local_path: str, path: str) -> None:
+        """
+        Compress a finished local file into `path` and remove the original.
+        """
+        large = os.path.getsize(local_path) >= LARGE_BYTES
+        with open(local_path, "rb") as src, self.open(path, append=False, large=large) as out:
+            shutil.copyfileobj(src, out, _BLOCK)
+        os.remove(local_path)
+
+    @staticmethod
+    def _write_sidecar(path: str, hexdigest: str) -> None:
+        tmp = sidecar_path(path) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(f"{hexdigest}  {os.path.basename(path)}\n")
+        os.replace(tmp, sidecar_path(path))
+
+
+def read_bytes(path: str) -> bytes:
+    """
+    Whole content of a (possibly compressed, possibly multi-frame) file.
+    """
+    compression = compression_of(path)
+    if compression == "gzip":
+        with gzip.open(path, "rb") as f:
+            return f.read()
+    if compression == "zstd":
+        with open(path, "rb") as f:
+            reader = _zstd().ZstdDecompressor().stream_reader(f, read_across_frames=True)
+            return reader.read()
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@contextmanager
+def open_text(path: str) -> Iterator[io.TextIOBase]:
+    """
+    Read a store output as text, decompressing by extension.
+    """
+    compression = compression_of(path)
+    if compression == "gzip":
+        f = gzip.open(path, "rt", encoding="utf-8", newline="")
+    elif compression == "zstd":
+        raw = open(path, "rb")
+        reader = _zstd().ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+        f = io.TextIOWrapper(io.BufferedReader(reader), encoding="utf-8", newline="")
+    else:
+        f = open(path, "r", encoding="utf-8", newline="")
+    try:
+        yield f
+    finally:
+        f.close()
@@ -1,24 +1,88 @@
 
-import csv, os
-from typing import Iterable, Mapping
+import csv, json, os, shutil
+from datetime import date
+from typing import Any, Dict, Iterable, Mapping, Optional
 from .base import Store
+from .compression import LARGE_ROWS, Compressor
+from ..transform.rows import CompactRow
+
+def _csv_value(v: Any) -> Any:
+    # Typed rows may carry dates and nested lists (decoded bulk arrays)
+    if isinstance(v, list):
+        return json.dumps(v, default=str)
+    if isinstance(v, date):
+        return v.isoformat()
+    return v
 
 class FileSystemStore(Store):
+    """
+    Local files. With `compression` ("gzip" / "zstd"), every file is written
+    through a streaming compressor to <uri>.gz / <uri>.zst with a .sha256
+    sidecar, and appends add a frame (see store.compression.Compressor).
+    """
+
+    def __init__(self, compression: str = "none", level: Optional[int] = None, threads: Optional[int] = None):
+        self._compressor = Compressor(compression, level, threads)
+
+    @property
+    def options(self) -> Dict[str, Any]:
+        """
+        Constructor arguments, for recreating the store in worker processes.
+        """
+        c = self._compressor
+        return {"compression": c.compression, "level": c.level, "threads": c.threads}
+
+    def path(self, uri: str) -> str:
+        """
+        File actually written for `uri`.
+        """
+        return self._compressor.path(uri)
+
     def write_text(self, uri: str, text: str) -> None:
+        if self._compressor.enabled:
+            with self._compressor.open(self.path(uri)) as out:
+                out.write(text.encode("utf-8"))
+            return
         folder = os.path.dirname(uri) or "."
         os.makedirs(folder, exist_ok=True)
         with open(uri, "w", encoding="utf-8") as f:
             f.write(text)
 
+    def put_file(self, uri: str, local_path: str) -> None:
+        if self._compressor.enabled:
+            self._compressor.compress_file(local_path, self.path(uri))
+            return
+        # Moves (renames when on the same filesystem) a finished local file into place
+        folder = os.path.dirname(uri) or "."
+        os.makedirs(folder, exist_ok=True)
+        shutil.move(local_path, uri)
+
     def write_rows_to_csv(self, uri: str, rows: Iterable[Mapping], append: bool) -> None:
         rows = list(rows)
         if not rows:
             return
-        folder = os.path.dirname(uri) or "."
+        path = self.path(uri)
+        folder = os.path.dirname(path) or "."
         os.makedirs(folder, exist_ok=True)
-        mode = "a" if append and os.path.exists(uri) else "w"
-        with open(uri, mode, newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
-            if mode == "w":
-                writer.writeheader()
-            writer.writerows(rows)
+        mode = "a" if append and os.path.exists(path) else "w"
+        if self._compressor.enabled:
+            with self._compressor.open_text(path, append=mode == "a", large=len(rows) >= LARGE_ROWS) as f:
+                self._write_csv(f, rows, header=mode == "w")
+            return
+        with open(path, mode, newline="", encoding="utf-8") as f:
+            self._write_csv(f, rows, header=mode == "w")
+
+    @staticmethod
+    def _write_csv(f, rows, header: bool) -> None:
+        first = rows[0]
+        if isinstance(first, CompactRow) and all(type(r) is CompactRow and r.header is first.header for r in rows):
+            # one shared header: write the value tuples as they are
+            writer = csv.writer(f)
+            if header:
+                writer.writerow(first.header.names)
+            writer.writerows(map(_csv_value, r.values) for r in rows)
+            return
+        writer = csv.DictWriter(f, fieldnames=list(first.keys()))
+        if header:
+            writer.writeheader()
+        writer.writerows({k: _csv_value(v) for k, v in r.items()} for r in rows)
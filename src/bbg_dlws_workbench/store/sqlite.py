@@ -0,0 +1,178 @@
+import os, sqlite3, threading
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+from .base import Store
+from .filesystem import FileSystemStore, _csv_value
+from ..transform.rows import CompactRow
+
+SQLITE_EXTENSIONS = (".sqlite", ".sqlite3", ".db")
+TABLE = "rows"
+
+
+def is_sqlite_uri(uri: str) -> bool:
+    return uri.lower().endswith(SQLITE_EXTENSIONS)
+
+
+def _q(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _db_value(v: Any) -> Any:
+    if v is None or isinstance(v, (int, float, str, bytes)):
+        return v
+    return _csv_value(v)
+
+
+def _primary_key(table_info: List[Tuple]) -> List[str]:
+    # PRAGMA table_info rows: (cid, name, type, notnull, default, pk position)
+    return [row[1] for row in sorted((r for r in table_info if r[5]), key=lambda r: r[5])]
+
+
+class SqliteStore(Store):
+    """
+    Upserting store for *.sqlite / *.db outputs.
+
+    Rows go into one table keyed by (identifier, date) when the rows carry a
+    date (history) and by identifier otherwise. The table is clustered on the
+    key (WITHOUT ROWID), so a re-run only rewrites the pages of the keys it
+    touches; columns of new fields are added on the fly, and an update only
+    sets the columns present in the incoming rows. `append` is ignored: every
+    write is a merge.
+
+    Non-SQLite URIs (raw XML, reject and failure reports) go to the filesystem,
+    compressed when `compression` is set; the database itself is not.
+    """
+
+    def __init__(self, compression: str = "none", level: Optional[int] = None, threads: Optional[int] = None):
+        self._fs = FileSystemStore(compression, level, threads)
+        self._conns: Dict[str, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+
+    def _conn(self, uri: str) -> sqlite3.Connection:
+        conn = self._conns.get(uri)
+        if conn is None:
+            os.makedirs(os.path.dirname(uri) or ".", exist_ok=True)
+            conn = sqlite3.connect(uri, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._conns[uri] = conn
+        return conn
+
+    @property
+    def options(self) -> Dict[str, Any]:
+        return self._fs.options
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._conns.values():
+                conn.close()
+            self._conns.clear()
+
+    # ---------------- Store protocol ----------------
+
+    def write_text(self, uri: str, text: str) -> None:
+        self._fs.write_text(uri, text)
+
+    def put_file(self, uri: str, local_path: str) -> None:
+        self._fs.put_file(uri, local_path)
+
+    def write_rows_to_csv(self, uri: str, rows: Iterable[Mapping], append: bool) -> None:
+        # Name kept for the Store protocol; for SQLite URIs this is an upsert
+        if not is_sqlite_uri(uri):
+            return self._fs.write_rows_to_csv(uri, rows, append)
+        self.upsert(uri, rows)
+
+    # ---------------- SQLite ----------------
+
+    def upsert(self, uri: str, rows: Iterable[Mapping]) -> int:
+        """
+        Insert or update rows by key. Returns the number of rows written.
+        """
+        # group by column set; rows of one response normally share it
+        groups: Dict[Tuple[str, ...], List[Tuple]] = {}
+        for r in rows:
+            if type(r) is CompactRow:
+                groups.setdefault(r.header.names, []).append(tuple(map(_db_value, r.values)))
+                continue
+            cols = tuple(r.keys())
+            groups.setdefault(cols, []).append(tuple(_db_value(r[c]) for c in cols))
+        if not groups:
+            return 0
+        with self._lock:
+            conn = self._conn(uri)
+            with conn:
+                n = 0
+                for cols, values in groups.items():
+                    key = self._ensure_table(conn, cols)
+                    missing = [k for k in key if k not in cols]
+                    if missing:
+                        raise ValueError(f"Rows for {uri} lack key column(s): {', '.join(missing)}")
+                    updates = [c for c in cols if c not in key]
+                    sql = (
+                        f"INSERT INTO {_q(TABLE)} ({', '.join(map(_q, cols))}) "
+                        f"VALUES ({', '.join('?' * len(cols))}) "
+                        f"ON CONFLICT ({', '.join(map(_q, key))}) "
+                        + (f"DO UPDATE SET {', '.join(f'{_q(c)} = excluded.{_q(c)}' for c in updates)}"
+                           if updates else "DO NOTHING")
+                    )
+                    conn.executemany(sql, values)
+                    n += len(values)
+        return n
+
+    def _ensure_table(self, conn: sqlite3.Connection, cols: Sequence[str]) -> List[str]:
+        info = conn.execute(f"PRAGMA table_info({_q(TABLE)})").fetchall()
+        if not info:
+            key = ["identifier", "date"] if "date" in cols else ["identifier"]
+            others = [c for c in cols if c not in key]
+            defs = [f"{_q(k)} TEXT NOT NULL" for k in key] + [_q(c) for c in others]
+            conn.execute(
+                f"CREATE TABLE {_q(TABLE)} ({', '.join(defs)}, PRIMARY KEY ({', '.join(map(_q, key))})) WITHOUT ROWID"
+            )
+            return key
+        existing = {row[1] for row in info}
+        for c in cols:
+            if c not in existing:
+                conn.execute(f"ALTER TABLE {_q(TABLE)} ADD COLUMN {_q(c)}")
+        return _primary_key(info)
+
+    def _key(self, conn: sqlite3.Connection) -> List[str]:
+        return _primary_key(conn.execute(f"PRAGMA table_info({_q(TABLE)})").fetchall())
+
+    def _select(self, uri: str, sql: str, params: Sequence = ()) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            conn = self._conn(uri)
+            cur = conn.execute(sql, params)
+            names = [d[0] for d in cur.description]
+            rows = cur.fetchall()
+        for r in rows:
+            yield dict(zip(names, r))
+
+    def read(self, uri: str, identifiers: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        All rows in key order, optionally for some identifiers only.
+        """
+        with self._lock:
+            key = self._key(self._conn(uri))
+        if not key:
+            return iter(())
+        where, params = "", []
+        if identifiers:
+            where = ' WHERE "identifier" IN (' + ", ".join("?" * len(identifiers)) + ")"
+            params = list(identifiers)
+        return self._select(uri, f"SELECT * FROM {_q(TABLE)}{where} ORDER BY {', '.join(map(_q, key))}", params)
+
+    def latest(self, uri: str) -> Iterator[Dict[str, Any]]:
+        """
+        Latest row per identifier (the row itself for data outputs).
+        Served from the primary key: one index seek per identifier.
+        """
+        with self._lock:
+            key = self._key(self._conn(uri))
+        if not key:
+            return iter(())
+        if "date" not in key:
+            return self._select(uri, f'SELECT * FROM {_q(TABLE)} ORDER BY "identifier"')
+        return self._select(
+            uri,
+            f"SELECT t.* FROM {_q(TABLE)} t "
+            f'JOIN (SELECT "identifier", MAX("date") AS d FROM {_q(TABLE)} GROUP BY "identifier") m '
+            f'ON t."identifier" = m."identifier" AND t."date" = m.d ORDER BY t."identifier"',
+        )
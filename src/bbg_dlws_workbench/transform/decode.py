@@ -0,0 +1,208 @@
+# src/bbg_dlws_workbench/transform/decode.py
+import csv
+import logging
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping, Optional, Tuple
+
+from .rows import CompactRow, RowHeader
+
+logger = logging.getLogger("bbg-dlws-workbench.decode")
+
+# Placeholders DLWS puts in a cell instead of a value
+NULL_SENTINELS = {
+    "",
+    "N.A.",
+    "N.A",
+    "N/A",
+    "#N/A",
+    "N.S.",
+    "N.D.",
+    "FLD UNKNOWN",
+    "NOT DOWNLOADABLE",
+    "NOT APPLICABLE",
+    "INVALID SECURITY",
+}
+
+# getFields datatype (lower-cased) -> decoder kind
+DATATYPE_KINDS = {
+    "price": "float",
+    "real": "float",
+    "numeric": "float",
+    "double": "float",
+    "float": "float",
+    "integer/real": "float",
+    "integer": "int",
+    "long integer": "int",
+    "long": "int",
+    "date": "date",
+    "datetime": "datetime",
+    "date/time": "datetime",
+    "boolean": "bool",
+    "bool": "bool",
+    "bulk format": "bulk",
+    "bulk": "bulk",
+}
+
+_DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%Y%m%d")
+_TRUE = {"Y", "YES", "TRUE", "T", "1"}
+_FALSE = {"N", "NO", "FALSE", "F", "0"}
+
+
+def is_null(raw: Any) -> bool:
+    if raw is None:
+        return True
+    return isinstance(raw, str) and raw.strip().upper() in NULL_SENTINELS
+
+
+def _to_float(raw: Any) -> float:
+    return float(str(raw).replace(",", ""))
+
+def _to_int(raw: Any) -> int:
+    s = str(raw).replace(",", "")
+    try:
+        return int(s)
+    except ValueError:
+        # DLWS sometimes renders integers as "12.0000"
+        f = float(s)
+        if not f.is_integer():
+            raise
+        return int(f)
+
+def _to_date(raw: Any) -> date:
+    if isinstance(raw, datetime):
+        return raw.date()
+    if isinstance(raw, date):
+        return raw
+    s = str(raw).strip()
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(s, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date: {s!r}")
+
+def _to_datetime(raw: Any) -> datetime:
+    if isinstance(raw, datetime):
+        return raw
+    return datetime.fromisoformat(str(raw).strip())
+
+def _to_bool(raw: Any) -> bool:
+    if isinstance(raw, bool):
+        return raw
+    s = str(raw).strip().upper()
+    if s in _TRUE:
+        return True
+    if s in _FALSE:
+        return False
+    raise ValueError(f"Unrecognized boolean: {raw!r}")
+
+# Untyped digit strings that are codes rather than numbers: leading zero
+# (CUSIP 037833100, SEDOL 0263494) or 8+ digits (CUSIPs, YYYYMMDD dates)
+_CODE_RE = re.compile(r"\s*(0\d+|\d{8,})\s*")
+
+def _infer(raw: Any) -> Any:
+    """
+    Best-effort decoding for cells without a declared datatype (e.g. bulk array entries).
+    Code-like digit strings (_CODE_RE) are kept as they are.
+    """
+    if not isinstance(raw, str) or _CODE_RE.fullmatch(raw):
+        return raw
+    for fn in (_to_int, _to_float, _to_date):
+        try:
+            return fn(raw)
+        except (ValueError, OverflowError):
+            continue
+    return raw
+
+def _to_bulk(raw: Any) -> Any:
+    if isinstance(raw, list):
+        return [_to_bulk(x) if isinstance(x, list) else (None if is_null(x) else _infer(x)) for x in raw]
+    return raw
+
+_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    "float": _to_float,
+    "int": _to_int,
+    "date": _to_date,
+    "datetime": _to_datetime,
+    "bool": _to_bool,
+    "bulk": _to_bulk,
+}
+
+
+def datatype_kind(datatype: Optional[str]) -> str:
+    """
+    Map a getFields datatype ("Price", "Integer", "Date", ...) to a decoder kind.
+    Unknown datatypes are kept as strings.
+    """
+    if not datatype:
+        return "str"
+    return DATATYPE_KINDS.get(str(datatype).strip().lower(), "str")
+
+
+def decode_value(raw: Any, kind: str) -> Any:
+    """
+    Convert one raw DLWS cell according to a decoder kind.
+    Sentinels become None; cells that fail to convert are kept as received.
+    """
+    if isinstance(raw, list):
+        return _to_bulk(raw)
+    if is_null(raw):
+        return None
+    conv = _CONVERTERS.get(kind)
+    if conv is None:
+        return raw
+    try:
+        return conv(raw)
+    except (ValueError, OverflowError):
+        logger.debug(f"Could not decode {raw!r} as {kind}; keeping raw value")
+        return raw
+
+
+def decode_rows(rows: Iterable[Dict], datatypes: Mapping[str, str]) -> Iterator[Dict]:
+    """
+    Decode normalized rows in place using a {field: datatype} mapping
+    (CompactRows, being read-only, are replaced by decoded copies).
+    `identifier` is left untouched; `date` (history rows) is always decoded as a date.
+    Fields without metadata only get sentinel handling.
+    """
+    kinds: Dict[str, str] = {"date": "date"}
+    kinds.update({f: datatype_kind(t) for f, t in datatypes.items()})
+    layouts: Dict[RowHeader, Tuple[str, ...]] = {}  # CompactRow header -> decoder kind per column
+    for row in rows:
+        if isinstance(row, CompactRow):
+            layout = layouts.get(row.header)
+            if layout is None:
+                layout = layouts[row.header] = tuple(
+                    "" if k == "identifier" else kinds.get(k, "str") for k in row.header.names
+                )
+            yield row.with_values(tuple(v if not kd else decode_value(v, kd) for kd, v in zip(layout, row.values)))
+            continue
+        for k, v in row.items():
+            if k == "identifier":
+                continue
+            row[k] = decode_value(v, kinds.get(k, "str"))
+        yield row
+
+
+def load_datatypes(rows: Iterable[Mapping]) -> Dict[str, str]:
+    """
+    Build a {field: datatype} mapping from getFields metadata rows
+    (as produced by parse_fundamentals_headers / `bbg-dlws fields`).
+    """
+    out: Dict[str, str] = {}
+    for r in rows:
+        name = r.get("field")
+        if name:
+            out[str(name)] = str(r.get("datatype") or "")
+    return out
+
+
+def load_datatypes_from_csv(path: str) -> Dict[str, str]:
+    with Path(path).open(newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        missing = [c for c in ("field", "datatype") if c not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Missing required columns in {path}: {missing}")
+        return load_datatypes(reader)
@@ -1,15 +1,30 @@
 # src/bbg_dlws_workbench/transform/normalize.py
-from typing import Any, Dict, Iterable, Iterator, List, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-def soap_to_rows(kind: str, soap_response: Any, request_fields: List[str]) -> Iterable[Dict]:
+from .rows import CompactRow, Interner, RowHeader
+
+# bulk_sink(identifier, field, bulkarray) -> value to put in the row instead
+BulkSink = Callable[[str, str, Any], Any]
+
+def soap_to_rows(
+        kind: str,
+        soap_response: Any,
+        request_fields: List[str],
+        bulk_as_list: bool = False,
+        bulk_sink: Optional[BulkSink] = None,
+        compact: bool = False,
+) -> Iterable[Dict]:
     """
     Build rows using the fields as received in the SOAP response (response order),
     not the requested fields. We still prepend identifier (and date for history).
+    With bulk_as_list, bulk arrays are returned as nested lists instead of strings;
+    with bulk_sink, they are handed to the sink and the row gets its return value.
+    With compact, history rows are read-only CompactRows instead of dicts.
     """
     if kind == "history":
-        yield from parse_history(soap_response)
+        yield from parse_history(soap_response, compact=compact)
     elif kind == "data":
-        yield from parse_data(soap_response)
+        yield from parse_data(soap_response, bulk_as_list=bulk_as_list, bulk_sink=bulk_sink)
     elif kind == "fundamentals_headers":
         yield from parse_fundamentals_headers(soap_response)
     else:
@@ -18,7 +33,7 @@ def soap_to_rows(kind: str, soap_response: Any, request_fields: List[str]) -> It
 
 # -------------------- HISTORY (DLWS WSDL-compliant) --------------------
 
-def parse_history(resp: Any) -> Iterator[Dict]:
+def parse_history(resp: Any, compact: bool = False) -> Iterator[Dict]:
     """
     WSDL shape (RetrieveGetHistoryResponse):
       - responseId
@@ -37,6 +52,9 @@ def parse_history(resp: Any) -> Iterator[Dict]:
     Row produced:
       identifier, date, <field1>, <field2>, ...
       where field names come from response.fields.field (positional mapping to data[])
+
+    Identifiers, dates and field names are shared between the rows of a
+    response; with compact, rows are CompactRows (one header per response).
     """
     if not resp:
         return
@@ -57,6 +75,7 @@ def parse_history(resp: Any) -> Iterator[Dict]:
                     fname = _get_any(fo, ["field", "mnemonic", "name", "id"])
                     if fname:
                         field_names.append(str(fname))
+    make_row = _HistoryRows(field_names, compact)
 
     # 2) Iterate instrumentDatas.instrumentData[]
     container = _get_attr(resp, ["instrumentDatas"]) or resp
@@ -76,21 +95,7 @@ def parse_history(resp: Any) -> Iterator[Dict]:
             if _is_iterable(hist_values):
                 for hv in hist_values:
                     values.append(_get_any(hv, ["value"]))
-
-            row: Dict[str, Any] = {"identifier": ident, "date": date}
-
-            if field_names and len(values) >= len(field_names):
-                # Map by position
-                for i, fname in enumerate(field_names):
-                    if fname and fname not in row:
-                        row[fname] = values[i] if i < len(values) else None
-            else:
-                # Fallback: position-based generic columns
-                for i, val in enumerate(values, start=1):
-                    key = f"COL_{i}"
-                    if key not in row:
-                        row[key] = val
-            yield row
+            yield make_row(ident, date, values)
         return
 
     # 3) Dict-like fallback
@@ -108,23 +113,56 @@ def parse_history(resp: Any) -> Iterator[Dict]:
             values = []
             for hv in it.get("data", []):
                 values.append((hv.get("value") if isinstance(hv, dict) else hv))
+            yield make_row(ident, date, values)
 
-            row = {"identifier": ident, "date": date}
-            if field_names and len(values) >= len(field_names):
-                for i, fname in enumerate(field_names):
-                    if fname and fname not in row:
-                        row[fname] = values[i] if i < len(values) else None
-            else:
-                for i, val in enumerate(values, start=1):
-                    key = f"COL_{i}"
-                    if key not in row:
-                        row[key] = val
-            yield row
+
+class _HistoryRows:
+    """
+    Builds the history rows of one response: values map to the response's
+    field names by position (first occurrence wins), or to COL_1..COL_n when
+    a row has fewer values than fields. Strings are interned per response and
+    the column layout is computed once per shape.
+    """
+
+    def __init__(self, field_names: List[str], compact: bool):
+        self.intern = Interner()
+        self.compact = compact
+        self.n_fields = len(field_names)
+        names: List[str] = []
+        positions: List[int] = []
+        seen = {"identifier", "date"}
+        for i, fname in enumerate(field_names):
+            if fname and fname not in seen:
+                seen.add(fname)
+                names.append(self.intern(fname))
+                positions.append(i)
+        self.positions = positions
+        self.header = RowHeader(["identifier", "date", *names])
+        self._col_headers: Dict[int, RowHeader] = {}
+
+    def _cols(self, n: int) -> RowHeader:
+        header = self._col_headers.get(n)
+        if header is None:
+            header = self._col_headers[n] = RowHeader(["identifier", "date", *(f"COL_{i}" for i in range(1, n + 1))])
+        return header
+
+    def __call__(self, ident: str, date: str, values: List[Any]) -> Any:
+        ident = self.intern(ident)
+        date = self.intern(date)
+        if self.n_fields and len(values) >= self.n_fields:
+            header = self.header
+            row_values = (ident, date, *(values[i] for i in self.positions))
+        else:
+            header = self._cols(len(values))
+            row_values = (ident, date, *values)
+        if self.compact:
+            return CompactRow(header, row_values)
+        return dict(zip(header.names, row_values))
 
 
 # -------------------- DATA (DLWS WSDL-compliant) --------------------
 
-def parse_data(resp: Any) -> Iterator[Dict]:
+def parse_data(resp: Any, bulk_as_list: bool = False, bulk_sink: Optional[BulkSink] = None) -> Iterator[Dict]:
     """
     WSDL shape (RetrieveGetDataResponse):
       - fields (Fields)   [may be present, but each data item already has @field]
@@ -141,13 +179,16 @@ def parse_data(resp: Any) -> Iterator[Dict]:
 
     Row produced per instrument:
       identifier, <FIELD_A>, <FIELD_B>, ...
-      If a Data item is an array, we flatten bulkarray into a JSON-like string.
+      If a Data item is an array, we flatten bulkarray into a JSON-like string,
+      or keep it as a list of rows when bulk_as_list is set, or pass it to
+      bulk_sink (e.g. to stream it into a child table) and keep its return value.
     """
     if not resp:
         return
 
     container = _get_attr(resp, ["instrumentDatas"]) or resp
     items = _get_attr(container, ["instrumentData"]) or []
+    intern = Interner()  # field names repeat on every instrument
 
     if _is_iterable(items):
         for it in items:
@@ -161,15 +202,15 @@ def parse_data(resp: Any) -> Iterator[Dict]:
 
             if _is_iterable(datas):
                 for d in datas:
-                    fname = _get_any(d, ["field"])
+                    fname = intern(_get_any(d, ["field"]))
                     if not fname:
                         # Skip nameless cells
                         continue
                     val = _get_any(d, ["value"])
                     # Arrays: flatten bulkarray → JSON-like string to keep single CSV cell
-                    bulk = _get_attr(d, ["bulkarray"])
-                    if bulk is not None:
-                        val = _format_bulkarray(bulk)
+                    bulk = _unwrap_bulkarray(_get_attr(d, ["bulkarray"]))
+                    if bulk is not None and fname not in row:
+                        val = _bulk_value(ident, str(fname), bulk, bulk_as_list, bulk_sink)
                     if fname not in row:
                         row[str(fname)] = val
             yield row
@@ -190,13 +231,13 @@ def parse_data(resp: Any) -> Iterator[Dict]:
             for d in it.get("data", []):
                 if not isinstance(d, dict):
                     continue
-                fname = d.get("field")
+                fname = intern(d.get("field"))
                 if not fname:
                     continue
                 val = d.get("value")
-                bulk = d.get("bulkarray")
-                if bulk is not None:
-                    val = _format_bulkarray(bulk)
+                bulk = _unwrap_bulkarray(d.get("bulkarray"))
+                if bulk is not None and fname not in row:
+                    val = _bulk_value(ident, fname, bulk, bulk_as_list, bulk_sink)
                 if fname not in row:
                     row[fname] = val
             yield row
@@ -321,17 +362,49 @@ def _extract_ordered_fields(obj: Any) -> List[Tuple[str, Any]]:
 def _looks_like_fieldname(name: str) -> bool:
     return isinstance(name, str) and name == name.upper() and any(c.isalpha() for c in name)
 
-def _format_bulkarray(bulk: Any) -> str:
+def _unwrap_bulkarray(bulk: Any) -> Any:
     """
-    Convert BulkArray to a compact JSON-like string:
-      [[r1c1, r1c2, ...], [r2c1, r2c2, ...], ...]
+    zeep models bulkarray (maxOccurs=unbounded) as a list, empty for scalar cells.
     """
-    # Extract entries and optional columns
+    if isinstance(bulk, list):
+        if not bulk:
+            return None
+        return bulk[0]
+    return bulk
+
+def _bulk_value(ident: str, fname: str, bulk: Any, bulk_as_list: bool, bulk_sink: Optional[BulkSink]) -> Any:
+    if bulk_sink is not None:
+        return bulk_sink(ident, fname, bulk)
+    return _bulkarray_rows(bulk) if bulk_as_list else _format_bulkarray(bulk)
+
+def _bulk_columns(bulk: Any) -> Optional[int]:
     cols = _get_any(bulk, ["columns"])
     try:
-        cols = int(cols) if cols is not None else None
+        return int(cols) if cols is not None else None
     except Exception:
-        cols = None
+        return None
+
+def iter_bulk_cells(bulk: Any) -> Iterator[Tuple[int, int, Any]]:
+    """
+    (row, col, value) of every BulkArray entry, 1-based, in document order,
+    without building the rows. Without a column count every entry is in col 1.
+    """
+    cols = _bulk_columns(bulk) or 1
+    entries = _get_attr(bulk, ["data"]) or []
+    if not isinstance(entries, list) and not _is_iterable(entries):
+        return
+    for i, e in enumerate(entries):
+        value = e.get("value") if isinstance(e, dict) else _get_any(e, ["value"])
+        yield i // cols + 1, i % cols + 1, value
+
+def _bulkarray_rows(bulk: Any) -> List[Any]:
+    """
+    Convert BulkArray to nested lists:
+      [[r1c1, r1c2, ...], [r2c1, r2c2, ...], ...]
+    or a flat list when no column count is available.
+    """
+    # Extract entries and optional columns
+    cols = _bulk_columns(bulk)
 
     entries = _get_attr(bulk, ["data"]) or []
     flat_vals: List[Any] = []
@@ -349,10 +422,21 @@ def _format_bulkarray(bulk: Any) -> str:
         rows: List[List[Any]] = []
         for i in range(0, len(flat_vals), cols):
             rows.append(flat_vals[i : i + cols])
-        return "[" + ",".join("[" + ",".join(_safe_scalar(x) for x in r) + "]" for r in rows) + "]"
+        return rows
 
     # No column hint: return flat list
-    return "[" + ",".join(_safe_scalar(x) for x in flat_vals) + "]"
+    return flat_vals
+
+def _format_bulkarray(bulk: Any) -> str:
+    """
+    Convert BulkArray to a compact JSON-like string:
+      [[r1c1, r1c2, ...], [r2c1, r2c2, ...], ...]
+    """
+    rows = _bulkarray_rows(bulk)
+    return "[" + ",".join(
+        "[" + ",".join(_safe_scalar(x) for x in r) + "]" if isinstance(r, list) else _safe_scalar(r)
+        for r in rows
+    ) + "]"
 
 def _safe_scalar(x: Any) -> str:
     if x is None:
@@ -0,0 +1,82 @@
+# src/bbg_dlws_workbench/transform/rows.py
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Sequence, Tuple
+
+
+class RowHeader:
+    """
+    Column names shared by many CompactRows (one per response and shape).
+    """
+
+    __slots__ = ("names", "index")
+
+    def __init__(self, names: Sequence[str]):
+        self.names: Tuple[str, ...] = tuple(names)
+        self.index: Dict[str, int] = {n: i for i, n in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __repr__(self) -> str:
+        return f"RowHeader({list(self.names)!r})"
+
+
+class CompactRow(Mapping):
+    """
+    Read-only row: a shared RowHeader plus a tuple of values. Behaves like
+    the dict rows of soap_to_rows for readers (keys, items, [name], get), at
+    a fraction of the memory of a dict per row. Writers that know the type
+    use `header` and `values` directly.
+    """
+
+    __slots__ = ("header", "values")
+
+    def __init__(self, header: RowHeader, values: Tuple[Any, ...]):
+        self.header = header
+        self.values = values
+
+    def __getitem__(self, name: str) -> Any:
+        return self.values[self.header.index[name]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.header.names)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.header.index
+
+    def items(self):
+        return zip(self.header.names, self.values)
+
+    def with_values(self, values: Tuple[Any, ...]) -> "CompactRow":
+        return CompactRow(self.header, values)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CompactRow):
+            return self.header.names == other.header.names and self.values == other.values
+        return isinstance(other, Mapping) and dict(self.items()) == dict(other.items())
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"CompactRow({dict(self.items())!r})"
+
+
+class Interner:
+    """
+    Per-response string de-duplication: equal identifiers, dates and field
+    names share one object instead of one copy per row. Kept per response
+    (not sys.intern) so the strings go away with the response's rows.
+    """
+
+    __slots__ = ("_strings",)
+
+    def __init__(self):
+        self._strings: Dict[str, str] = {}
+
+    def __call__(self, s: Any) -> Any:
+        if type(s) is not str:
+            return s
+        return self._strings.setdefault(s, s)
@@ -0,0 +1,52 @@
+# src/bbg_dlws_workbench/transform/xml_reader.py
+from typing import Any, Dict
+
+from lxml import etree
+
+# Elements that are lists per the WSDL even when a single one is present
+ALWAYS_LIST = {"instrumentData", "data", "field", "fieldWithOverrides", "override"}
+
+_PARSER = etree.XMLParser(huge_tree=True, resolve_entities=False, remove_blank_text=True)
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+def _to_python(el: Any) -> Any:
+    children = [c for c in el if isinstance(c.tag, str)]
+    if not children and not el.attrib:
+        return el.text
+    node: Dict[str, Any] = {_local(k): v for k, v in el.attrib.items()}
+    for c in children:
+        name = _local(c.tag)
+        value = _to_python(c)
+        if name in node:
+            prev = node[name]
+            # values are str/dict/None, so a list here is always one we built
+            if isinstance(prev, list):
+                prev.append(value)
+            else:
+                node[name] = [prev, value]
+        else:
+            node[name] = [value] if name in ALWAYS_LIST else value
+    if not children and el.text and el.text.strip():
+        node.setdefault("value", el.text)
+    return node
+
+
+def parse_response_xml(content: bytes) -> Dict[str, Any]:
+    """
+    Parse a raw SOAP reply into the dict shape the normalizers accept
+    (the dict-like fallbacks in transform.normalize): the first element of
+    the SOAP Body, namespaces stripped, attributes as keys, repeated
+    elements as lists.
+    """
+    root = etree.fromstring(content, parser=_PARSER)
+    body = next((el for el in root.iter() if isinstance(el.tag, str) and _local(el.tag) == "Body"), None)
+    if body is None:
+        raise ValueError("Not a SOAP envelope: no Body element")
+    payload = next((el for el in body if isinstance(el.tag, str)), None)
+    if payload is None:
+        return {}
+    out = _to_python(payload)
+    return out if isinstance(out, dict) else {}
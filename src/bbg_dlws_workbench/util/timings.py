@@ -0,0 +1,40 @@
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+class Timings:
+    """
+    Wall-clock durations of named phases (imports, config load, connect, ...),
+    reported by `bbg-dlws --timings`.
+    """
+
+    def __init__(self):
+        self.entries: List[Tuple[str, float]] = []
+        self.started = time.perf_counter()
+
+    def record(self, name: str, seconds: float) -> None:
+        self.entries.append((name, seconds))
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - t0)
+
+    def totals(self) -> Dict[str, float]:
+        out: Dict[str, float] = {}
+        for name, s in self.entries:
+            out[name] = out.get(name, 0.0) + s
+        return out
+
+    def report(self) -> str:
+        width = max((len(n) for n, _ in self.entries), default=0)
+        lines = [f"{name:<{width}}  {s * 1000:9.1f} ms" for name, s in self.totals().items()]
+        lines.append(f"{'total':<{width}}  {(time.perf_counter() - self.started) * 1000:9.1f} ms")
+        return "\n".join(lines)
+
+# process-wide instance used by the CLI
+TIMINGS = Timings()
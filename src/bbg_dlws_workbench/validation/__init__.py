@@ -0,0 +1,3 @@
+
+from .identifiers import IdentifierValidator, check_identifier, normalize_yellow_key
+from .headers import check_headers, check_history_params, enforce
@@ -0,0 +1,111 @@
+# src/bbg_dlws_workbench/validation/headers.py
+import logging
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("bbg-dlws-workbench.validation")
+
+# WSDL header type per request kind
+HEADER_TYPES = {
+    "history": "ns0:GetHistoryHeaders",
+    "data": "ns0:GetDataHeaders",
+}
+
+
+def _find_key(d: Dict, name: str) -> Optional[str]:
+    for k in d:
+        if k.lower() == name:
+            return k
+    return None
+
+def enforce(problems: List[str], what: str, mode: str) -> None:
+    """
+    Raise ValueError listing `problems`, or only log them in "warn" mode.
+    """
+    if not problems:
+        return
+    if mode == "warn":
+        for p in problems:
+            logger.warning(f"{what}: {p}")
+        return
+    raise ValueError(f"Invalid {what}: " + "; ".join(problems))
+
+def check_history_params(params: Dict) -> List[str]:
+    """
+    Local (WSDL-free) sanity checks on history_params.daterange:
+    exactly one of period/duration, ISO dates with start <= end, positive duration.
+    """
+    problems: List[str] = []
+    dr_key = _find_key(params or {}, "daterange")
+    if dr_key is None:
+        return problems
+    dr = params[dr_key]
+    if not isinstance(dr, dict):
+        return [f"headers.{dr_key}: expected a mapping, got {type(dr).__name__}"]
+
+    period_key, duration_key = _find_key(dr, "period"), _find_key(dr, "duration")
+    if bool(period_key) == bool(duration_key):
+        problems.append(f"headers.{dr_key}: expected exactly one of period/duration")
+
+    if period_key:
+        period = dr[period_key] or {}
+        bounds = {}
+        for b in ("start", "end"):
+            k = _find_key(period, b) if isinstance(period, dict) else None
+            if k is None:
+                problems.append(f"headers.{dr_key}.{period_key}: missing {b}")
+                continue
+            v = period[k]
+            try:
+                bounds[b] = v if isinstance(v, date) else date.fromisoformat(str(v))
+            except ValueError:
+                problems.append(f"headers.{dr_key}.{period_key}.{k}: not an ISO date: {v!r}")
+        if len(bounds) == 2 and bounds["start"] > bounds["end"]:
+            problems.append(f"headers.{dr_key}.{period_key}: start {bounds['start']} is after end {bounds['end']}")
+
+    if duration_key:
+        duration = dr[duration_key] or {}
+        if not isinstance(duration, dict) or not duration:
+            problems.append(f"headers.{dr_key}.{duration_key}: expected e.g. {{days: 3}}")
+        else:
+            for k, v in duration.items():
+                if not isinstance(v, int) or v <= 0:
+                    problems.append(f"headers.{dr_key}.{duration_key}.{k}: expected a positive integer, got {v!r}")
+    return problems
+
+
+def check_headers(client, kind: str, params: Dict) -> List[str]:
+    """
+    Check the shape of `headers` against the WSDL types loaded in the zeep client:
+    unknown element names at any depth and scalar values the XSD type can't parse.
+    Returns [] when the kind has no headers or the type isn't in the WSDL.
+    """
+    type_name = HEADER_TYPES.get(kind)
+    if not type_name or not params:
+        return []
+    try:
+        xsd_type = client.get_type(type_name)
+    except (LookupError, ValueError):
+        return []
+    return _check_shape(xsd_type, params, "headers")
+
+def _check_shape(xsd_type: Any, value: Dict, path: str) -> List[str]:
+    elements = dict(getattr(xsd_type, "elements", None) or [])
+    attributes = dict(getattr(xsd_type, "attributes", None) or [])
+    problems: List[str] = []
+    for k, v in value.items():
+        el = elements.get(k) or attributes.get(k)
+        if el is None:
+            expected = sorted(list(elements) + list(attributes))
+            problems.append(f"{path}.{k}: not part of {getattr(xsd_type, 'name', 'type')} (expected one of {expected})")
+            continue
+        el_type = getattr(el, "type", None)
+        if isinstance(v, dict):
+            problems.extend(_check_shape(el_type, v, f"{path}.{k}"))
+        elif isinstance(v, (str, int, float)) and not isinstance(v, bool) and hasattr(el_type, "pythonvalue") \
+                and not getattr(el_type, "elements", None):
+            try:
+                el_type.pythonvalue(str(v))
+            except Exception as e:
+                problems.append(f"{path}.{k}: {v!r} is not a valid {getattr(el_type, 'name', 'value')} ({e})")
+    return problems
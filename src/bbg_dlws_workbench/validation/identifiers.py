@@ -0,0 +1,159 @@
+# src/bbg_dlws_workbench/validation/identifiers.py
+import logging
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from ..soap.fields_criteria import normalize_sector
+
+logger = logging.getLogger("bbg-dlws-workbench.validation")
+
+_ISIN_RE = re.compile(r"^[A-Z]{2}[A-Z0-9]{9}[0-9]$")
+_CUSIP_RE = re.compile(r"^[A-Z0-9*@#]{8}[0-9]$")
+_SEDOL_RE = re.compile(r"^[B-DF-HJ-NP-TV-Z0-9]{6}[0-9]$")
+_FIGI_RE = re.compile(r"^[B-DF-HJ-NP-TV-Z]{2}G[B-DF-HJ-NP-TV-Z0-9]{8}[0-9]$")
+
+
+def _luhn_ok(digits: str) -> bool:
+    total = 0
+    for i, ch in enumerate(reversed(digits)):
+        d = int(ch)
+        if i % 2 == 1:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return total % 10 == 0
+
+def _isin_ok(s: str) -> bool:
+    if not _ISIN_RE.match(s):
+        return False
+    return _luhn_ok("".join(str(int(c, 36)) for c in s))
+
+def _cusip_ok(s: str) -> bool:
+    if not _CUSIP_RE.match(s):
+        return False
+    total = 0
+    for i, c in enumerate(s[:8]):
+        if c.isdigit():
+            v = int(c)
+        elif c.isalpha():
+            v = ord(c) - 55
+        else:
+            v = {"*": 36, "@": 37, "#": 38}[c]
+        if i % 2 == 1:
+            v *= 2
+        total += v // 10 + v % 10
+    return (10 - total % 10) % 10 == int(s[8])
+
+def _sedol_ok(s: str) -> bool:
+    if not _SEDOL_RE.match(s):
+        return False
+    weights = (1, 3, 1, 7, 3, 9)
+    total = sum(int(c, 36) * w for c, w in zip(s[:6], weights))
+    return (10 - total % 10) % 10 == int(s[6])
+
+def _figi_ok(s: str) -> bool:
+    return bool(_FIGI_RE.match(s))
+
+# Instrument types with a checkable format; other types are passed through
+ID_FORMAT_CHECKS = {
+    "ISIN": _isin_ok,
+    "CUSIP": _cusip_ok,
+    "SEDOL1": _sedol_ok,
+    "SEDOL2": _sedol_ok,
+    "BB_GLOBAL": _figi_ok,
+}
+
+# Types whose id is only meaningful together with a yellow key
+YELLOW_KEY_REQUIRED = {"TICKER"}
+
+
+def normalize_yellow_key(yk: str) -> Optional[str]:
+    """
+    Map a yellow key (or a common alias such as "Currency") to the WSDL MarketSector
+    value; None if it isn't one. Empty stays empty.
+    """
+    if not (yk or "").strip():
+        return ""
+    return normalize_sector(yk)
+
+
+def identifier_key(item: Dict) -> Tuple[str, str, str]:
+    """
+    (id, yellow key, type) as compared for duplicates: trimmed, yellow key
+    aliases resolved and type upper-cased.
+    """
+    yk = str(item.get("yellow_key") or "")
+    return (str(item.get("id") or "").strip(), normalize_yellow_key(yk) or yk.strip(),
+            str(item.get("type") or "").strip().upper())
+
+
+def check_identifier(item: Dict) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Validate one normalized identifier {id, yellow_key, type, extras}.
+    Returns (item, None) or (None, reason). The item is not rewritten: a
+    yellow key alias is accepted but submitted as given.
+    """
+    ident, _, id_type = identifier_key(item)
+    if not ident:
+        return None, "empty id"
+    if normalize_yellow_key(str(item.get("yellow_key") or "")) is None:
+        return None, f"unknown yellow key {item.get('yellow_key')!r}"
+    if id_type in YELLOW_KEY_REQUIRED and not str(item.get("yellow_key") or "").strip():
+        return None, f"type {id_type} requires a yellow key"
+    check = ID_FORMAT_CHECKS.get(id_type)
+    if check is not None and not check(ident.upper()):
+        return None, f"malformed {id_type} {ident!r}"
+    return item, None
+
+
+class IdentifierValidator:
+    """
+    Streams identifiers through check_identifier and de-duplicates them on
+    identifier_key(). Bad items are only logged and still submitted (warn mode),
+    collected in `rejects` (quarantine mode) or raise ValueError on the first
+    one (fail mode).
+    """
+
+    def __init__(self, mode: str = "warn"):
+        if mode not in ("warn", "fail", "quarantine"):
+            raise ValueError(f"Unsupported validation mode: {mode}")
+        self.mode = mode
+        self.rejects: List[Dict] = []
+        self.warnings = 0
+        self._seen: Set[Tuple[str, str, str]] = set()
+        self.accepted = 0
+
+    def filter(self, items: Iterable[Dict]) -> Iterator[Dict]:
+        for n, item in enumerate(items, start=1):
+            clean, reason = check_identifier(item)
+            if clean is not None:
+                key = identifier_key(item)
+                if key in self._seen:
+                    clean, reason = None, "duplicate"
+                else:
+                    self._seen.add(key)
+            if clean is None:
+                self._reject(n, item, reason)
+                if self.mode != "warn":
+                    continue
+            self.accepted += 1
+            yield item
+
+    def _reject(self, n: int, item: Dict, reason: str) -> None:
+        if self.mode == "fail":
+            raise ValueError(f"Invalid identifier #{n} {item.get('id')!r}: {reason}")
+        if self.mode == "warn":
+            self.warnings += 1
+            logger.warning(f"Identifier #{n} {item.get('id')!r}: {reason}")
+            return
+        logger.warning(f"Quarantined identifier #{n} {item.get('id')!r}: {reason}")
+        self.rejects.append(
+            {
+                "position": n,
+                "id": item.get("id", ""),
+                "yellow_key": item.get("yellow_key", ""),
+                "type": item.get("type", ""),
+                "reason": reason,
+            }
+        )
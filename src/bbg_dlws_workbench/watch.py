@@ -0,0 +1,133 @@
+# src/bbg_dlws_workbench/watch.py
+import hashlib
+import logging
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("bbg-dlws-workbench.watch")
+
+DELTA_COLUMNS = ("observed_at", "identifier", "field", "value", "change")
+
+_UNITS = {"s": 1, "m": 60, "h": 3600}
+
+
+def parse_every(text: str) -> float:
+    """
+    "90", "30s", "5m", "1h" or "1h30m" → seconds.
+    """
+    text = text.strip().lower()
+    if re.fullmatch(r"\d+(\.\d+)?", text):
+        return float(text)
+    parts = re.findall(r"(\d+(?:\.\d+)?)([smh])", text)
+    if not parts or "".join(n + u for n, u in parts) != text:
+        raise ValueError(f"Not a duration: {text!r} (e.g. 30s, 5m, 1h)")
+    return sum(float(n) * _UNITS[u] for n, u in parts)
+
+
+def _digest(value: Any) -> bytes:
+    # not hash(): hash(-1) == hash(-2), and str hashes can collide
+    text = f"{type(value).__name__}:{value!r}"
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+class DeltaIndex:
+    """
+    Last seen value of every (identifier, field), kept as a 16-byte digest
+    of its type and repr rather than the value itself, so long strings and
+    bulk arrays cost the same small amount per cell.
+    update() returns the cells of a RowBatch that are new or changed.
+    Cells missing from a batch (no value, or a chunk that failed) are not
+    reported and keep their previous hash.
+    """
+
+    def __init__(self):
+        self._hashes: Dict[Tuple[str, str], bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def update(self, batch) -> Iterator[Tuple[str, str, Any, str]]:
+        """
+        (identifier, field, value, "new" | "changed") per differing cell.
+        """
+        columns = batch.columns
+        ids = columns.get("identifier")
+        if ids is None:
+            return
+        hashes = self._hashes
+        for name, col in columns.items():
+            if name == "identifier":
+                continue
+            for ident, value in zip(ids, col):
+                if value is None:
+                    continue
+                key = (ident, name)
+                h = _digest(value)
+                old = hashes.get(key)
+                if old == h:
+                    continue
+                hashes[key] = h
+                yield ident, name, value, "new" if old is None else "changed"
+
+
+class Watcher:
+    """
+    Re-runs a Workbench request on a schedule and reports only what changed:
+    every cycle's rows go through a DeltaIndex, and the new or changed cells
+    go to on_delta() as DELTA_COLUMNS rows. The first cycle reports every
+    cell as "new". The Workbench keeps its client (WSDL, TLS sessions)
+    between cycles.
+    """
+
+    def __init__(self, workbench, on_delta: Callable[[List[Dict[str, Any]]], None],
+                 sleep: Callable[[float], None] = time.sleep, clock: Callable[[], float] = time.monotonic):
+        self.workbench = workbench
+        self.on_delta = on_delta
+        self.index = DeltaIndex()
+        self.sleep = sleep
+        self.clock = clock
+        self.cycles = 0
+
+    def cycle(self) -> int:
+        """
+        One refresh; returns the number of changed cells reported.
+        """
+        observed_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        changed = 0
+        for batch in self.workbench.iter_batches():
+            rows = [
+                {"observed_at": observed_at, "identifier": ident, "field": field, "value": value, "change": change}
+                for ident, field, value, change in self.index.update(batch)
+            ]
+            if rows:
+                self.on_delta(rows)
+                changed += len(rows)
+        self.cycles += 1
+        logger.info(f"Cycle {self.cycles}: {changed} changed cell(s) of {len(self.index)} tracked")
+        return changed
+
+    def run(self, every_s: float, cycles: Optional[int] = None) -> None:
+        """
+        Cycle every `every_s` seconds (start to start) until `cycles` have
+        run, or forever. A cycle that overruns is followed immediately by
+        the next one; a cycle that fails is logged and skipped.
+        """
+        next_start = self.clock()
+        while cycles is None or self.cycles < cycles:
+            try:
+                self.cycle()
+            except Exception as e:
+                # keep watching: the next cycle may well succeed (the index is unchanged)
+                self.cycles += 1
+                logger.error(f"Cycle {self.cycles} failed: {type(e).__name__}: {e}")
+            if cycles is not None and self.cycles >= cycles:
+                break
+            next_start += every_s
+            wait = next_start - self.clock()
+            if wait > 0:
+                self.sleep(wait)
+            else:
+                logger.warning(f"Cycle {self.cycles} overran the {every_s:g}s schedule by {-wait:.1f}s")
+                next_start = self.clock()
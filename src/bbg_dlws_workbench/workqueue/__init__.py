@@ -0,0 +1,2 @@
+from .queues import DirWorkQueue, SqliteWorkQueue, config_id, open_queue, queue_id, worker_name
+from .worker import Worker
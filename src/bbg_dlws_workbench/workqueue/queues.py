@@ -0,0 +1,334 @@
+# src/bbg_dlws_workbench/workqueue/queues.py
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..store import is_sqlite_uri
+
+logger = logging.getLogger("bbg-dlws-workbench.queue")
+
+STATES = ("pending", "claimed", "done", "failed")
+
+Job = Tuple[int, List[Dict]]
+
+
+def config_id(kind: str, fields: List[str], params: Dict, overrides: List[Dict], uri: str) -> str:
+    """
+    Fingerprint of what a worker must agree on with the coordinator: the
+    request it builds for a chunk and where it writes the result.
+    """
+    payload = {"kind": kind, "fields": list(fields), "params": params, "overrides": overrides, "uri": uri}
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def queue_id(config: str, jobs: List[Job]) -> str:
+    ids = [(idx, [(x.get("id", ""), x.get("yellow_key", ""), x.get("type", "")) for x in batch]) for idx, batch in jobs]
+    return hashlib.sha1(json.dumps({"config": config, "jobs": ids}).encode("utf-8")).hexdigest()[:16]
+
+
+def worker_name(name: str) -> str:
+    # used in file names by DirWorkQueue
+    return re.sub(r"[^A-Za-z0-9_-]", "_", name) or "worker"
+
+
+class SqliteWorkQueue:
+    """
+    Chunks of one run in a SQLite file, for worker processes on one host.
+
+    A claim (one IMMEDIATE transaction) moves the lowest pending chunk to
+    `claimed` with a lease of `lease_seconds`; workers renew the leases of
+    their chunks while they run. A claim whose lease ran out (its worker
+    died) goes back to pending, or to `failed` once claimed `max_attempts`
+    times; so does a chunk completed with ok=False.
+    """
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS meta (
+        key   TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS tasks (
+        idx         INTEGER PRIMARY KEY,
+        batch       TEXT NOT NULL,
+        state       TEXT NOT NULL DEFAULT 'pending',
+        worker      TEXT,
+        attempts    INTEGER NOT NULL DEFAULT 0,
+        lease_until REAL,
+        updated_at  REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, idx);
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 900, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # used from fetch threads (claim), the writer (complete) and the heartbeat;
+        # transactions are explicit so a claim can take the write lock up front
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self._SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _tx(self, fn):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                out = fn(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return out
+
+    def meta(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+
+    def enqueue(self, run_id: str, config: str, jobs: Iterable[Job], reset: bool = False) -> int:
+        """
+        Store the chunks of run `run_id`; returns how many were added (0 if
+        the queue already holds this run). A queue holding another run must
+        be reset first.
+        """
+        jobs = list(jobs)
+
+        def tx(conn) -> int:
+            current = dict(conn.execute("SELECT key, value FROM meta").fetchall()).get("run_id")
+            if current == run_id and not reset:
+                return 0
+            if current is not None and not reset:
+                raise ValueError(f"Queue {self.path} holds run {current}; reset it to enqueue run {run_id}")
+            conn.execute("DELETE FROM tasks")
+            conn.execute("DELETE FROM meta")
+            conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)",
+                             [("run_id", run_id), ("config_id", config), ("created_at", str(time.time()))])
+            now = time.time()
+            conn.executemany("INSERT INTO tasks (idx, batch, updated_at) VALUES (?, ?, ?)",
+                             [(idx, json.dumps(batch, default=str), now) for idx, batch in jobs])
+            return len(jobs)
+
+        return self._tx(tx)
+
+    def _expire(self, conn, now: float) -> None:
+        expired = conn.execute("SELECT idx, worker FROM tasks WHERE state = 'claimed' AND lease_until < ?",
+                               (now,)).fetchall()
+        for idx, worker in expired:
+            logger.warning(f"Chunk {idx}: lease of {worker} expired; releasing it")
+        conn.execute(
+            "UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "worker = NULL, lease_until = NULL, updated_at = ? WHERE state = 'claimed' AND lease_until < ?",
+            (self.max_attempts, now, now),
+        )
+
+    def claim(self, worker: str) -> Optional[Job]:
+        def tx(conn) -> Optional[Job]:
+            now = time.time()
+            self._expire(conn, now)
+            row = conn.execute("SELECT idx, batch FROM tasks WHERE state = 'pending' ORDER BY idx LIMIT 1").fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE tasks SET state = 'claimed', worker = ?, attempts = attempts + 1, lease_until = ?, "
+                "updated_at = ? WHERE idx = ?",
+                (worker, now + self.lease_seconds, now, row[0]),
+            )
+            return row[0], json.loads(row[1])
+
+        return self._tx(tx)
+
+    def renew(self, worker: str) -> int:
+        now = time.time()
+        return self._tx(lambda conn: conn.execute(
+            "UPDATE tasks SET lease_until = ?, updated_at = ? WHERE state = 'claimed' AND worker = ?",
+            (now + self.lease_seconds, now, worker),
+        ).rowcount)
+
+    def complete(self, idx: int, worker: str, ok: bool) -> Optional[str]:
+        """
+        Finish `worker`'s claim on chunk `idx`: done, or (not ok) back to
+        pending, or failed after max_attempts claims. Returns that state, or
+        None if the claim was lost (lease expired and the chunk re-queued or
+        claimed by another worker).
+        """
+        def tx(conn) -> Optional[str]:
+            state = "'done'" if ok else "CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END"
+            args = () if ok else (self.max_attempts,)
+            if not conn.execute(
+                    f"UPDATE tasks SET state = {state}, worker = NULL, lease_until = NULL, updated_at = ? "
+                    "WHERE idx = ? AND worker = ? AND state = 'claimed'",
+                    (*args, time.time(), idx, worker),
+            ).rowcount:
+                return None
+            return conn.execute("SELECT state FROM tasks WHERE idx = ?", (idx,)).fetchone()[0]
+
+        state = self._tx(tx)
+        if state is None:
+            logger.warning(f"Chunk {idx}: {worker} no longer holds the claim (lease expired)")
+        return state
+
+    def release(self, worker: str) -> int:
+        """
+        Return every chunk `worker` still holds to the queue (worker stopping).
+        """
+        return self._tx(lambda conn: conn.execute(
+            "UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "worker = NULL, lease_until = NULL, updated_at = ? WHERE state = 'claimed' AND worker = ?",
+            (self.max_attempts, time.time(), worker),
+        ).rowcount)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state").fetchall()
+        out = dict.fromkeys(STATES, 0)
+        out.update(rows)
+        return out
+
+
+class DirWorkQueue:
+    """
+    The same queue as files in a directory, for workers on several hosts
+    sharing a filesystem (where SQLite locking can't be relied on). A chunk's
+    state is the subdirectory holding its marker file, and every transition
+    is one rename, which exactly one worker wins:
+
+        tasks/000012.json            identifiers of chunk 12
+        pending/000012.<attempts>
+        claimed/000012.<attempts>.<worker>   (mtime = last lease renewal)
+        done/000012, failed/000012
+
+    Leases compare marker mtimes with the local clock, so hosts' clocks
+    should be in sync to well under `lease_seconds`.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 900, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        for state in ("tasks", *STATES):
+            os.makedirs(os.path.join(path, state), exist_ok=True)
+
+    def close(self) -> None:
+        pass
+
+    def _dir(self, state: str) -> str:
+        return os.path.join(self.path, state)
+
+    def _list(self, state: str) -> List[str]:
+        return sorted(n for n in os.listdir(self._dir(state)) if not n.startswith("."))
+
+    def meta(self) -> Dict[str, str]:
+        try:
+            with open(os.path.join(self.path, "meta.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def enqueue(self, run_id: str, config: str, jobs: Iterable[Job], reset: bool = False) -> int:
+        current = self.meta().get("run_id")
+        if current == run_id and not reset:
+            return 0
+        if current is not None and not reset:
+            raise ValueError(f"Queue {self.path} holds run {current}; reset it to enqueue run {run_id}")
+        os.makedirs(self.path, exist_ok=True)
+        meta_path = os.path.join(self.path, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)  # an interrupted enqueue leaves no meta, so it is redone
+        for state in ("tasks", *STATES):
+            shutil.rmtree(self._dir(state), ignore_errors=True)
+            os.makedirs(self._dir(state))
+        n = 0
+        for idx, batch in jobs:
+            with open(os.path.join(self._dir("tasks"), f"{idx:06d}.json"), "w", encoding="utf-8") as f:
+                json.dump(batch, f, default=str)
+            open(os.path.join(self._dir("pending"), f"{idx:06d}.0"), "w").close()
+            n += 1
+        tmp = meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"run_id": run_id, "config_id": config, "created_at": str(time.time())}, f)
+        os.replace(tmp, meta_path)
+        return n
+
+    def _move(self, state: str, name: str, to_state: str, to_name: str) -> bool:
+        try:
+            os.rename(os.path.join(self._dir(state), name), os.path.join(self._dir(to_state), to_name))
+            return True
+        except FileNotFoundError:
+            return False  # another worker moved it first
+
+    def _requeue(self, name: str) -> Optional[str]:
+        # the state the chunk went to, None if another worker moved it first
+        idx, attempts = name.split(".")[:2]
+        if int(attempts) >= self.max_attempts:
+            return "failed" if self._move("claimed", name, "failed", idx) else None
+        return "pending" if self._move("claimed", name, "pending", f"{idx}.{attempts}") else None
+
+    def _expire(self, now: float) -> None:
+        for name in self._list("claimed"):
+            try:
+                age = now - os.stat(os.path.join(self._dir("claimed"), name)).st_mtime
+            except FileNotFoundError:
+                continue
+            if age > self.lease_seconds and self._requeue(name):
+                logger.warning(f"Chunk {int(name.split('.')[0])}: lease of {name.split('.', 2)[2]} expired; releasing it")
+
+    def claim(self, worker: str) -> Optional[Job]:
+        self._expire(time.time())
+        for name in self._list("pending"):
+            idx, attempts = name.split(".")
+            src = os.path.join(self._dir("pending"), name)
+            try:
+                os.utime(src)  # the lease starts now: rename keeps the mtime
+            except FileNotFoundError:
+                continue
+            if self._move("pending", name, "claimed", f"{idx}.{int(attempts) + 1}.{worker}"):
+                with open(os.path.join(self._dir("tasks"), f"{idx}.json"), encoding="utf-8") as f:
+                    return int(idx), json.load(f)
+        return None
+
+    def _held(self, worker: str, idx: Optional[int] = None) -> List[str]:
+        prefix = f"{idx:06d}." if idx is not None else ""
+        return [n for n in self._list("claimed") if n.startswith(prefix) and n.split(".", 2)[2] == worker]
+
+    def renew(self, worker: str) -> int:
+        n = 0
+        for name in self._held(worker):
+            try:
+                os.utime(os.path.join(self._dir("claimed"), name))
+                n += 1
+            except FileNotFoundError:
+                pass
+        return n
+
+    def complete(self, idx: int, worker: str, ok: bool) -> Optional[str]:
+        for name in self._held(worker, idx):
+            state = ("done" if self._move("claimed", name, "done", f"{idx:06d}") else None) if ok else self._requeue(name)
+            if state:
+                return state
+        logger.warning(f"Chunk {idx}: {worker} no longer holds the claim (lease expired)")
+        return None
+
+    def release(self, worker: str) -> int:
+        return sum(1 for name in self._held(worker) if self._requeue(name))
+
+    def counts(self) -> Dict[str, int]:
+        return {state: len(self._list(state)) for state in STATES}
+
+
+def open_queue(path: str, lease_seconds: float = 900, max_attempts: int = 3):
+    """
+    SqliteWorkQueue for a .sqlite/.db path, DirWorkQueue for anything else.
+    """
+    cls: Any = SqliteWorkQueue if is_sqlite_uri(path) else DirWorkQueue
+    return cls(path, lease_seconds=lease_seconds, max_attempts=max_attempts)
@@ -0,0 +1,113 @@
+# src/bbg_dlws_workbench/workqueue/worker.py
+import glob
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("bbg-dlws-workbench.queue")
+
+
+class Worker:
+    """
+    Feeds a Pipeline from a work queue (see open_queue):
+      - jobs() claims one chunk each time a fetch thread is free, after
+        removing partition files left by an earlier claim of the same chunk
+      - on_chunk_done() (the pipeline's on_chunk_done) completes the claim:
+        done, or back to the queue if the chunk failed for reasons a retry
+        may fix. Identifiers isolated as poison don't requeue the chunk;
+        they stay in `report` (the pipeline's FailureReport), from which the
+        failures of requeued or lost chunks are dropped
+      - heartbeat() renews this worker's leases while the pipeline runs
+
+    The pipeline must write partitioned output to `uri` (and `bulk_uri`), so
+    each chunk lands in its own file(s) whichever worker runs it.
+
+    With `wait`, jobs() keeps polling while chunks are claimed by other
+    workers, so the chunks of a worker that dies are picked up once their
+    leases expire; without it, the worker stops when nothing is pending.
+    """
+
+    def __init__(self, queue, worker_id: str, uri: str, bulk_uri: Optional[str] = None, wait: bool = True,
+                 poll_s: float = 5.0, max_chunks: Optional[int] = None,
+                 sleep: Callable[[float], None] = time.sleep, report=None):
+        self.queue = queue
+        self.worker_id = worker_id
+        self.uri = uri
+        self.bulk_uri = bulk_uri
+        self.wait = wait
+        self.poll_s = poll_s
+        self.max_chunks = max_chunks
+        self.sleep = sleep
+        self.report = report
+        self.claimed = 0
+        self.completed: Dict[str, int] = {"done": 0, "retry": 0, "lost": 0}
+
+    def _stale_files(self, idx: int) -> List[str]:
+        from ..pipeline import partition_uri
+
+        files = []
+        for uri in filter(None, (self.uri, self.bulk_uri)):
+            stem = os.path.splitext(partition_uri(uri, idx))[0]
+            # <stem><ext>, <stem>-2<ext>, ... with or without a compression suffix
+            files += glob.glob(glob.escape(stem) + ".*") + glob.glob(glob.escape(stem) + "-*")
+        return files
+
+    def jobs(self) -> Iterator[Tuple[int, List[Dict], Optional[Dict]]]:
+        while self.max_chunks is None or self.claimed < self.max_chunks:
+            job = self.queue.claim(self.worker_id)
+            if job is None:
+                if not self.wait or not self.queue.counts()["claimed"]:
+                    return
+                self.sleep(self.poll_s)  # claims held elsewhere may still expire
+                continue
+            idx, batch = job
+            self.claimed += 1
+            for stale in self._stale_files(idx):
+                os.remove(stale)
+            logger.info(f"{self.worker_id}: claimed chunk {idx} ({len(batch)} identifier(s))")
+            yield idx, batch, None
+
+    def on_chunk_done(self, idx: int, ok: bool) -> None:
+        if not ok and self.report is not None and self.report.poison_only(idx):
+            ok = True  # only isolated identifiers failed; they stay in the report
+        state = self.queue.complete(idx, self.worker_id, ok)
+        if state is None:
+            self.completed["lost"] += 1
+        elif state == "done":
+            self.completed["done"] += 1
+        else:
+            self.completed["retry"] += 1
+            logger.warning(f"{self.worker_id}: chunk {idx} had failures; "
+                           f"{'returned to the queue' if state == 'pending' else 'out of attempts'}")
+        if state in (None, "pending") and self.report is not None:
+            self.report.discard_chunk(idx)  # reported by whichever claim runs it next
+
+    @contextmanager
+    def heartbeat(self, interval_s: Optional[float] = None) -> Iterator[None]:
+        """
+        Renew leases every `interval_s` (a third of the lease by default) in
+        a background thread; on exit, release any chunk still claimed.
+        """
+        interval_s = interval_s or self.queue.lease_seconds / 3
+        stop = threading.Event()
+
+        def beat() -> None:
+            while not stop.wait(interval_s):
+                try:
+                    self.queue.renew(self.worker_id)
+                except Exception as e:
+                    logger.warning(f"{self.worker_id}: lease renewal failed: {type(e).__name__}: {e}")
+
+        thread = threading.Thread(target=beat, name="bbg-queue-heartbeat", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+            released = self.queue.release(self.worker_id)
+            if released:
+                logger.warning(f"{self.worker_id}: released {released} unfinished chunk(s)")
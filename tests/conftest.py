@@ -0,0 +1,141 @@
+
+import io
+import itertools
+import threading
+import time
+from pathlib import Path
+
+import pytest
+import requests
+from lxml import etree
+from zeep import Client, Settings
+
+from bbg_dlws_workbench.soap.pool import SessionPool
+from bbg_dlws_workbench.soap.transport import DlwsTransport
+
+WSDL = str(Path(__file__).parent / "data" / "dlws_mini.wsdl")
+NS = "http://services.bloomberg.com/datalicense/dlws/ps/20071001"
+ENVELOPE = '<?xml version="1.0" encoding="UTF-8"?>\n<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"><soap:Body>{}</soap:Body></soap:Envelope>'
+
+
+def _local(el):
+    return etree.QName(el).localname
+
+
+class _FakeSession(requests.Session):
+    def __init__(self, endpoint):
+        super().__init__()
+        self.endpoint = endpoint
+
+    def post(self, address, data=None, headers=None, timeout=None, stream=False):
+        self.endpoint.timeouts.append((threading.get_ident(), timeout))
+        return self.endpoint.handle(address, data, headers or {})
+
+
+class FakeDlwsTransport(DlwsTransport):
+    """
+    In-memory DLWS endpoint for the trimmed WSDL: submits are recorded and
+    answered with a responseId; retrieves return one row per instrument per
+    date (history) or one row per instrument (data) with deterministic values
+    (a 3 x 2 bulk array for data fields named *_BULK).
+    Identifiers listed in `poison` make the whole job end in statusCode 200.
+    Successive retrieves wait `retrieve_delays[i]` seconds before answering.
+    Replies come from a fake session (or a pool of `max_sessions` of them),
+    so DlwsTransport's own post (and spooling) is exercised.
+    """
+
+    def __init__(self, dates=("2024-01-02", "2024-01-03"), poison=(), pending_polls=0, max_sessions=None,
+                 retrieve_delays=()):
+        self.timeouts = []
+        if max_sessions:
+            super().__init__(sessions=SessionPool(lambda: _FakeSession(self), max_sessions))
+        else:
+            super().__init__(session=_FakeSession(self))
+        self.dates = dates
+        self.poison = set(poison)
+        self.pending_polls = pending_polls
+        self.retrieve_delays = list(retrieve_delays)
+        self.sent = []
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def handle(self, address, message, headers):
+        with self._lock:
+            self.sent.append((address, message, dict(headers)))
+        action = headers.get("SOAPAction", "").strip('"')
+        root = etree.fromstring(message)
+        if action.startswith("submit"):
+            body = self._submit(action, root)
+        else:
+            with self._lock:
+                delay = self.retrieve_delays.pop(0) if self.retrieve_delays else 0
+            time.sleep(delay)
+            body = self._retrieve(action, root)
+        r = requests.Response()
+        r.status_code = 200
+        r.raw = io.BytesIO(ENVELOPE.format(body).encode("utf-8"))
+        r.headers["Content-Type"] = "text/xml; charset=utf-8"
+        return r
+
+    def _submit(self, action, root):
+        ids = [el.text or "" for el in root.iter() if _local(el) == "id"]
+        fields = [el.text for el in root.iter() if _local(el) == "field" and el.getparent() is not None
+                  and _local(el.getparent()) == "fields"]
+        with self._lock:
+            rid = f"resp-{next(self._ids)}"
+            self.jobs[rid] = {"ids": ids, "fields": fields, "polls": 0}
+        kind = "History" if "History" in action else "Data"
+        return (f'<submitGet{kind}Response xmlns="{NS}"><statusCode><code>0</code><description>Success</description>'
+                f'</statusCode><requestId>req</requestId><responseId>{rid}</responseId></submitGet{kind}Response>')
+
+    def _retrieve(self, action, root):
+        rid = next(el.text for el in root.iter() if _local(el) == "responseId")
+        job = self.jobs[rid]
+        kind = "History" if "History" in action else "Data"
+        tag = f"retrieveGet{kind}Response"
+        job["polls"] += 1
+        if job["polls"] <= self.pending_polls:
+            code = 100
+        elif self.poison & set(job["ids"]):
+            code = 200
+        else:
+            code = 0
+        status = f"<statusCode><code>{code}</code><description>x</description></statusCode>"
+        if code:
+            return f'<{tag} xmlns="{NS}">{status}</{tag}>'
+        fields = "".join(f"<field>{f}</field>" for f in job["fields"])
+        items = []
+        for n, ident in enumerate(job["ids"]):
+            inst = f"<instrument><id>{ident}</id></instrument>"
+            if kind == "History":
+                for d in self.dates:
+                    data = "".join(f'<data value="{n}.{i}"/>' for i, _ in enumerate(job["fields"]))
+                    items.append(f"<instrumentData><code>0</code>{inst}<date>{d}</date>{data}</instrumentData>")
+            else:
+                data = "".join(_data_cell(ident, f) for f in job["fields"])
+                items.append(f"<instrumentData><code>0</code>{inst}{data}</instrumentData>")
+        return (f'<{tag} xmlns="{NS}">{status}<responseId>{rid}</responseId><fields>{fields}</fields>'
+                f'<instrumentDatas>{"".join(items)}</instrumentDatas></{tag}>')
+
+
+def _data_cell(ident, field):
+    # fields named *_BULK come back as a 3 x 2 bulk array
+    if not field.endswith("_BULK"):
+        return f'<data field="{field}" value="{ident}-{field}"/>'
+    entries = "".join(f'<data value="{ident}-r{r}c{c}" type="String"/>' for r in (1, 2, 3) for c in (1, 2))
+    return f'<data field="{field}" isArray="true" rows="3"><bulkarray columns="2">{entries}</bulkarray></data>'
+
+
+def make_fake_client(**kwargs):
+    return Client(wsdl=WSDL, transport=FakeDlwsTransport(**kwargs), settings=Settings(strict=False, xml_huge_tree=True))
+
+
+@pytest.fixture
+def fake_client():
+    return make_fake_client()
+
+
+@pytest.fixture
+def fake_client_factory():
+    return make_fake_client
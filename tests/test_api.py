@@ -0,0 +1,53 @@
+import pytest
+
+from bbg_dlws_workbench.api import Workbench
+
+
+def _config(tmp_path, **pipeline):
+    cert = tmp_path / "cert.p12"
+    cert.write_bytes(b"")
+    return {
+        "connection": {"endpoint": "https://dlws.example.test/dlps", "cert": {"p12_path": str(cert), "p12_password": "x"}},
+        "request": {"kind": "data", "identifiers": {"source": "inline"}, "fields": {"inline": ["PX_LAST"]}},
+        "chunking": {"max_identifiers_per_request": 2},
+        "polling": {"interval_seconds": 1, "attempts": 5},
+        "pipeline": pipeline,
+        "output": {"uri": str(tmp_path / "unused.csv")},
+        "run_history": {"enabled": False},
+        "validation": {"enabled": False},
+    }
+
+
+@pytest.mark.parametrize("normalize_workers", [0, 2])
+def test_iter_batches_streams_rows_in_memory(tmp_path, fake_client, normalize_workers):
+    ids = [f"ID{i}" for i in range(5)]
+    with Workbench(_config(tmp_path, fetch_workers=2, normalize_workers=normalize_workers), client=fake_client) as wb:
+        batches = list(wb.iter_batches(identifiers=ids, fields=["PX_LAST", "PX_VOLUME"]))
+    assert len(batches) == 3
+    rows = sorted((r["identifier"], r["PX_VOLUME"]) for b in batches for r in b.iter_rows())
+    assert rows == [(i, f"{i}-PX_VOLUME") for i in ids]
+    assert not (tmp_path / "unused.csv").exists()
+
+
+def test_closing_early_stops_the_run(tmp_path, fake_client):
+    with Workbench(_config(tmp_path), client=fake_client) as wb:
+        it = wb.iter_batches(identifiers=[f"ID{i}" for i in range(20)])
+        first = next(it)
+        it.close()
+    assert len(first) == 2
+    submits = [m for _, m, h in fake_client.transport.sent if h.get("SOAPAction", "").strip('"').startswith("submit")]
+    assert len(submits) < 10
+
+
+def test_fetch_outputs(tmp_path, fake_client):
+    with Workbench(_config(tmp_path), client=fake_client) as wb:
+        with pytest.raises(ValueError):
+            wb.fetch(identifiers=["ID1"], output="csv")
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            with pytest.raises(ImportError, match=r"bbg-dlws-workbench\[arrow\]"):
+                wb.fetch(identifiers=["ID1"])
+        else:
+            table = wb.fetch(identifiers=["ID1", "ID2", "ID3"])
+            assert table.num_rows == 3 and table.column_names == ["identifier", "PX_LAST"]
@@ -0,0 +1,94 @@
+from datetime import date
+
+from bbg_dlws_workbench.backfill import Backfill, BackfillPlan, TileCheckpoint, estimate_observations, history_period
+from bbg_dlws_workbench.pipeline import ChunkExecutor, FailurePolicy, FailureReport, NormalizeSpec, Pipeline
+from bbg_dlws_workbench.soap.poller import Poller
+from bbg_dlws_workbench.store import resolve_store
+
+IDS = [{"id": f"ID{i}", "yellow_key": "Equity", "type": "TICKER"} for i in range(5)]
+FIELDS = ["PX_LAST", "PX_VOLUME"]
+PARAMS = {"daterange": {"period": {"start": "2019-11-15", "end": "2021-02-10"}}, "programflag": "adhoc"}
+
+
+def test_plan_respects_cell_budget_and_partitions():
+    start, end = history_period(PARAMS)
+    plan = BackfillPlan(IDS, FIELDS, start, end, max_cells=1000, max_ids=3, partition_by="year")
+    assert plan.ids_per_tile == 3
+    assert all(t.cells <= 1000 for t in plan.tiles)
+    assert all(t.start.year == t.end.year == int(t.partition) for t in plan.tiles)
+    assert list(plan.partitions()) == ["2019", "2020", "2021"]
+    # windows cover the range exactly once
+    assert plan.windows[0][0] == start and plan.windows[-1][1] == end
+    assert all((b[0] - a[1]).days == 1 for a, b in zip(plan.windows, plan.windows[1:]))
+    assert sum(estimate_observations(s, e) for s, e in plan.windows) == estimate_observations(start, end)
+
+
+def test_plan_shrinks_identifier_groups_below_one_day():
+    plan = BackfillPlan(IDS, FIELDS, date(2024, 1, 1), date(2024, 1, 5), max_cells=4, max_ids=500)
+    assert plan.days_per_window == 1 and plan.ids_per_tile == 2
+    assert len(plan.tiles) == 5 * 3
+
+
+def _run(tmp_path, client_factory, plan, uri, bisect=True, datatypes=None):
+    poller = Poller(attempts=5, interval_s=0, per_attempt_timeout_s=5)
+    clients = []
+
+    def make_executor():
+        clients.append(client_factory())
+        return ChunkExecutor(clients[-1], "history", FIELDS, [], PARAMS, poller, 5, prerender=True)
+
+    report = FailureReport()
+    with TileCheckpoint(str(tmp_path / "ckpt.sqlite")) as ckpt:
+        job = Backfill(plan, PARAMS, ckpt, resolve_store(uri), uri, report=report,
+                       typed=datatypes is not None, datatypes=datatypes)
+        pending = len(job.pending)
+        pipeline = Pipeline(make_executor, FailurePolicy(sleep=lambda s: None, bisect=bisect), report,
+                            NormalizeSpec("history", FIELDS), resolve_store(job.staging), job.staging,
+                            fetch_workers=2, partitioned=True, on_chunk_done=job.on_tile_done)
+        pipeline.run_jobs(job.jobs())
+        merged = job.merge()
+    submits = sum(1 for c in clients for _, _, h in c.transport.sent if "submit" in h.get("SOAPAction", ""))
+    return pending, merged, submits, report
+
+
+def _expected_rows(plan, n_ids):
+    # the fake client answers two dates per identifier per job
+    return {str(y): n_ids * 2 * len([w for w in plan.windows if w[0].year == y]) for y in (2020, 2021)}
+
+
+def test_backfill_resumes_failed_tiles_and_merges(tmp_path, fake_client_factory):
+    plan = BackfillPlan(IDS, FIELDS, date(2020, 12, 1), date(2021, 1, 31), max_cells=500, max_ids=3)
+    uri = str(tmp_path / "out" / "history.csv")
+
+    pending, merged, _, _ = _run(tmp_path, lambda: fake_client_factory(poison={"ID4"}), plan, uri, bisect=False)
+    assert pending == len(plan.tiles)
+    assert merged == {}  # every window has a tile with ID4 in it
+
+    pending, merged, submits, _ = _run(tmp_path, fake_client_factory, plan, uri)
+    assert pending == submits == len(plan.windows)  # only the ID3/ID4 tiles are redone
+    assert merged == _expected_rows(plan, 5)
+    assert (tmp_path / "out" / "history.2020.csv").exists() and (tmp_path / "out" / "history.2021.csv").exists()
+    assert not (tmp_path / "out" / "history.tiles").exists()
+
+
+def test_backfill_checkpoints_poison_tiles_and_merges_typed_once(tmp_path, fake_client_factory):
+    plan = BackfillPlan(IDS, FIELDS, date(2020, 12, 1), date(2021, 1, 31), max_cells=500, max_ids=3)
+    uri = str(tmp_path / "out" / "history.sqlite")
+    datatypes = {"PX_LAST": "Price", "PX_VOLUME": "Real"}
+
+    pending, merged, _, report = _run(tmp_path, lambda: fake_client_factory(poison={"ID4"}), plan, uri,
+                                      datatypes=datatypes)
+    assert pending == len(plan.tiles)
+    assert merged == _expected_rows(plan, 4)
+    assert {f["reason"] for f in report.failures} == {"poison"}
+    assert {x["id"] for f in report.failures for x in f["identifiers"]} == {"ID4"}
+    assert not (tmp_path / "out" / "history.tiles").exists()
+
+    store = resolve_store(uri)
+    rows = list(store.read(uri))
+    store.close()
+    assert {r["identifier"] for r in rows} == {"ID0", "ID1", "ID2", "ID3"}
+    assert all(isinstance(r["PX_LAST"], float) and isinstance(r["PX_VOLUME"], float) for r in rows)
+
+    pending, merged, submits, _ = _run(tmp_path, fake_client_factory, plan, uri, datatypes=datatypes)
+    assert pending == submits == 0 and merged == {}
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+HEAVY = ("zeep", "requests", "cryptography", "lxml")
+SRC = str(Path(__file__).resolve().parents[1] / "src")
+
+SCRIPT = """
+import sys
+from bbg_dlws_workbench.cli import app
+try:
+    app(sys.argv[1:], standalone_mode=False)
+except SystemExit:
+    pass
+print("LOADED=" + ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def _loaded(*args):
+    env = dict(os.environ, PYTHONPATH=SRC + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    out = subprocess.run([sys.executable, "-c", SCRIPT.format(heavy=HEAVY), *args],
+                         capture_output=True, text=True, env=env, check=True).stdout
+    return out.rsplit("LOADED=", 1)[1].strip()
+
+
+@pytest.mark.parametrize("args", [["--help"], ["run", "--dry-run"], ["plan", "--sample", "1"], ["enqueue"]])
+def test_startup_paths_skip_heavy_imports(tmp_path, args):
+    if args[0] != "--help":
+        cert = tmp_path / "cert.p12"
+        cert.write_bytes(b"")
+        cfg = tmp_path / "cfg.yaml"
+        cfg.write_text(
+            "connection: {endpoint: 'https://dlws.example.test/dlps', cert: {p12_path: '%s', p12_password: x}}\n"
+            "request:\n"
+            "  kind: history\n"
+            "  identifiers: {source: inline, inline: [{id: IBM US, yellow_key: Equity, type: TICKER}]}\n"
+            "  fields: {inline: [PX_LAST]}\n"
+            "output: {uri: '%s'}\n"
+            "queue: {path: '%s'}\n" % (cert, tmp_path / "out.csv", tmp_path / "queue.sqlite")
+        )
+        args = [args[0], "-c", str(cfg), *args[1:]]
+    assert _loaded(*args) == ""
@@ -0,0 +1,71 @@
+import csv
+import gzip
+import hashlib
+
+import pytest
+
+from bbg_dlws_workbench.pipeline import (
+    ChunkExecutor, FailurePolicy, FailureReport, NormalizeSpec, Pipeline, find_raw_files, replay,
+)
+from bbg_dlws_workbench.soap.poller import Poller
+from bbg_dlws_workbench.store import FileSystemStore, open_text, resolve_store
+
+IDS = [{"id": f"ID{i}", "yellow_key": "Equity", "type": "TICKER"} for i in range(5)]
+
+
+def _rows(path):
+    with open_text(path) as f:
+        return list(csv.DictReader(f))
+
+
+def _sidecar_ok(path):
+    with open(path + ".sha256", encoding="utf-8") as f:
+        digest, name = f.read().split()
+    with open(path, "rb") as f:
+        return digest == hashlib.sha256(f.read()).hexdigest() and path.endswith(name)
+
+
+def test_gzip_appends_concatenated_members_with_checksum(tmp_path):
+    uri = str(tmp_path / "out.csv")
+    store = FileSystemStore("gzip")
+    store.write_rows_to_csv(uri, [{"identifier": "A", "PX_LAST": 1}], append=False)
+    store.write_rows_to_csv(uri, [{"identifier": "B", "PX_LAST": 2}], append=True)
+    # a new store (next run) appending to the same file keeps the checksum whole
+    FileSystemStore("gzip").write_rows_to_csv(uri, [{"identifier": "C", "PX_LAST": 3}], append=True)
+
+    path = uri + ".gz"
+    assert not (tmp_path / "out.csv").exists()
+    with open(path, "rb") as f:
+        assert f.read().count(b"\x1f\x8b\x08") == 3  # one member per write
+    assert [r["identifier"] for r in _rows(path)] == ["A", "B", "C"]
+    assert _sidecar_ok(path)
+
+
+def test_unknown_compression_is_rejected():
+    with pytest.raises(ValueError):
+        FileSystemStore("lz4")
+
+
+def test_compressed_raw_archive_replays(tmp_path, fake_client_factory):
+    uri = str(tmp_path / "live" / "out.csv")
+    store = resolve_store(uri, compression="gzip")
+    poller = Poller(attempts=5, interval_s=0, per_attempt_timeout_s=5)
+    pipeline = Pipeline(
+        lambda: ChunkExecutor(fake_client_factory(), "history", ["PX_LAST"], [], {}, poller, 5, raw=True,
+                              spool_dir=str(tmp_path / "spool")),
+        FailurePolicy(sleep=lambda s: None), FailureReport(), NormalizeSpec("history", ["PX_LAST"]), store, uri,
+        normalize_workers=2, include_raw=True, partitioned=True,
+    )
+    assert pipeline.run(IDS[i:i + 2] for i in range(0, len(IDS), 2)) == len(IDS) * 2
+
+    parts = sorted(str(p) for p in (tmp_path / "live").glob("out.part*.csv.gz"))
+    assert len(parts) == 3 and all(_sidecar_ok(p) for p in parts)
+    archives = find_raw_files(str(tmp_path / "live"))
+    assert len(archives) == 3 and all(p.endswith(".xml.gz") for p in archives)
+    with gzip.open(archives[0], "rb") as f:
+        assert f.read().startswith(b"<?xml")
+
+    out = str(tmp_path / "replayed.csv")
+    written, failed = replay(archives, NormalizeSpec("history", []), resolve_store(out), out)
+    assert (written, failed) == (len(IDS) * 2, [])
+    assert sorted(r["identifier"] for r in _rows(out)) == sorted(x["id"] for x in IDS for _ in (1, 2))
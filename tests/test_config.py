@@ -1,3 +1,55 @@
 
+import json
+import os
+
+import pytest
+
+from bbg_dlws_workbench import config
+from bbg_dlws_workbench.identifiers.inline import iter_inline_identifiers
+
+CONFIG = """
+connection: {endpoint: 'https://dlws.example.test/dlps', cert: {p12_path: '%s', p12_password: x}}
+request:
+  kind: history
+  identifiers:
+    source: inline
+    inline:
+      - {id: IBM US, yellow_key: Equity, type: TICKER}
+      - MSFT US
+  fields: {inline: [PX_LAST]}
+output: {uri: out.csv}
+"""
+
+
 def test_config_placeholder():
     assert True
+
+
+def test_inline_identifiers_are_checked_lazily_and_configs_cached(tmp_path, monkeypatch):
+    cert = tmp_path / "cert.p12"
+    cert.write_bytes(b"")
+    path = tmp_path / "cfg.yaml"
+    path.write_text(CONFIG % cert)
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("BBG_DLWS_CONFIG_CACHE", str(cache_dir))
+    monkeypatch.setattr(config, "CACHE_MIN_BYTES", 0)
+
+    cfg = config.load_config(str(path))
+    it = iter_inline_identifiers(cfg.request.identifiers.inline)
+    assert next(it)["id"] == "IBM US"
+    with pytest.raises(ValueError, match=r"inline\[1\]"):
+        next(it)
+
+    [cached] = os.listdir(cache_dir)
+    with open(cache_dir / cached, encoding="utf-8") as f:
+        assert json.load(f) == [{"id": "IBM US", "yellow_key": "Equity", "type": "TICKER"}, "MSFT US"]
+    hit = config.load_config(str(path))
+    assert hit.request.identifiers.inline == cfg.request.identifiers.inline
+    assert hit.connection.cert.p12_password == "x" and hit.output.uri == "out.csv"
+    path.write_text(CONFIG % cert + "chunking: {max_identifiers_per_request: 7}\n")
+    assert config.load_config(str(path)).chunking.max_identifiers_per_request == 7
+    assert len(os.listdir(cache_dir)) == 2
+
+    cert.unlink()  # a cache hit still validates the rest of the file
+    with pytest.raises(ValueError, match="p12_path"):
+        config.load_config(str(path))
@@ -0,0 +1,52 @@
+
+from datetime import date
+
+from bbg_dlws_workbench.transform.decode import decode_rows, decode_value, datatype_kind
+from bbg_dlws_workbench.transform.normalize import parse_data
+
+
+def test_decode_rows_uses_datatypes_and_sentinels():
+    rows = [
+        {"identifier": "IBM", "date": "2024-01-02", "PX_LAST": "161.5", "VOLUME": "1,200", "TICKER": "IBM"},
+        {"identifier": "00123", "date": "2024-01-03", "PX_LAST": "N.A.", "VOLUME": "FLD UNKNOWN", "TICKER": "IBM"},
+    ]
+    datatypes = {"PX_LAST": "Price", "VOLUME": "Integer", "TICKER": "Character"}
+    out = list(decode_rows(rows, datatypes))
+    assert out[0] == {"identifier": "IBM", "date": date(2024, 1, 2), "PX_LAST": 161.5, "VOLUME": 1200, "TICKER": "IBM"}
+    assert out[1]["identifier"] == "00123"
+    assert out[1]["PX_LAST"] is None and out[1]["VOLUME"] is None
+
+
+def test_decode_value_keeps_unparseable_raw():
+    assert decode_value("abc", "float") == "abc"
+    assert decode_value("Y", datatype_kind("Boolean")) is True
+    assert decode_value("12/31/2024", datatype_kind("Date")) == date(2024, 12, 31)
+
+
+def test_bulkarray_as_nested_list():
+    resp = {
+        "instrumentDatas": {
+            "instrumentData": [
+                {
+                    "instrument": {"id": "SPX"},
+                    "data": [
+                        {
+                            "field": "INDX_MEMBERS",
+                            "bulkarray": {
+                                "columns": 2,
+                                "data": [{"value": "AAPL"}, {"value": "7.1"}, {"value": "MSFT"}, {"value": "N.A."}],
+                            },
+                        }
+                    ],
+                }
+            ]
+        }
+    }
+    (row,) = list(parse_data(resp, bulk_as_list=True))
+    assert row["INDX_MEMBERS"] == [["AAPL", "7.1"], ["MSFT", "N.A."]]
+    (decoded,) = list(decode_rows([row], {"INDX_MEMBERS": "Bulk Format"}))
+    assert decoded["INDX_MEMBERS"] == [["AAPL", 7.1], ["MSFT", None]]
+    codes = [["037833100", "0263494", "594918104", "20240131", "42", "-7", "0.5"]]
+    assert decode_value(codes, "bulk") == [["037833100", "0263494", "594918104", "20240131", 42, -7, 0.5]]
+    (legacy,) = list(parse_data(resp))
+    assert legacy["INDX_MEMBERS"] == '[["AAPL","7.1"],["MSFT","N.A."]]'
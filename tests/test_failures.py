@@ -0,0 +1,121 @@
+
+import json
+
+import pytest
+import requests
+
+from bbg_dlws_workbench.pipeline import FailurePolicy, FailureReport
+from bbg_dlws_workbench.soap.poller import TerminalStatusError
+
+
+def _batch(*ids):
+    return [{"id": i, "yellow_key": "Equity", "type": "TICKER"} for i in ids]
+
+
+def test_bisect_isolates_poison_identifier():
+    calls = []
+
+    def execute(batch):
+        calls.append([x["id"] for x in batch])
+        if any(x["id"] == "BAD" for x in batch):
+            raise TerminalStatusError("terminal statusCode=200", code=200)
+        return [x["id"] for x in batch]
+
+    report = FailureReport()
+    out = list(FailurePolicy(sleep=lambda s: None).run(execute, _batch("A", "B", "BAD", "C", "D"), 7, report))
+    assert [resp for _, resp in out] == [["A", "B"], ["C", "D"]]
+    assert len(report.failures) == 1
+    failure = report.failures[0]
+    assert failure["chunk"] == 7 and failure["reason"] == "poison"
+    assert [x["id"] for x in failure["identifiers"]] == ["BAD"]
+    assert json.loads(report.to_json())["failed_identifiers"] == 1
+
+
+def test_transient_errors_retry_with_backoff():
+    sleeps = []
+    attempts = iter([requests.ConnectionError("reset"), requests.Timeout("slow"), "ok"])
+
+    def execute(batch):
+        r = next(attempts)
+        if isinstance(r, Exception):
+            raise r
+        return r
+
+    report = FailureReport()
+    policy = FailurePolicy(max_retries=2, backoff_s=1, backoff_factor=3, sleep=sleeps.append)
+    assert [resp for _, resp in policy.run(execute, _batch("A", "B"), 1, report)] == ["ok"]
+    assert sleeps == [1, 3] and not report
+
+
+def test_exhausted_transient_is_reported_without_bisect():
+    def execute(batch):
+        raise TimeoutError("never ready")
+
+    report = FailureReport()
+    assert list(FailurePolicy(max_retries=1, sleep=lambda s: None).run(execute, _batch("A", "B"), 1, report)) == []
+    assert report.failures[0]["reason"] == "transient" and report.failures[0]["attempts"] == 2
+
+
+def test_abort_reraises():
+    def execute(batch):
+        raise RuntimeError("No responseId")
+
+    with pytest.raises(RuntimeError):
+        list(FailurePolicy(bisect=False, on_failure="abort").run(execute, _batch("A"), 1, FailureReport()))
+
+
+def test_batch_level_errors_stop_bisecting():
+    calls = []
+
+    def execute(batch):
+        calls.append(len(batch))
+        raise TerminalStatusError("terminal statusCode=200", code=200)  # e.g. a bad field: every split fails
+
+    report = FailureReport()
+    assert list(FailurePolicy(sleep=lambda s: None).run(execute, _batch(*"ABCDEFGH"), 1, report)) == []
+    assert calls == [8, 4, 4, 1, 1]  # the halves, then one identifier of each on its own
+    assert [(f["reason"], len(f["identifiers"])) for f in report.failures] == [("batch", 8)]
+
+    calls.clear()
+
+    def no_response_id(batch):
+        calls.append(len(batch))
+        raise RuntimeError("No responseId")
+
+    list(FailurePolicy(sleep=lambda s: None).run(no_response_id, _batch(*"ABCD"), 2, report))
+    assert calls == [4]
+
+
+def test_bisect_budget_caps_extra_submits():
+    calls = []
+
+    def execute(batch):
+        calls.append(len(batch))
+        bad = [x["id"] for x in batch if x["id"].startswith("BAD")]
+        if bad:
+            raise TerminalStatusError("terminal statusCode=200", code=200)
+        return batch
+
+    report = FailureReport()
+    ids = [f"BAD{i}" if i % 4 == 1 else f"OK{i}" for i in range(16)]
+    out = list(FailurePolicy(sleep=lambda s: None, max_bisect_submits=4).run(execute, _batch(*ids), 1, report))
+    assert len(calls) <= 1 + 4
+    assert sum(len(part) for part, _ in out) + sum(len(f["identifiers"]) for f in report.failures) == 16
+
+
+def test_poison_identifiers_in_both_halves_with_one_status_code():
+    calls = []
+
+    def execute(batch):
+        calls.append(len(batch))
+        if any(x["id"] in ("ID100", "ID400") for x in batch):
+            raise TerminalStatusError("terminal statusCode=200", code=200)
+        return batch
+
+    report = FailureReport()
+    out = list(FailurePolicy(sleep=lambda s: None).run(execute, _batch(*(f"ID{i}" for i in range(500))), 1, report))
+    kept = [x["id"] for part, _ in out for x in part]
+    assert len(kept) == 498 and "ID100" not in kept and "ID400" not in kept
+    assert [(f["reason"], [x["id"] for x in f["identifiers"]]) for f in report.failures] == [
+        ("poison", ["ID100"]), ("poison", ["ID400"])]
+    assert len(calls) <= 1 + 32
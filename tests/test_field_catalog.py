@@ -0,0 +1,50 @@
+
+import pytest
+
+from bbg_dlws_workbench.catalog import FieldCatalog, query_key, validate_fields
+from bbg_dlws_workbench.config import FieldsConfig
+from bbg_dlws_workbench.identifiers.fields_loader import load_fields
+
+ROWS = [
+    {"field": "PX_LAST", "displayName": "Last Price", "category": "End of Day Pricing", "datatype": "Price", "description": "Last price for the security"},
+    {"field": "PX_VOLUME", "displayName": "Volume", "category": "End of Day Pricing", "datatype": "Real", "description": "Total number of shares traded"},
+    {"field": "INDX_MEMBERS", "displayName": "Index Members", "category": "Security Master", "datatype": "Bulk Format", "description": "Members of the index"},
+]
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    with FieldCatalog(str(tmp_path / "fields.sqlite")) as c:
+        c.upsert(ROWS[:2], sectors=["Equity"])
+        c.upsert(ROWS[2:], sectors=["Index"])
+        yield c
+
+
+def test_search_keyword_category_sector(catalog):
+    assert [r["field"] for r in catalog.search(keyword="vol")] == ["PX_VOLUME"]
+    assert {r["field"] for r in catalog.search(categories=["end of day pricing"])} == {"PX_LAST", "PX_VOLUME"}
+    assert [r["field"] for r in catalog.search(sectors=["Index"])] == ["INDX_MEMBERS"]
+    assert catalog.search(keyword="price", sectors=["Index"]) == []
+
+
+def test_upsert_refreshes_fts(catalog):
+    catalog.upsert([{**ROWS[0], "description": "Closing quote"}])
+    assert len(catalog) == 3
+    assert [r["field"] for r in catalog.search(keyword="closing")] == ["PX_LAST"]
+    assert catalog.search(keyword="last price for") == []
+
+
+def test_ttl(catalog):
+    key = query_key(["Fundamentals"], [], ["volume"])
+    assert not catalog.is_fresh(key, 3600)
+    catalog.mark_refreshed(key)
+    assert catalog.is_fresh(key, 3600)
+    assert not catalog.is_fresh(key, 0)
+
+
+def test_load_fields_validates_against_catalog(catalog):
+    assert load_fields(FieldsConfig(inline=["PX_LAST"]), catalog=catalog, kind="history") == ["PX_LAST"]
+    with pytest.raises(ValueError, match="PX_BOGUS"):
+        load_fields(FieldsConfig(inline=["PX_LAST", "PX_BOGUS"]), catalog=catalog, kind="data")
+    assert validate_fields(catalog, ["INDX_MEMBERS"], "data") == []
+    assert len(validate_fields(catalog, ["INDX_MEMBERS"], "history")) == 1
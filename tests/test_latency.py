@@ -0,0 +1,102 @@
+import os
+import time
+
+from bbg_dlws_workbench.pipeline import ChunkExecutor
+from bbg_dlws_workbench.soap.latency import MIN_SAMPLES, MIN_TIMEOUT_S, RetrieveLatency, hedged_call
+from bbg_dlws_workbench.soap.poller import Poller
+from bbg_dlws_workbench.soap.raw import RawResponse
+
+IDS = [{"id": f"ID{i}", "yellow_key": "Equity", "type": "TICKER"} for i in range(3)]
+
+
+def test_timeouts_follow_latency_percentiles():
+    latency = RetrieveLatency(hedge=True)
+    assert latency.timeout(15) == 15 and latency.hedge_after() is None  # too few samples
+    for i in range(MIN_SAMPLES * 5):
+        latency.record(1.0 + (i % 100) / 100)  # 1.00 .. 1.99 s
+    assert abs(latency.hedge_after() - 1.95) < 0.011
+    assert abs(latency.timeout(15) - 3 * 1.99) < 0.011
+    assert latency.timeout(4) == 4
+    fast = RetrieveLatency()
+    for _ in range(MIN_SAMPLES):
+        fast.record(0.01)
+    assert fast.timeout(15) == MIN_TIMEOUT_S and fast.hedge_after() is None
+
+
+def test_slow_service_grows_timeout_and_polls_do_not_trigger_hedges():
+    latency = RetrieveLatency(hedge=True)
+    for _ in range(MIN_SAMPLES * 5):
+        latency.record(0.01, ready=False)  # many quick "still processing" replies
+    for _ in range(MIN_SAMPLES):
+        latency.record(4.0)  # few large downloads
+    assert latency.hedge_after() == 4.0
+    assert latency.timeout(60) == 12.0
+
+    fast = RetrieveLatency()
+    for _ in range(MIN_SAMPLES):
+        fast.record(0.01, ready=False)
+    timeouts = []
+    for _ in range(10):  # the service slows down: every attempt times out
+        t = fast.timeout(60)
+        timeouts.append(t)
+        fast.record_timeout(t)
+    assert timeouts[0] == MIN_TIMEOUT_S and timeouts[-1] == 60
+    assert timeouts == sorted(timeouts)
+
+
+def test_poller_waits_between_timed_out_attempts(monkeypatch):
+    import requests
+
+    from bbg_dlws_workbench.soap import poller as poller_mod
+
+    sleeps = []
+    monkeypatch.setattr(poller_mod.time, "sleep", sleeps.append)
+
+    def fetch():
+        raise requests.Timeout("slow")
+
+    statuses = []
+    try:
+        Poller(attempts=3, interval_s=7, per_attempt_timeout_s=5).poll(fetch, statuses)
+    except TimeoutError:
+        pass
+    assert sleeps == [7, 7, 7] and statuses == ["timeout"] * 3
+
+
+def test_hedged_call_first_success_wins():
+    discarded, hedges = [], []
+
+    def call(hedge):
+        if not hedge:
+            time.sleep(0.3)
+        return "hedge" if hedge else "primary"
+
+    assert hedged_call(call, 0.05, discard=discarded.append, on_hedge=hedges.append) == "hedge"
+    time.sleep(0.4)
+    assert discarded == ["primary"] and hedges == [True]
+
+    hedges.clear()
+    assert hedged_call(lambda hedge: "primary", 0.5, on_hedge=hedges.append) == "primary"
+    assert hedges == []
+
+
+def test_executor_hedges_slow_retrieve_on_another_session(tmp_path, fake_client_factory):
+    client = fake_client_factory(max_sessions=2, retrieve_delays=[1.0])
+    latency = RetrieveLatency(hedge=True)
+    for _ in range(MIN_SAMPLES):
+        latency.record(0.05)
+    poller = Poller(attempts=3, interval_s=0, per_attempt_timeout_s=5)
+    spool = tmp_path / "spool"
+    spool.mkdir()
+    ex = ChunkExecutor(client, "history", ["PX_LAST"], [], {}, poller, 5, raw=True, spool_dir=str(spool),
+                       latency=latency)
+
+    t0 = time.perf_counter()
+    resp = ex(IDS)
+    assert time.perf_counter() - t0 < 0.9
+    assert isinstance(resp, RawResponse) and resp.path.endswith(".hedge.xml")
+    assert b"ID2" in bytes(resp.content)
+    assert (latency.hedges, latency.hedge_wins) == (1, 1)
+    time.sleep(1.2)  # the slow copy arrives and is thrown away
+    assert os.listdir(spool) == [os.path.basename(resp.path)]
+    resp.close()
@@ -0,0 +1,109 @@
+
+import csv
+
+import pytest
+
+from bbg_dlws_workbench.pipeline import (
+    ChunkExecutor, FailurePolicy, FailureReport, NormalizeSpec, Pipeline, find_raw_files, replay,
+)
+from bbg_dlws_workbench.soap.poller import Poller
+from bbg_dlws_workbench.store import resolve_store
+
+IDS = [{"id": f"ID{i}", "yellow_key": "Equity", "type": "TICKER"} for i in range(7)]
+
+
+def _run(tmp_path, client_factory, name, kind="history", **kwargs):
+    uri = str(tmp_path / name)
+    poller = Poller(attempts=5, interval_s=0, per_attempt_timeout_s=5)
+    spool_dir = kwargs.pop("spool_dir", None)
+
+    def make_executor():
+        return ChunkExecutor(client_factory(), kind, ["PX_LAST", "PX_VOLUME"], [], {}, poller, 5, prerender=True,
+                             raw=kwargs.get("normalize_workers", 0) > 0 or spool_dir is not None, spool_dir=spool_dir)
+
+    report = FailureReport()
+    pipeline = Pipeline(make_executor, FailurePolicy(sleep=lambda s: None), report,
+                        NormalizeSpec(kind, ["PX_LAST", "PX_VOLUME"]), resolve_store(uri), uri, **kwargs)
+    written = pipeline.run(IDS[i:i + 3] for i in range(0, len(IDS), 3))
+    return uri, written, report
+
+
+def _read(uri):
+    with open(uri, newline="", encoding="utf-8") as f:
+        return sorted(tuple(r.items()) for r in csv.DictReader(f))
+
+
+@pytest.mark.parametrize("kind", ["history", "data"])
+def test_process_pool_matches_in_process(tmp_path, fake_client_factory, kind):
+    serial, n1, _ = _run(tmp_path, fake_client_factory, "serial.csv", kind)
+    parallel, n2, _ = _run(tmp_path, fake_client_factory, "parallel.csv", kind,
+                           fetch_workers=3, normalize_workers=2, max_pending=2)
+    assert n1 == n2 == len(IDS) * (2 if kind == "history" else 1)
+    assert _read(serial) == _read(parallel)
+
+
+def test_partitioned_output_and_poison_isolation(tmp_path, fake_client_factory):
+    uri, written, report = _run(tmp_path, lambda: fake_client_factory(poison={"ID4"}), "out.csv",
+                                fetch_workers=2, normalize_workers=2, partitioned=True)
+    assert written == 6 * 2
+    parts = sorted(p.name for p in tmp_path.glob("out.part*.csv"))
+    assert parts[0] == "out.part00001.csv" and len(parts) >= 3
+    assert [x["id"] for f in report.failures for x in f["identifiers"]] == ["ID4"]
+
+
+def test_failed_polls_leave_no_spool_files(tmp_path, fake_client_factory):
+    spool = tmp_path / "spool"
+    _, written, report = _run(tmp_path, lambda: fake_client_factory(poison={"ID4"}), "out.csv", spool_dir=str(spool))
+    assert written == 6 * 2 and report
+    assert list(spool.iterdir()) == []
+
+
+@pytest.mark.parametrize("normalize_workers", [0, 2])
+def test_spooled_responses_are_archived_or_removed(tmp_path, fake_client_factory, normalize_workers):
+    serial, _, _ = _run(tmp_path, fake_client_factory, "serial.csv")
+    spool = tmp_path / "spool"
+    uri, written, _ = _run(tmp_path, fake_client_factory, "spooled.csv", normalize_workers=normalize_workers,
+                           spool_dir=str(spool), include_raw=True)
+    assert written == len(IDS) * 2
+    assert _read(uri) == _read(serial)
+    assert list(spool.iterdir()) == []  # moved into the archive
+    raws = sorted(p.name for p in tmp_path.glob("spooled.csv*.xml"))
+    assert raws == ["spooled.csv.chunk2.xml", "spooled.csv.chunk3.xml", "spooled.csv.xml"]
+    assert b"retrieveGetHistoryResponse" in (tmp_path / "spooled.csv.xml").read_bytes()
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_replay_rebuilds_output_from_archive(tmp_path, fake_client_factory, workers):
+    live, _, _ = _run(tmp_path, fake_client_factory, "live/out.csv", normalize_workers=2, include_raw=True)
+    (tmp_path / "live" / "broken.xml").write_text("not xml")
+    paths = find_raw_files(str(tmp_path / "live"))
+    assert [p.rsplit("/", 1)[-1] for p in paths] == ["broken.xml", "out.csv.chunk2.xml", "out.csv.chunk3.xml", "out.csv.xml"]
+
+    uri = str(tmp_path / "replayed.csv")
+    written, failed = replay(paths, NormalizeSpec("history", []), resolve_store(uri), uri, workers=workers)
+    assert written == len(IDS) * 2
+    assert [p.rsplit("/", 1)[-1] for p, _ in failed] == ["broken.xml"]
+    assert _read(uri) == _read(live)
+
+
+@pytest.mark.parametrize("normalize_workers", [0, 2])
+def test_bulk_fields_explode_into_child_table(tmp_path, fake_client_factory, normalize_workers):
+    uri = str(tmp_path / "out.csv")
+    bulk_uri = str(tmp_path / "out.bulk.csv")
+    fields = ["PX_LAST", "DVD_HIST_BULK"]
+    poller = Poller(attempts=5, interval_s=0, per_attempt_timeout_s=5)
+    spec = NormalizeSpec("data", fields, bulk_uri=bulk_uri)
+    pipeline = Pipeline(
+        lambda: ChunkExecutor(fake_client_factory(), "data", fields, [], {}, poller, 5, raw=normalize_workers > 0),
+        FailurePolicy(sleep=lambda s: None), FailureReport(), spec, resolve_store(uri), uri,
+        fetch_workers=2, normalize_workers=normalize_workers,
+    )
+    assert pipeline.run(IDS[i:i + 3] for i in range(0, len(IDS), 3)) == len(IDS)
+
+    main = {r["identifier"]: r for r in map(dict, _read(uri))}
+    assert main["ID0"]["DVD_HIST_BULK"] == "@out.bulk.csv" and main["ID0"]["PX_LAST"] == "ID0-PX_LAST"
+    with open(bulk_uri, newline="", encoding="utf-8") as f:
+        cells = list(csv.DictReader(f))
+    assert len(cells) == len(IDS) * 6
+    assert {"identifier": "ID4", "field": "DVD_HIST_BULK", "row": "3", "col": "1", "value": "ID4-r3c1"} in cells
+    assert not list(tmp_path.glob("out.bulk.part*"))
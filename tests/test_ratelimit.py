@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+from bbg_dlws_workbench.pipeline import ChunkExecutor
+from bbg_dlws_workbench.soap.poller import Poller
+from bbg_dlws_workbench.soap.ratelimit import QuotaExceededError, RateLimiter, payload_cells
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, s):
+        self.slept.append(round(s, 3))
+        self.now += s
+
+
+def _limiter(clock, **kwargs):
+    return RateLimiter({"submit": (2.0, 2), "retrieve": (0, 0)}, sleep=clock.sleep, clock=clock, **kwargs)
+
+
+def test_token_bucket_waits_after_burst():
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    for _ in range(4):
+        limiter.acquire("submit", cells=10)
+    for _ in range(5):
+        limiter.acquire("retrieve")  # rate 0: unlimited
+    assert clock.slept == [0.5, 0.5]
+    assert limiter.usage["submit"] == {"requests": 4, "cells": 40}
+    assert limiter.usage["retrieve"]["requests"] == 5
+
+
+def test_shared_file_throttles_and_counts_across_limiters(tmp_path):
+    clock = FakeClock()
+    path = str(tmp_path / "rl.sqlite")
+    a, b = _limiter(clock, path=path, max_cells_per_day=50), _limiter(clock, path=path, max_cells_per_day=50)
+    a.acquire("submit", cells=20)
+    b.acquire("submit", cells=20)
+    b.acquire("submit", cells=5)  # bucket shared with `a`: this one waits
+    assert clock.slept == [0.5]
+    with pytest.raises(QuotaExceededError):
+        a.acquire("submit", cells=10)
+    a.close()
+    b.close()
+
+
+def test_shared_quota_is_never_overshot(tmp_path):
+    path = str(tmp_path / "rl.sqlite")
+    limiters = [RateLimiter({}, path=path, max_requests_per_day=30) for _ in range(6)]
+    granted = []
+
+    def hammer(limiter):
+        for _ in range(10):
+            try:
+                limiter.acquire("submit")
+                granted.append(1)
+            except QuotaExceededError:
+                pass
+
+    threads = [threading.Thread(target=hammer, args=(lim,)) for lim in limiters]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(granted) == 30
+    for lim in limiters:
+        lim.close()
+
+
+def test_executor_accounts_submit_cells(fake_client):
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    poller = Poller(attempts=3, interval_s=0, per_attempt_timeout_s=5)
+    batch = [{"id": f"ID{i}", "yellow_key": "Equity", "type": "TICKER"} for i in range(3)]
+    for prerender in (True, False):
+        ChunkExecutor(fake_client, "history", ["PX_LAST", "PX_VOLUME"], [], {}, poller, 5,
+                      prerender=prerender, limiter=limiter)(batch)
+    assert limiter.usage["submit"] == {"requests": 2, "cells": 12}
+    assert limiter.usage["retrieve"]["requests"] == 2
+    assert payload_cells({"fields": {"field": ["A"]}, "instruments": {"instrument": batch}}) == 3
+
+
+def test_poller_stops_on_quota():
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        raise QuotaExceededError("Daily request quota reached")
+
+    with pytest.raises(QuotaExceededError):
+        Poller(attempts=5, interval_s=0, per_attempt_timeout_s=5).poll(fetch)
+    assert len(calls) == 1
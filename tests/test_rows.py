@@ -0,0 +1,49 @@
+from datetime import date
+
+from bbg_dlws_workbench.store import resolve_store
+from bbg_dlws_workbench.transform.decode import decode_rows
+from bbg_dlws_workbench.transform.normalize import parse_history
+from bbg_dlws_workbench.transform.rows import CompactRow
+
+RESP = {
+    "fields": {"field": ["PX_LAST", "PX_VOLUME"]},
+    "instrumentDatas": {
+        "instrumentData": [
+            {"instrument": {"id": "IBM US Equity"}, "date": d, "data": [{"value": px}, {"value": vol}]}
+            for d, px, vol in [("2024-01-02", "161.5", "1200"), ("2024-01-03", "N.A.", "900")]
+        ]
+    },
+}
+
+
+def test_compact_rows_match_dict_rows_and_share_strings():
+    dicts = list(parse_history(RESP))
+    compact = list(parse_history(RESP, compact=True))
+    assert all(isinstance(r, CompactRow) for r in compact)
+    assert compact == dicts and dicts == [dict(r) for r in compact]
+    assert compact[0].header is compact[1].header
+    assert compact[0]["identifier"] is compact[1]["identifier"]
+    assert dicts[0]["identifier"] is dicts[1]["identifier"]
+
+
+def test_decode_and_writers_accept_compact_rows(tmp_path):
+    datatypes = {"PX_LAST": "Price", "PX_VOLUME": "Integer"}
+    typed = list(decode_rows(parse_history(RESP, compact=True), datatypes))
+    assert typed[0] == {"identifier": "IBM US Equity", "date": date(2024, 1, 2), "PX_LAST": 161.5, "PX_VOLUME": 1200}
+    assert typed[1]["PX_LAST"] is None
+
+    outputs = {}
+    for compact in (False, True):
+        uri = str(tmp_path / f"out-{compact}.csv")
+        resolve_store(uri).write_rows_to_csv(uri, list(parse_history(RESP, compact=compact)), append=False)
+        with open(uri, encoding="utf-8") as f:
+            outputs[compact] = f.read()
+    assert outputs[True] == outputs[False]
+
+    db = str(tmp_path / "out.sqlite")
+    store = resolve_store(db)
+    store.write_rows_to_csv(db, typed, append=False)
+    assert [(r["date"], r["PX_LAST"], r["PX_VOLUME"]) for r in store.read(db)] == [
+        ("2024-01-02", 161.5, 1200), ("2024-01-03", None, 900),
+    ]
+    store.close()
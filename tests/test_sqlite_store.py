@@ -0,0 +1,51 @@
+from datetime import date
+
+import pytest
+
+from bbg_dlws_workbench.store import SqliteStore, resolve_store
+
+
+def test_upsert_merges_overlapping_history(tmp_path):
+    uri = str(tmp_path / "hist.sqlite")
+    store = resolve_store(uri)
+    assert isinstance(store, SqliteStore)
+    store.write_rows_to_csv(uri, [
+        {"identifier": "A", "date": date(2024, 1, 2), "PX_LAST": 1.0},
+        {"identifier": "A", "date": date(2024, 1, 3), "PX_LAST": 2.0},
+        {"identifier": "B", "date": date(2024, 1, 2), "PX_LAST": 5.0},
+    ], append=False)
+    # re-run over an overlapping range, with an extra field
+    store.write_rows_to_csv(uri, [
+        {"identifier": "A", "date": date(2024, 1, 3), "PX_LAST": 2.5, "PX_VOLUME": 10},
+        {"identifier": "A", "date": date(2024, 1, 4), "PX_LAST": 3.0, "PX_VOLUME": 11},
+    ], append=True)
+
+    rows = list(store.read(uri))
+    assert [(r["identifier"], r["date"], r["PX_LAST"], r["PX_VOLUME"]) for r in rows] == [
+        ("A", "2024-01-02", 1.0, None),
+        ("A", "2024-01-03", 2.5, 10),
+        ("A", "2024-01-04", 3.0, 11),
+        ("B", "2024-01-02", 5.0, None),
+    ]
+    latest = {r["identifier"]: r["date"] for r in store.latest(uri)}
+    assert latest == {"A": "2024-01-04", "B": "2024-01-02"}
+    store.close()
+
+
+def test_data_rows_keyed_by_identifier_and_reports_go_to_files(tmp_path):
+    uri = str(tmp_path / "data.db")
+    store = resolve_store(uri)
+    store.write_rows_to_csv(uri, [{"identifier": "A", "NAME": "x", "PX_LAST": 1}], append=False)
+    store.write_rows_to_csv(uri, [{"identifier": "A", "PX_LAST": 2}], append=False)
+    assert list(store.latest(uri)) == [{"identifier": "A", "NAME": "x", "PX_LAST": 2}]
+
+    store.write_rows_to_csv(uri + ".rejects.csv", [{"id": "bad", "reason": "r"}], append=False)
+    assert (tmp_path / "data.db.rejects.csv").read_text().startswith("id,reason")
+    store.close()
+
+
+def test_resolve_store_rejects_unknown_uri_schemes(tmp_path):
+    for uri in ("sqlite:" + str(tmp_path / "out.sqlite") + "#prices", "file:///tmp/out.csv"):
+        with pytest.raises(ValueError):
+            resolve_store(uri)
+    assert not any(tmp_path.iterdir())
@@ -0,0 +1,96 @@
+import sqlite3
+
+from bbg_dlws_workbench.identifiers.chunker import balanced_chunks
+from bbg_dlws_workbench.pipeline import ChunkExecutor, FailurePolicy, FailureReport, NormalizeSpec, Pipeline
+from bbg_dlws_workbench.soap.poller import Poller
+from bbg_dlws_workbench.stats import CostModel, LatencyModel, PlanEstimate, RunHistory, observations
+from bbg_dlws_workbench.store import resolve_store
+
+IDS = [{"id": f"ID{i}", "yellow_key": "Equity", "type": "TICKER"} for i in range(3)]
+
+
+def test_observations_follow_daterange():
+    assert observations("data", {}) == 1
+    period = {"dateRange": {"period": {"start": "2024-01-01", "end": "2024-12-31"}}}
+    assert 250 <= observations("history", period) <= 262
+    monthly = {"dateRange": {"duration": {"years": 2}}, "periodicity": "MONTHLY"}
+    assert observations("history", monthly) in (24, 25)
+
+
+def test_latency_model_and_plan_estimate():
+    samples = [(c, 2.0 + 0.001 * c, 40 * c) for c in (1_000, 2_000, 4_000, 8_000)]
+    model = LatencyModel.fit(samples)
+    assert abs(model.seconds(10_000) - 12.0) < 1e-6
+    assert model.bytes_per_cell == 40
+
+    est = PlanEstimate("data", 10, {}, model)
+    for n in (100, 100, 50):
+        est.add(n)
+    s = est.summary(fetch_workers=2)
+    assert (s["chunks"], s["cells"], s["cells_per_chunk_max"]) == (3, 2_500, 1_000)
+    assert s["estimated_bytes"] == 100_000
+    # two lanes: 3.0 + 2.5 on one, 3.0 on the other
+    assert abs(s["estimated_wall_seconds"] - 5.5) < 0.05
+    assert PlanEstimate("data", 10, {}, None).summary()["estimated_wall_seconds"] is None
+
+
+def test_executor_records_chunks(tmp_path, fake_client):
+    poller = Poller(attempts=5, interval_s=0, per_attempt_timeout_s=5)
+    with RunHistory(str(tmp_path / "runs.sqlite")) as history:
+        ex = ChunkExecutor(fake_client, "history", ["PX_LAST", "PX_VOLUME"], [], {}, poller, 5, history=history)
+        ex(IDS)
+        [(cells, seconds, size)] = history.samples("history")
+    assert cells == 3 * 2 and seconds >= 0 and size > 0
+    with RunHistory(str(tmp_path / "runs.sqlite")) as history:
+        assert set(history.identifier_rates("history")) == {"ID0", "ID1", "ID2"}
+
+
+def test_cost_model_and_balanced_chunks(tmp_path):
+    with RunHistory(str(tmp_path / "runs.sqlite")) as history:
+        history.record_chunk("data", 2, 1, 2, 20.0, ids=[("SLOW", "Corp"), ("X", "Corp")])
+        history.record_chunk("data", 2, 1, 2, 2.0, ids=[("A", "Equity"), ("B", "Equity")])
+        model = CostModel.from_history(history, "data", 1, {})
+    assert model.identifier_cost({"id": "SLOW"}) == 10.0
+    assert model.identifier_cost({"id": "NEW", "yellow_key": "Equity"}) == 1.0
+    assert model.identifier_cost({"id": "NEW", "yellow_key": "Govt"}) == model.default_rate
+
+    costs = {"a": 9, "b": 1, "c": 1, "d": 5, "e": 4, "f": 1, "g": 1}
+    items = [{"id": k} for k in costs]
+    chunks = balanced_chunks(items, 3, lambda x: costs[x["id"]])
+    totals = [sum(costs[x["id"]] for x in c) for c in chunks]
+    assert len(chunks) == 3 and all(len(c) <= 3 for c in chunks)
+    assert sorted(x["id"] for c in chunks for x in c) == sorted(costs)
+    assert totals == [9, 7, 6]  # "a" alone, the rest split evenly; costliest chunk first
+    assert chunks[0][0]["id"] == "a"
+    assert balanced_chunks(items[:2], 3, lambda x: 1) == [items[:2]]
+
+
+def test_pipeline_records_poll_trace_and_rows(tmp_path, fake_client_factory):
+    path, uri = str(tmp_path / "runs.sqlite"), str(tmp_path / "history.csv")
+    # a history file from before the poll trace columns existed
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE chunks (id INTEGER PRIMARY KEY, run_id TEXT NOT NULL, kind TEXT NOT NULL, "
+                 "identifiers INTEGER NOT NULL, fields INTEGER NOT NULL, cells INTEGER NOT NULL, seconds REAL NOT NULL, "
+                 "response_bytes INTEGER, ok INTEGER NOT NULL, recorded_at REAL NOT NULL)")
+    conn.close()
+
+    poller = Poller(attempts=5, interval_s=0, per_attempt_timeout_s=5)
+    fields = ["PX_LAST", "PX_VOLUME"]
+    ids = [{"id": f"ID{i}", "yellow_key": "Equity", "type": "TICKER"} for i in range(7)]
+    with RunHistory(path) as history:
+        pipeline = Pipeline(
+            lambda: ChunkExecutor(fake_client_factory(pending_polls=2), "history", fields, [], {}, poller, 5,
+                                  history=history),
+            FailurePolicy(sleep=lambda s: None), FailureReport(), NormalizeSpec("history", fields),
+            resolve_store(uri), uri, fetch_workers=2,
+        )
+        pipeline.run(ids[i:i + 3] for i in range(0, len(ids), 3))
+        groups = history.stats("history")
+
+    assert [(g["identifiers"], g["fields"], g["chunks"], g["failed"]) for g in groups] == [(1, 2, 1, 0), (3, 2, 2, 0)]
+    full = groups[1]
+    assert full["statuses"] == "100,100,0"
+    assert full["poll_attempts_p50"] == 3
+    assert full["rows_p50"] == 3 * 2  # identifiers x dates
+    assert full["ready_seconds_p99"] <= full["seconds_p99"]
+    assert full["response_bytes_p50"] > groups[0]["response_bytes_p50"]
@@ -0,0 +1,51 @@
+
+import pytest
+
+from bbg_dlws_workbench.config import SubmitConfig
+from bbg_dlws_workbench.pipeline import ChunkExecutor, executor
+from bbg_dlws_workbench.soap.builder import build_payload
+from bbg_dlws_workbench.soap.poller import Poller
+from bbg_dlws_workbench.soap.submitter import submit_envelope, submit_request
+from bbg_dlws_workbench.soap.templates import EnvelopeTemplate
+
+
+IDS = [
+    {"id": "IBM US", "yellow_key": "Equity", "type": "TICKER"},
+    {"id": "AT&T <old>", "yellow_key": "", "type": "TICKER"},
+    {"id": "Société Générale", "yellow_key": "Equity", "type": "TICKER"},
+]
+
+
+@pytest.mark.parametrize("overrides", [[], [{"name": "EQY_FUND_CRNCY", "value": "USD"}]])
+def test_template_is_byte_equivalent_to_zeep(fake_client, overrides):
+    client = fake_client
+    params = {"daterange": {"duration": {"days": 3}}, "programflag": "adhoc"}
+    payload = build_payload("history", ["PX_LAST", "PX_VOLUME"], IDS, overrides, params)
+
+    assert submit_request(client, "history", payload) == "resp-1"
+    template = EnvelopeTemplate(client, "history", build_payload("history", ["PX_LAST", "PX_VOLUME"], [], overrides, params))
+    assert submit_envelope(template, IDS) == "resp-2"
+
+    (addr_z, body_z, headers_z), (addr_t, body_t, headers_t) = client.transport.sent
+    assert body_t == body_z
+    assert (addr_t, headers_t) == (addr_z, headers_z)
+    assert template.render(IDS[:1]) != body_z
+
+
+def test_template_rejects_sync_kinds(fake_client):
+    with pytest.raises(ValueError):
+        EnvelopeTemplate(fake_client, "fundamentals_headers", {})
+
+
+def test_executor_falls_back_to_zeep_without_template(fake_client, monkeypatch):
+    assert SubmitConfig().prerender is False  # opt-in: the template uses zeep internals
+
+    def unavailable(*args, **kwargs):
+        raise AttributeError("'ServiceProxy' object has no attribute '_binding_options'")
+
+    monkeypatch.setattr(executor, "EnvelopeTemplate", unavailable)
+    poller = Poller(attempts=5, interval_s=0, per_attempt_timeout_s=5)
+    run = ChunkExecutor(fake_client, "history", ["PX_LAST"], [], {}, poller, 5, prerender=True)
+    assert run._template is None
+    assert run(IDS[:1]) is not None
+    assert sum("submit" in h.get("SOAPAction", "") for _, _, h in fake_client.transport.sent) == 1
@@ -0,0 +1,83 @@
+import threading
+import time
+
+import pytest
+
+from bbg_dlws_workbench.soap.builder import build_payload
+from bbg_dlws_workbench.soap.pool import SessionPool
+from bbg_dlws_workbench.soap.submitter import get_response_by_id, submit_request
+
+IDS = [{"id": "ID1", "yellow_key": "Equity", "type": "TICKER"}]
+
+
+def test_session_pool_is_bounded():
+    pool = SessionPool(object, size=2)
+    with pool.checkout() as a, pool.checkout() as b:
+        assert a is not b and pool.created == 2
+        with pytest.raises(TimeoutError):
+            with pool.checkout(timeout=0.01):
+                pass
+    with pool.checkout() as c:
+        assert c in (a, b)
+
+
+def test_shared_client_keeps_per_thread_timeouts(fake_client_factory):
+    client = fake_client_factory(max_sessions=2)
+    transport = client.transport
+    handle = transport.handle
+
+    def slow_handle(*args):
+        time.sleep(0.005)  # keep calls of the threads overlapping
+        return handle(*args)
+
+    transport.handle = slow_handle
+    rid = submit_request(client, "data", build_payload("data", ["PX_LAST"], IDS, [], {}))
+    transport.timeouts.clear()
+    start = threading.Barrier(4)
+
+    def poll(timeout):
+        start.wait()
+        for _ in range(5):
+            assert get_response_by_id(client, "data", rid, timeout=timeout) is not None
+
+    threads = [threading.Thread(target=poll, args=(t,)) for t in (11, 12, 13, 14)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    by_thread = {}
+    for ident, timeout in transport.timeouts:
+        by_thread.setdefault(ident, set()).add(timeout)
+    assert sorted(by_thread.values(), key=min) == [{11}, {12}, {13}, {14}]
+    assert transport.operation_timeout is None and transport.sessions.created == 2
+
+
+def test_p12_context_leaves_no_key_files(tmp_path, monkeypatch):
+    import datetime
+    import tempfile
+
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.hazmat.primitives.serialization import BestAvailableEncryption, pkcs12
+    from cryptography.x509.oid import NameOID
+
+    from bbg_dlws_workbench.soap.transport import build_session_with_p12, p12_ssl_context
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "test")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+            .serial_number(1).not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1))
+            .sign(key, hashes.SHA256()))
+    p12 = tmp_path / "cert.p12"
+    p12.write_bytes(pkcs12.serialize_key_and_certificates(b"t", key, cert, None, BestAvailableEncryption(b"pw")))
+
+    scratch = tmp_path / "tmp"
+    scratch.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(scratch))
+    ctx = p12_ssl_context(str(p12), "pw")
+    sessions = [build_session_with_p12(str(p12), "pw", ssl_context=ctx) for _ in range(3)]
+    assert all(s.get_adapter("https://x").poolmanager.connection_pool_kw["ssl_context"] is ctx for s in sessions)
+    assert list(scratch.iterdir()) == []
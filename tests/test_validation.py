@@ -0,0 +1,88 @@
+
+import pytest
+
+from bbg_dlws_workbench.validation import (
+    IdentifierValidator, check_headers, check_history_params, check_identifier, enforce,
+)
+
+
+def _id(i, yk="Equity", t="TICKER"):
+    return {"id": i, "yellow_key": yk, "type": t, "extras": {}}
+
+
+def test_check_identifier_formats_and_yellow_keys():
+    assert check_identifier(_id("US0378331005", "", "ISIN"))[1] is None
+    assert check_identifier(_id("US0378331006", "", "ISIN"))[1] == "malformed ISIN 'US0378331006'"
+    assert check_identifier(_id("037833100", "", "CUSIP"))[1] is None
+    assert check_identifier(_id("0263494", "", "SEDOL1"))[1] is None
+    assert check_identifier(_id("AUDCAD", "Currency"))[0]["yellow_key"] == "Currency"  # checked, not rewritten
+    assert check_identifier(_id("IBM", "Stocks"))[1] == "unknown yellow key 'Stocks'"
+    assert check_identifier(_id("IBM", ""))[1] == "type TICKER requires a yellow key"
+    assert check_identifier(_id("IBM US", "", ""))[1] is None  # no type: nothing to require
+    assert check_identifier(_id(" "))[1] == "empty id"
+
+
+def test_validator_quarantines_and_dedupes():
+    v = IdentifierValidator("quarantine")
+    out = list(v.filter([_id("IBM"), _id("IBM"), _id("MSFT"), _id("XX", "", "ISIN")]))
+    assert [x["id"] for x in out] == ["IBM", "MSFT"]
+    assert [(r["position"], r["reason"]) for r in v.rejects] == [(2, "duplicate"), (4, "malformed ISIN 'XX'")]
+
+
+def test_validator_warns_by_default_and_submits_everything_as_given(caplog):
+    items = [_id("IBM"), _id("IBM"), _id("AUDCAD", "Currency"), _id("XX", "", "ISIN")]
+    v = IdentifierValidator()
+    assert list(v.filter(items)) == items
+    assert v.warnings == 2 and not v.rejects
+    assert "duplicate" in caplog.text and "malformed ISIN" in caplog.text
+
+
+def test_validator_fail_mode_raises():
+    with pytest.raises(ValueError, match="#2"):
+        list(IdentifierValidator("fail").filter([_id("IBM"), _id("")]))
+
+
+def test_check_history_params():
+    assert check_history_params({"daterange": {"duration": {"days": 3}}, "programflag": "adhoc"}) == []
+    assert check_history_params({"daterange": {"period": {"start": "2024-02-01", "end": "2024-01-01"}}}) == [
+        "headers.daterange.period: start 2024-02-01 is after end 2024-01-01"
+    ]
+    assert len(check_history_params({"daterange": {"duration": {"days": 0}, "period": {"start": "x", "end": "2024-01-01"}}})) == 3
+    enforce(["headers.x: bad"], "headers", "warn")
+    with pytest.raises(ValueError, match="Invalid headers: headers.x: bad"):
+        enforce(["headers.x: bad"], "headers", "quarantine")
+
+
+class _Type:
+    def __init__(self, name, elements=(), pythonvalue=None):
+        self.name = name
+        self.elements = list(elements)
+        self.attributes = []
+        if pythonvalue:
+            self.pythonvalue = pythonvalue
+
+
+class _El:
+    def __init__(self, t):
+        self.type = t
+
+
+class _Client:
+    def __init__(self, types):
+        self.types = types
+
+    def get_type(self, name):
+        return self.types[name]
+
+
+def test_check_headers_against_wsdl_types():
+    days = _Type("int", pythonvalue=int)
+    duration = _Type("Duration", [("days", _El(days))])
+    daterange = _Type("DateRange", [("duration", _El(duration))])
+    headers = _Type("GetHistoryHeaders", [("daterange", _El(daterange)), ("programflag", _El(_Type("string", pythonvalue=str)))])
+    client = _Client({"ns0:GetHistoryHeaders": headers})
+    assert check_headers(client, "history", {"daterange": {"duration": {"days": 3}}}) == []
+    problems = check_headers(client, "history", {"dateRange": {}, "daterange": {"duration": {"days": "x"}}})
+    assert problems[0].startswith("headers.dateRange: not part of GetHistoryHeaders")
+    assert problems[1].startswith("headers.daterange.duration.days: 'x' is not a valid int")
+    assert check_headers(client, "data", {"x": 1}) == []
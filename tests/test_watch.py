@@ -0,0 +1,77 @@
+import pytest
+
+from bbg_dlws_workbench.api import Workbench
+from bbg_dlws_workbench.pipeline.stages import RowBatch
+from bbg_dlws_workbench.watch import DeltaIndex, Watcher, parse_every
+
+
+def test_parse_every():
+    assert parse_every("90") == 90
+    assert parse_every("30s") == 30
+    assert parse_every("5m") == 300
+    assert parse_every("1h30m") == 5400
+    for bad in ("", "5x", "m5", "5 m"):
+        with pytest.raises(ValueError):
+            parse_every(bad)
+
+
+def test_delta_index_reports_new_and_changed_cells():
+    index = DeltaIndex()
+    first = RowBatch.from_rows([{"identifier": "A", "PX_LAST": "1"}, {"identifier": "B", "PX_LAST": "2"}])
+    assert sorted(index.update(first)) == [("A", "PX_LAST", "1", "new"), ("B", "PX_LAST", "2", "new")]
+    assert list(index.update(first)) == []
+    second = RowBatch.from_rows([{"identifier": "A", "PX_LAST": "1"}, {"identifier": "B", "PX_LAST": "3"},
+                                 {"identifier": "C"}])
+    assert list(index.update(second)) == [("B", "PX_LAST", "3", "changed")]
+    assert len(index) == 2
+
+    typed = DeltaIndex()  # output.typed: hash(-1) == hash(-2) in CPython
+    list(typed.update(RowBatch.from_rows([{"identifier": "A", "PX_LAST": -1, "CHG": -1.0, "N": 1}])))
+    changed = typed.update(RowBatch.from_rows([{"identifier": "A", "PX_LAST": -2, "CHG": -2.0, "N": 1.0}]))
+    assert sorted(changed) == [("A", "CHG", -2.0, "changed"), ("A", "N", 1.0, "changed"),
+                               ("A", "PX_LAST", -2, "changed")]
+
+
+class _Workbench:
+    def __init__(self, cycles):
+        self.cycles = iter(cycles)
+
+    def iter_batches(self):
+        rows = next(self.cycles)
+        if rows is None:
+            raise ConnectionError("down")
+        yield RowBatch.from_rows(rows)
+
+
+def test_watcher_keeps_schedule_and_survives_failed_cycles():
+    wb = _Workbench([[{"identifier": "A", "PX_LAST": "1"}], None, [{"identifier": "A", "PX_LAST": "2"}]])
+    deltas, sleeps = [], []
+    now = [0.0]
+
+    def sleep(s):
+        sleeps.append(s)
+        now[0] += s
+
+    watcher = Watcher(wb, on_delta=deltas.extend, sleep=sleep, clock=lambda: now[0])
+    watcher.run(60, cycles=3)
+    assert watcher.cycles == 3 and sleeps == [60, 60]
+    assert [(d["identifier"], d["value"], d["change"]) for d in deltas] == [("A", "1", "new"), ("A", "2", "changed")]
+
+
+def test_watch_workbench_reports_nothing_when_data_is_unchanged(tmp_path, fake_client):
+    cert = tmp_path / "cert.p12"
+    cert.write_bytes(b"")
+    cfg = {
+        "connection": {"endpoint": "https://dlws.example.test/dlps", "cert": {"p12_path": str(cert), "p12_password": "x"}},
+        "request": {"kind": "data", "identifiers": {"source": "inline", "inline": [{"id": "ID1"}, {"id": "ID2"}]},
+                    "fields": {"inline": ["PX_LAST", "PX_VOLUME"]}},
+        "polling": {"interval_seconds": 1, "attempts": 5},
+        "output": {"uri": str(tmp_path / "unused.csv")},
+        "run_history": {"enabled": False},
+        "validation": {"enabled": False},
+    }
+    deltas = []
+    with Workbench(cfg, client=fake_client) as wb:
+        watcher = Watcher(wb, on_delta=deltas.extend, sleep=lambda s: None)
+        watcher.run(0, cycles=2)
+    assert len(deltas) == 4 and {d["change"] for d in deltas} == {"new"}
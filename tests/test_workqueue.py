@@ -0,0 +1,112 @@
+import csv
+import glob
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from bbg_dlws_workbench.pipeline import (
+    ChunkExecutor, FailurePolicy, FailureReport, NormalizeSpec, Pipeline, partition_uri,
+)
+from bbg_dlws_workbench.soap.poller import Poller
+from bbg_dlws_workbench.store import resolve_store
+from bbg_dlws_workbench.workqueue import Worker, open_queue
+
+IDS = [{"id": f"ID{i}", "yellow_key": "Equity", "type": "TICKER"} for i in range(7)]
+FIELDS = ["PX_LAST", "PX_VOLUME"]
+JOBS = [(n, IDS[i:i + 2]) for n, i in enumerate(range(0, len(IDS), 2), start=1)]
+QUEUES = ["queue.sqlite", "queue.d"]
+
+
+@pytest.mark.parametrize("name", QUEUES)
+def test_claims_leases_and_attempts(tmp_path, name):
+    q = open_queue(str(tmp_path / name), lease_seconds=0.2, max_attempts=2)
+    assert q.enqueue("run1", "cfg", JOBS[:3]) == 3
+    assert q.enqueue("run1", "cfg", JOBS[:3]) == 0
+    with pytest.raises(ValueError):
+        q.enqueue("run2", "cfg", JOBS)
+
+    assert q.claim("a") == (1, IDS[0:2])
+    assert q.claim("b")[0] == 2
+    assert q.complete(1, "a", True)
+    time.sleep(0.3)  # b's lease expires
+    assert q.claim("c")[0] == 2
+    assert not q.complete(2, "b", True)
+    assert q.complete(2, "c", False)  # second attempt: failed for good
+    assert q.claim("c")[0] == 3
+    assert q.release("c") == 1
+    assert q.counts() == {"pending": 1, "claimed": 0, "done": 1, "failed": 1}
+    q.close()
+
+
+def _work(path, uri, name, client_factory):
+    q = open_queue(path, lease_seconds=1, max_attempts=3)
+    poller = Poller(attempts=5, interval_s=0, per_attempt_timeout_s=5)
+    worker = Worker(q, name, uri, poll_s=0.1)
+    pipeline = Pipeline(
+        lambda: ChunkExecutor(client_factory(), "history", FIELDS, [], {}, poller, 5, prerender=True),
+        FailurePolicy(sleep=lambda s: None), FailureReport(), NormalizeSpec("history", FIELDS),
+        resolve_store(uri), uri, fetch_workers=2, partitioned=True, on_chunk_done=worker.on_chunk_done,
+    )
+    with worker.heartbeat():
+        pipeline.run_jobs(worker.jobs())
+    q.close()
+
+
+@pytest.mark.parametrize("name", QUEUES)
+def test_worker_processes_drain_queue_and_take_over_dead_claims(tmp_path, fake_client_factory, name):
+    if "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("needs fork")
+    path, uri = str(tmp_path / name), str(tmp_path / "out" / "history.csv")
+    q = open_queue(path, lease_seconds=1, max_attempts=3)
+    q.enqueue("run1", "cfg", JOBS)
+    assert q.claim("dead")[0] == 1  # a worker that never finishes chunk 1
+    stale = partition_uri(uri, 1, 2)
+    resolve_store(stale).write_text(stale, "junk\n")
+    q.close()
+
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_work, args=(path, uri, f"w{i}", fake_client_factory)) for i in range(3)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(60)
+    assert [p.exitcode for p in procs] == [0, 0, 0]
+
+    q = open_queue(path)
+    assert q.counts() == {"pending": 0, "claimed": 0, "done": len(JOBS), "failed": 0}
+    q.close()
+    assert not os.path.exists(stale)
+    rows = []
+    for f in sorted(glob.glob(str(tmp_path / "out" / "history.part*.csv"))):
+        with open(f, newline="", encoding="utf-8") as fh:
+            rows += list(csv.DictReader(fh))
+    assert len(rows) == len(IDS) * 2
+    assert sorted({r["identifier"] for r in rows}) == sorted(x["id"] for x in IDS)
+
+
+@pytest.mark.parametrize("name", QUEUES)
+def test_poison_identifiers_do_not_requeue_their_chunk(tmp_path, fake_client_factory, name):
+    q = open_queue(str(tmp_path / name), max_attempts=3)
+    q.enqueue("run1", "cfg", JOBS)
+    uri = str(tmp_path / "out" / "history.csv")
+    report = FailureReport()
+    worker = Worker(q, "w", uri, wait=False, report=report)
+    poller = Poller(attempts=5, interval_s=0, per_attempt_timeout_s=5)
+    pipeline = Pipeline(
+        lambda: ChunkExecutor(fake_client_factory(poison={"ID2"}), "history", FIELDS, [], {}, poller, 5),
+        FailurePolicy(sleep=lambda s: None), report, NormalizeSpec("history", FIELDS),
+        resolve_store(uri), uri, partitioned=True, on_chunk_done=worker.on_chunk_done,
+    )
+    pipeline.run_jobs(worker.jobs())
+    assert q.counts() == {"pending": 0, "claimed": 0, "done": len(JOBS), "failed": 0}
+    assert [x["id"] for f in report.failures for x in f["identifiers"]] == ["ID2"]
+
+    # a chunk-level failure goes back to the queue, and out of this worker's report
+    q.enqueue("run2", "cfg", JOBS[:1], reset=True)
+    idx, batch = q.claim("w")
+    report.add(idx, batch, RuntimeError("No responseId"), 1, "batch")
+    worker.on_chunk_done(idx, False)
+    assert q.counts()["pending"] == 1 and not report.has_chunk(idx)
+    q.close()